@@ -50,7 +50,7 @@ setup(
             '*.dtd',
             '*.xml',
         ],
-        'ssquant.assets': ['*.png', '*.jpg', '*.jpeg'],
+        'ssquant.assets': ['*.png', '*.jpg', '*.jpeg', 'report.css', 'report.js', 'plotly.min.js'],
     },
     
     # 依赖项
@@ -66,6 +66,11 @@ setup(
             'joblib>=1.0.0',
             'statsmodels>=0.12.0',
         ],
+        'speed': [
+            'numba>=0.56.0',
+            'bottleneck>=1.3.0',
+            'orjson>=3.6.0',
+        ],
         'dev': [
             'pytest>=6.0.0',
             'black>=21.0',
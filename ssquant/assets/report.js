@@ -0,0 +1,755 @@
+// 在浏览器空闲时执行（不支持 requestIdleCallback 的浏览器退回 setTimeout）
+function whenIdle(callback) {
+    if (window.requestIdleCallback) {
+        window.requestIdleCallback(callback);
+    } else {
+        setTimeout(callback, 0);
+    }
+}
+
+// plotly.js 就绪后再绘图（内联的 plotly.js 需要先异步解压，CDN 加载时 DOMContentLoaded 前已执行完毕）
+var plotlyReady = window.plotlyReady || Promise.resolve();
+
+// 折线点数超过该值时使用 WebGL（scattergl）绘制，点数较少时用 SVG（scatter）
+var GL_POINT_THRESHOLD = 5000;
+
+function lineTraceType(pointCount) {
+    return pointCount > GL_POINT_THRESHOLD ? 'scattergl' : 'scatter';
+}
+
+// 图表颜色
+var colors = ['#64b5f6', '#4caf50', '#ff9800', '#e91e63', '#9c27b0', '#00bcd4', '#8bc34a', '#ff5722'];
+
+// 利润曲线数据（从0开始，便于对比）
+
+// 绘制利润曲线
+var profitTraces = [];
+
+// 添加各数据源的利润曲线
+profitDataSources.forEach(function(source, idx) {
+    var color = colors[idx % colors.length];
+    profitTraces.push({
+        x: source.dates,
+        y: source.values,
+        type: lineTraceType(source.dates.length),
+        mode: 'lines',
+        name: source.name,
+        line: {
+            color: color,
+            width: 1.5
+        },
+        opacity: 0.7
+    });
+});
+
+// 添加综合毛利润曲线（不含成本，黄色虚线）
+if (combinedGrossProfitData.dates && combinedGrossProfitData.dates.length > 0) {
+    profitTraces.push({
+        x: combinedGrossProfitData.dates,
+        y: combinedGrossProfitData.values,
+        type: lineTraceType(combinedGrossProfitData.dates.length),
+        mode: 'lines',
+        name: '毛利润(不含成本)',
+        line: {
+            color: '#ffd54f',
+            width: 2,
+            dash: 'dash'
+        },
+        opacity: 0.8
+    });
+}
+
+// 添加综合净利润曲线（含成本，白色实线）
+if (combinedProfitData.dates && combinedProfitData.dates.length > 0) {
+    profitTraces.push({
+        x: combinedProfitData.dates,
+        y: combinedProfitData.values,
+        type: lineTraceType(combinedProfitData.dates.length),
+        mode: 'lines',
+        name: '净利润(扣除成本)',
+        line: {
+            color: '#ffffff',
+            width: 2.5
+        }
+    });
+}
+
+// 添加价格曲线（使用右侧Y轴，默认隐藏）
+var priceColors = ['#90caf9', '#a5d6a7', '#ffcc80', '#f48fb1', '#ce93d8'];
+priceDataSources.forEach(function(source, idx) {
+    var color = priceColors[idx % priceColors.length];
+    profitTraces.push({
+        x: source.dates,
+        y: source.values,
+        type: lineTraceType(source.dates.length),
+        mode: 'lines',
+        name: source.name,
+        yaxis: 'y2',
+        line: {
+            color: color,
+            width: 1,
+            dash: 'dot'
+        },
+        opacity: 0.6,
+        visible: 'legendonly'  // 默认隐藏，点击图例可显示
+    });
+});
+
+var profitLayout = {
+    paper_bgcolor: 'rgba(0,0,0,0)',
+    plot_bgcolor: 'rgba(0,0,0,0)',
+    font: { color: '#e0e0e0' },
+    xaxis: {
+        type: 'date',
+        gridcolor: 'rgba(255,255,255,0.1)',
+        nticks: 10,
+        tickangle: -30
+    },
+    yaxis: {
+        gridcolor: 'rgba(255,255,255,0.1)',
+        tickformat: ',.0f',
+        title: '利润(元)',
+        zeroline: true,
+        zerolinecolor: 'rgba(255,255,255,0.3)',
+        zerolinewidth: 1,
+        side: 'left'
+    },
+    yaxis2: {
+        gridcolor: 'rgba(255,255,255,0.05)',
+        tickformat: ',.2f',
+        title: '价格/相对值',
+        overlaying: 'y',
+        side: 'right',
+        showgrid: false
+    },
+    margin: { l: 70, r: 70, t: 30, b: 60 },
+    hovermode: 'x unified',
+    hoverlabel: {
+        bgcolor: '#fff',
+        font: { color: '#333', size: 13 },
+        bordercolor: '#ccc'
+    },
+    showlegend: true,
+    legend: {
+        orientation: 'h',
+        yanchor: 'bottom',
+        y: 1.02,
+        xanchor: 'left',
+        x: 0,
+        font: { size: 11 }
+    },
+    dragmode: 'pan'
+};
+
+var profitConfig = {
+    scrollZoom: true,
+    displayModeBar: true,
+    modeBarButtonsToRemove: ['select2d', 'lasso2d'],
+    displaylogo: false
+};
+
+// 图表在 DOMContentLoaded 且 plotly.js 就绪后绘制
+document.addEventListener('DOMContentLoaded', function() {
+    plotlyReady.then(function() {
+        Plotly.newPlot('profit-chart', profitTraces, profitLayout, profitConfig);
+    });
+});
+
+// 回撤数据
+
+// 绘制回撤图
+var drawdownTraces = [];
+
+// 添加各数据源的回撤曲线
+drawdownDataSources.forEach(function(source, idx) {
+    var color = colors[idx % colors.length];
+    drawdownTraces.push({
+        x: source.dates,
+        y: source.values,
+        type: lineTraceType(source.dates.length),
+        mode: 'lines',
+        name: source.name,
+        line: {
+            color: color,
+            width: 1
+        },
+        opacity: 0.5
+    });
+});
+
+// 添加综合回撤曲线
+if (combinedDrawdownData.dates && combinedDrawdownData.dates.length > 0) {
+    drawdownTraces.push({
+        x: combinedDrawdownData.dates,
+        y: combinedDrawdownData.values,
+        type: lineTraceType(combinedDrawdownData.dates.length),
+        mode: 'lines',
+        name: '综合回撤',
+        fill: 'tozeroy',
+        fillcolor: 'rgba(244, 67, 54, 0.3)',
+        line: {
+            color: '#f44336',
+            width: 2
+        }
+    });
+}
+
+var drawdownLayout = {
+    paper_bgcolor: 'rgba(0,0,0,0)',
+    plot_bgcolor: 'rgba(0,0,0,0)',
+    font: { color: '#e0e0e0' },
+    xaxis: {
+        type: 'date',
+        gridcolor: 'rgba(255,255,255,0.1)',
+        nticks: 10,
+        tickangle: -30
+    },
+    yaxis: {
+        gridcolor: 'rgba(255,255,255,0.1)',
+        tickformat: '.2f',
+        title: '回撤 (%)',
+        autorange: 'reversed'
+    },
+    margin: { l: 70, r: 30, t: 30, b: 60 },
+    hovermode: 'x unified',
+    hoverlabel: {
+        bgcolor: '#fff',
+        font: { color: '#333', size: 13 },
+        bordercolor: '#ccc'
+    },
+    showlegend: false,
+    dragmode: 'pan'
+};
+
+var drawdownConfig = {
+    scrollZoom: true,
+    displayModeBar: true,
+    modeBarButtonsToRemove: ['select2d', 'lasso2d'],
+    displaylogo: false
+};
+
+// 图表在 DOMContentLoaded 且 plotly.js 就绪后绘制
+// 只有利润曲线立即绘制，回撤图在浏览器空闲时再绘制，避免长时间阻塞页面
+document.addEventListener('DOMContentLoaded', function() {
+    plotlyReady.then(function() {
+        whenIdle(function() {
+            Plotly.newPlot('drawdown-chart', drawdownTraces, drawdownLayout, drawdownConfig);
+        });
+    });
+});
+
+// 标签页切换功能
+function switchTab(tabId) {
+    // 隐藏所有标签内容
+    document.querySelectorAll('.tab-content').forEach(function(content) {
+        content.classList.remove('active');
+    });
+    // 取消所有标签的激活状态
+    document.querySelectorAll('.tab').forEach(function(tab) {
+        tab.classList.remove('active');
+    });
+    // 显示选中的标签内容
+    var content = document.getElementById('content-' + tabId);
+    if (content) {
+        content.classList.add('active');
+        // 首次显示该数据源时才初始化其交易表格
+        if (content.dataset && content.dataset.tradesIdx !== undefined) {
+            ensureTradesTable(parseInt(content.dataset.tradesIdx));
+        }
+    }
+    // 激活选中的标签
+    var tab = document.querySelector('[onclick="switchTab(\'' + tabId + '\')"]');
+    if (tab) {
+        tab.classList.add('active');
+    }
+}
+
+// K线图数据
+var currentKlineIndex = 0;
+
+// 生成 K线切换标签
+function generateKlineTabs() {
+    var tabsHtml = '';
+    klineDataSources.forEach(function(source, idx) {
+        var activeClass = idx === 0 ? 'active' : '';
+        tabsHtml += '<div class="tab ' + activeClass + '" onclick="switchKline(' + idx + ')">' + source.name + '</div>';
+    });
+    document.getElementById('kline-tabs').innerHTML = tabsHtml;
+}
+
+// 切换 K线数据源
+function switchKline(idx) {
+    currentKlineIndex = idx;
+    // 更新标签状态
+    var tabs = document.querySelectorAll('#kline-tabs .tab');
+    tabs.forEach(function(tab, i) {
+        if (i === idx) {
+            tab.classList.add('active');
+        } else {
+            tab.classList.remove('active');
+        }
+    });
+    // 更新图表标题
+    updateChartTitle(idx);
+    // 更新图表数据
+    drawKlineChart(idx);
+}
+
+// 更新图表标题（根据是TICK还是K线）
+function updateChartTitle(idx) {
+    if (klineDataSources.length === 0) return;
+    var source = klineDataSources[idx];
+    var isTick = source.ohlc.is_tick;
+    var iconEl = document.getElementById('price-chart-icon');
+    var titleEl = document.getElementById('price-chart-title');
+    if (iconEl && titleEl) {
+        if (isTick) {
+            iconEl.textContent = '📈';
+            titleEl.textContent = 'TICK价格图与交易标记';
+        } else {
+            iconEl.textContent = '🕯️';
+            titleEl.textContent = 'K线图与交易标记';
+        }
+    }
+}
+
+// 交易标记的悬停文字：动作 手数手 @ 价格
+var MARKER_HOVERTEMPLATE = '%{customdata[0]} %{customdata[1]}手 @ %{y:.2f}<br>%{x}<extra></extra>';
+
+// 由交易标记的并列数组（动作下标、手数）组装 customdata
+function markerCustomdata(markers) {
+    return markers.action.map(function(code, i) {
+        return [markers.actions[code], markers.volume[i]];
+    });
+}
+
+// 解码 base64 编码的小端 float64 数组
+function decodeFloat64(b64) {
+    var bin = atob(b64);
+    var bytes = new Uint8Array(bin.length);
+    for (var i = 0; i < bin.length; i++) {
+        bytes[i] = bin.charCodeAt(i);
+    }
+    return new Float64Array(bytes.buffer);
+}
+
+// K线/TICK价格以 base64 编码传入，首次绘制该数据源时解码为 Float64Array
+function decodeOhlc(ohlc) {
+    ['prices', 'open', 'high', 'low', 'close'].forEach(function(field) {
+        if (typeof ohlc[field] === 'string') {
+            ohlc[field] = decodeFloat64(ohlc[field]);
+        }
+    });
+    return ohlc;
+}
+
+// 绘制 K线图 / TICK价格线图
+function drawKlineChart(idx) {
+    if (klineDataSources.length === 0) return;
+
+    var source = klineDataSources[idx];
+    var ohlc = decodeOhlc(source.ohlc);
+    var traces = [];
+    var chartTitle = '价格';
+
+    // 判断是 TICK 数据还是 K线数据
+    if (ohlc.is_tick) {
+        // TICK 数据：绘制价格线
+        var priceLine = {
+            x: ohlc.dates,
+            y: ohlc.prices,
+            type: lineTraceType(ohlc.dates.length),
+            mode: 'lines',
+            name: source.name + ' 价格',
+            line: {
+                color: '#64b5f6',
+                width: 1.5
+            },
+            hoverinfo: 'y+x'
+        };
+        traces.push(priceLine);
+        chartTitle = 'TICK价格';
+    } else {
+        // K线数据：绘制蜡烛图
+        var candlestick = {
+            x: ohlc.dates,
+            open: ohlc.open,
+            high: ohlc.high,
+            low: ohlc.low,
+            close: ohlc.close,
+            type: 'candlestick',
+            name: source.name,
+            increasing: { line: { color: '#26a69a' }, fillcolor: '#26a69a' },
+            decreasing: { line: { color: '#ef5350' }, fillcolor: '#ef5350' }
+        };
+        traces.push(candlestick);
+    }
+
+    // 买入标记
+    if (source.buy_markers.x.length > 0) {
+        traces.push({
+            x: source.buy_markers.x,
+            y: source.buy_markers.y,
+            type: 'scatter',
+            mode: 'markers',
+            name: '买入',
+            marker: {
+                symbol: 'triangle-up',
+                size: 12,
+                color: '#4caf50',
+                line: { color: '#fff', width: 1 }
+            },
+            customdata: markerCustomdata(source.buy_markers),
+            hovertemplate: MARKER_HOVERTEMPLATE
+        });
+    }
+
+    // 卖出标记
+    if (source.sell_markers.x.length > 0) {
+        traces.push({
+            x: source.sell_markers.x,
+            y: source.sell_markers.y,
+            type: 'scatter',
+            mode: 'markers',
+            name: '卖出',
+            marker: {
+                symbol: 'triangle-down',
+                size: 12,
+                color: '#f44336',
+                line: { color: '#fff', width: 1 }
+            },
+            customdata: markerCustomdata(source.sell_markers),
+            hovertemplate: MARKER_HOVERTEMPLATE
+        });
+    }
+
+    var layout = {
+        paper_bgcolor: 'rgba(0,0,0,0)',
+        plot_bgcolor: 'rgba(0,0,0,0)',
+        font: { color: '#e0e0e0' },
+        xaxis: {
+            type: 'date',
+            gridcolor: 'rgba(255,255,255,0.1)',
+            rangeslider: { visible: false },
+            nticks: 10,
+            tickangle: -30
+        },
+        yaxis: {
+            gridcolor: 'rgba(255,255,255,0.1)',
+            tickformat: ',.2f',
+            title: chartTitle
+        },
+        margin: { l: 70, r: 30, t: 30, b: 60 },
+        hovermode: 'x unified',
+        hoverlabel: {
+            bgcolor: '#fff',
+            font: { color: '#333', size: 13 },
+            bordercolor: '#ccc'
+        },
+        showlegend: true,
+        legend: { x: 0, y: 1.1, orientation: 'h' },
+        dragmode: 'pan'
+    };
+
+    var config = {
+        scrollZoom: true,
+        displayModeBar: true,
+        modeBarButtonsToRemove: ['select2d', 'lasso2d'],
+        displaylogo: false
+    };
+
+    // Plotly.react 在首次调用时等同于 newPlot，之后切换数据源只比对并更新变化的部分，
+    // 不再销毁重建整个图表（大数据量时切换标签不再卡顿）
+    plotlyReady.then(function() {
+        Plotly.react('kline-chart', traces, layout, config);
+    });
+}
+
+// 初始化 K线图/TICK价格图（标签和标题立即生成，图表在浏览器空闲时绘制）
+document.addEventListener('DOMContentLoaded', function() {
+    if (klineDataSources.length > 0) {
+        generateKlineTabs();
+        updateChartTitle(0);
+        whenIdle(function() {
+            drawKlineChart(currentKlineIndex);
+        });
+    }
+});
+
+// ========== 交易记录分页和筛选功能 ==========
+var tradesData = {};  // 各数据源的交易数据（按列存储，不为每笔交易创建对象）
+var filteredData = {};  // 各数据源筛选后保留的交易序号（Uint32Array）
+var pageSize = 50;  // 每页显示条数
+var currentPages = {};  // 各数据源当前页码
+var tableElements = {};  // 各数据源交易表格相关的DOM元素（首次使用时查找一次）
+
+// 获取交易表格的表体、分页信息和筛选控件，查找结果按数据源缓存
+function getTableElements(sourceIdx) {
+    var els = tableElements[sourceIdx];
+    if (!els) {
+        var pagination = document.getElementById('pagination-' + sourceIdx);
+        els = tableElements[sourceIdx] = {
+            tbody: document.getElementById('trades-tbody-' + sourceIdx),
+            pageButtons: pagination ? pagination.querySelectorAll('button') : null,
+            currentPage: document.getElementById('current-page-' + sourceIdx),
+            totalPages: document.getElementById('total-pages-' + sourceIdx),
+            tradesCount: document.getElementById('trades-count-' + sourceIdx),
+            time: document.getElementById('filter-time-' + sourceIdx),
+            price: document.getElementById('filter-price-' + sourceIdx),
+            action: document.getElementById('filter-action-' + sourceIdx),
+            profit: document.getElementById('filter-profit-' + sourceIdx),
+            pageInput: document.getElementById('page-input-' + sourceIdx)
+        };
+    }
+    return els;
+}
+
+// 交易记录数值格式：千分位、两位小数
+var amountFormat = new Intl.NumberFormat('en-US', { minimumFractionDigits: 2, maximumFractionDigits: 2 });
+
+function formatAmount(value) {
+    return amountFormat.format(value);
+}
+
+function formatSignedAmount(value) {
+    var text = amountFormat.format(value);
+    return text.charAt(0) === '-' ? text : '+' + text;
+}
+
+// 全部交易的序号 0..count-1
+function allTradeIndices(count) {
+    var indices = new Uint32Array(count);
+    for (var i = 0; i < count; i++) indices[i] = i;
+    return indices;
+}
+
+// 初始化交易记录（直接使用 tradesDataSources 的列数据，只在渲染时格式化当前页的行）
+function initTradesTable(sourceIdx) {
+    var columns = tradesDataSources[sourceIdx];
+    if (!columns) return;
+
+    var count = columns.action.length;
+    var isClose = new Uint8Array(count);
+    // 平仓盈亏（与显示一致，按两位小数四舍五入到分，开仓为NaN），盈亏筛选直接比较数值
+    var profitCents = new Float64Array(count);
+    for (var i = 0; i < count; i++) {
+        var action = columns.action[i];
+        isClose[i] = (action === '平多' || action === '平空') ? 1 : 0;
+        if (isClose[i]) {
+            var profit = columns.amount_profit[i];
+            var cents = Math.round(Math.abs(profit) * 100);
+            profitCents[i] = profit < 0 ? -cents : cents;
+        } else {
+            profitCents[i] = NaN;
+        }
+    }
+
+    tradesData[sourceIdx] = {
+        columns: columns,
+        count: count,
+        isClose: isClose,
+        profitCents: profitCents,
+        priceText: null,  // 格式化后的价格，首次按价格筛选时生成
+        filterCache: new Map()  // 最近使用的筛选条件 -> 筛选结果
+    };
+
+    filteredData[sourceIdx] = allTradeIndices(count);
+    currentPages[sourceIdx] = 1;
+
+    renderPage(sourceIdx);
+}
+
+// 生成一笔交易的表格行
+function tradeRowHtml(trades, tradeIdx, rowNumber) {
+    var columns = trades.columns;
+    var action = columns.action[tradeIdx];
+    var isClose = trades.isClose[tradeIdx];
+    var netProfit = columns.net_profit[tradeIdx];
+    var tagClass = (action === '开多' || action === '平空') ? 'buy' : 'sell';
+    var profitClass = isClose ? (netProfit > 0 ? 'profit' : 'loss') : '';
+    return '<tr><td>' + rowNumber + '</td>' +
+        '<td>' + columns.time[tradeIdx] + '</td>' +
+        '<td><span class="tag ' + tagClass + '">' + action + '</span></td>' +
+        '<td>' + formatAmount(columns.price[tradeIdx]) + '</td>' +
+        '<td>' + columns.volume[tradeIdx] + '</td>' +
+        '<td class="' + profitClass + '">' + (isClose ? formatSignedAmount(columns.amount_profit[tradeIdx]) : '-') + '</td>' +
+        '<td>' + formatAmount(columns.commission[tradeIdx]) + '</td>' +
+        '<td class="' + profitClass + '">' + (isClose ? formatSignedAmount(netProfit) : '-') + '</td></tr>';
+}
+
+// 渲染当前页（只生成当前页的行）
+function renderPage(sourceIdx) {
+    var els = getTableElements(sourceIdx);
+    var tbody = els.tbody;
+    if (!tbody) return;
+
+    var trades = tradesData[sourceIdx];
+    var data = filteredData[sourceIdx] || [];
+    var totalPages = Math.ceil(data.length / pageSize) || 1;
+    var currentPage = currentPages[sourceIdx] || 1;
+
+    // 确保当前页在有效范围内
+    if (currentPage > totalPages) currentPage = totalPages;
+    if (currentPage < 1) currentPage = 1;
+    currentPages[sourceIdx] = currentPage;
+
+    // 计算显示范围
+    var startIdx = (currentPage - 1) * pageSize;
+    var endIdx = Math.min(startIdx + pageSize, data.length);
+
+    // 显示当前页数据
+    var rows = [];
+    for (var i = startIdx; i < endIdx; i++) {
+        rows.push(tradeRowHtml(trades, data[i], i + 1));
+    }
+    tbody.innerHTML = rows.join('');
+
+    // 更新分页信息
+    if (els.currentPage) els.currentPage.textContent = currentPage;
+    if (els.totalPages) els.totalPages.textContent = totalPages;
+    if (els.tradesCount) els.tradesCount.textContent = data.length;
+
+    // 更新分页按钮状态
+    updatePaginationButtons(sourceIdx, currentPage, totalPages);
+}
+
+// 更新分页按钮状态
+function updatePaginationButtons(sourceIdx, currentPage, totalPages) {
+    var buttons = getTableElements(sourceIdx).pageButtons;
+    if (!buttons) return;
+
+    buttons[0].disabled = currentPage === 1;  // 首页
+    buttons[1].disabled = currentPage === 1;  // 上一页
+    buttons[2].disabled = currentPage === totalPages;  // 下一页
+    buttons[3].disabled = currentPage === totalPages;  // 末页
+}
+
+// 获取总页数
+function getTotalPages(sourceIdx) {
+    var data = filteredData[sourceIdx] || [];
+    return Math.ceil(data.length / pageSize) || 1;
+}
+
+// 跳转到指定页
+function goToPage(sourceIdx, page) {
+    var totalPages = getTotalPages(sourceIdx);
+    if (page < 1) page = 1;
+    if (page > totalPages) page = totalPages;
+    currentPages[sourceIdx] = page;
+    renderPage(sourceIdx);
+}
+
+// 上一页
+function prevPage(sourceIdx) {
+    goToPage(sourceIdx, (currentPages[sourceIdx] || 1) - 1);
+}
+
+// 下一页
+function nextPage(sourceIdx) {
+    goToPage(sourceIdx, (currentPages[sourceIdx] || 1) + 1);
+}
+
+// 跳转到输入的页码
+function jumpToPage(sourceIdx) {
+    var input = getTableElements(sourceIdx).pageInput;
+    if (input && input.value) {
+        goToPage(sourceIdx, parseInt(input.value));
+        input.value = '';
+    }
+}
+
+// 筛选结果缓存的条目数（按筛选条件缓存，来回切换筛选条件时不再重新遍历）
+var FILTER_CACHE_SIZE = 16;
+
+// 按筛选条件遍历交易，返回保留的交易序号
+function filterTrades(trades, timeValue, priceValue, actionValue, profitValue) {
+    var columns = trades.columns;
+    var profitCents = trades.profitCents;
+    if (priceValue && !trades.priceText) {
+        trades.priceText = columns.price.map(formatAmount);
+    }
+
+    // 逐笔检查，保留的交易序号写入预分配的数组
+    var kept = new Uint32Array(trades.count);
+    var keptCount = 0;
+    for (var i = 0; i < trades.count; i++) {
+        // 时间筛选
+        if (timeValue && columns.time[i].toLowerCase().indexOf(timeValue) === -1) continue;
+        // 价格筛选
+        if (priceValue && trades.priceText[i].indexOf(priceValue) === -1) continue;
+        // 操作筛选
+        if (actionValue && columns.action[i].indexOf(actionValue) === -1) continue;
+        // 盈亏筛选（开仓的 profitCents 为NaN，比较结果为false，两种筛选都不保留）
+        if (profitValue === 'profit' && !(profitCents[i] > 0)) continue;
+        if (profitValue === 'loss' && !(profitCents[i] < 0)) continue;
+        kept[keptCount++] = i;
+    }
+    return kept.slice(0, keptCount);
+}
+
+// 应用筛选
+function applyTradesFilter(sourceIdx) {
+    var els = getTableElements(sourceIdx);
+    var timeFilter = els.time;
+    var priceFilter = els.price;
+    var actionFilter = els.action;
+    var profitFilter = els.profit;
+
+    var timeValue = timeFilter ? timeFilter.value.trim().toLowerCase() : '';
+    var priceValue = priceFilter ? priceFilter.value.trim() : '';
+    var actionValue = actionFilter ? actionFilter.value : '';
+    var profitValue = profitFilter ? profitFilter.value : '';
+
+    var trades = tradesData[sourceIdx];
+    if (!trades) return;
+
+    // 命中缓存时直接复用结果，并移到最近使用的位置；超出容量时淘汰最久未用的条件
+    var cache = trades.filterCache;
+    var key = JSON.stringify([timeValue, priceValue, actionValue, profitValue]);
+    var kept = cache.get(key);
+    if (kept) {
+        cache.delete(key);
+    } else {
+        kept = filterTrades(trades, timeValue, priceValue, actionValue, profitValue);
+        if (cache.size >= FILTER_CACHE_SIZE) {
+            cache.delete(cache.keys().next().value);
+        }
+    }
+    cache.set(key, kept);
+    filteredData[sourceIdx] = kept;
+
+    currentPages[sourceIdx] = 1;
+    renderPage(sourceIdx);
+}
+
+// 重置筛选
+function resetTradesFilter(sourceIdx) {
+    var els = getTableElements(sourceIdx);
+    var timeFilter = els.time;
+    var priceFilter = els.price;
+    var actionFilter = els.action;
+    var profitFilter = els.profit;
+
+    if (timeFilter) timeFilter.value = '';
+    if (priceFilter) priceFilter.value = '';
+    if (actionFilter) actionFilter.value = '';
+    if (profitFilter) profitFilter.value = '';
+
+    filteredData[sourceIdx] = allTradeIndices(tradesData[sourceIdx].count);
+    currentPages[sourceIdx] = 1;
+    renderPage(sourceIdx);
+}
+
+// 初始化尚未初始化的交易表格（每个数据源只初始化一次）
+function ensureTradesTable(sourceIdx) {
+    if (!tradesData[sourceIdx]) {
+        initTradesTable(sourceIdx);
+    }
+}
+
+// 页面加载后只初始化默认显示的第一个数据源的交易表格，其余数据源在切换到对应标签时再初始化
+document.addEventListener('DOMContentLoaded', function() {
+    if (tradesDataSources.length > 0) {
+        ensureTradesTable(0);
+    }
+});
@@ -1,3 +1,6 @@
+from .backtest_results import get_equity_series
+
+
 class BacktestReportGenerator:
     """回测报告生成器，负责生成和保存性能报告"""
     
@@ -172,8 +175,9 @@ class BacktestReportGenerator:
                 # 收集所有数据源的权益曲线
                 all_equity_curves = []
                 for result in results.values():
-                    if 'equity_curve' in result and isinstance(result['equity_curve'], pd.Series):
-                        all_equity_curves.append(result['equity_curve'])
+                    equity_curve = get_equity_series(result) if isinstance(result, dict) else None
+                    if equity_curve is not None:
+                        all_equity_curves.append(equity_curve)
                 
                 # 如果有可用的权益曲线，则计算综合最大回撤
                 if all_equity_curves:
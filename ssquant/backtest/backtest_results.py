@@ -1,6 +1,203 @@
 import pandas as pd
 import numpy as np
 
+# 交易动作编码，循环和掩码中按整数比较，避免逐笔比较字符串
+ACTION_OPEN_LONG = 0
+ACTION_CLOSE_LONG = 1
+ACTION_OPEN_SHORT = 2
+ACTION_CLOSE_SHORT = 3
+ACTION_OTHER = -1  # 反手等其他动作，不参与配对和权益回放
+_ACTION_CODES = {
+    '开多': ACTION_OPEN_LONG,
+    '平多': ACTION_CLOSE_LONG,
+    '开空': ACTION_OPEN_SHORT,
+    '平空': ACTION_CLOSE_SHORT,
+}
+
+
+def get_equity_series(result, gross=False):
+    """获取单个数据源回测结果中的权益曲线
+    
+    优先返回结果中保存的Series；只有权益曲线数组和时间索引的结果，按需构造Series。
+    
+    Args:
+        result: 单个数据源的回测结果字典
+        gross: 是否获取毛利润曲线（不扣除成本）
+        
+    Returns:
+        权益曲线Series，结果中没有权益曲线时返回None
+    """
+    key = 'gross_equity_curve' if gross else 'equity_curve'
+    curve = result.get(key)
+    if isinstance(curve, pd.Series):
+        return curve
+    values = result.get(f'{key}_arr')
+    if values is None:
+        return None
+    return pd.Series(values, index=result.get('equity_curve_index'), dtype=float)
+
+
+# calculate_performance 聚合的单数据源指标字段
+_PERFORMANCE_FIELDS = [
+    'net_value', 'annual_return', 'max_drawdown', 'max_drawdown_pct', 'sharpe_ratio',
+    'win_rate', 'total_trades', 'win_trades', 'loss_trades', 'profit_factor',
+]
+
+
+def _encode_actions(actions):
+    """将交易动作字符串编码为int8数组
+    
+    Args:
+        actions: 交易动作序列
+        
+    Returns:
+        int8编码数组，未知动作编码为ACTION_OTHER
+    """
+    return np.fromiter((_ACTION_CODES.get(a, ACTION_OTHER) for a in actions), dtype=np.int8, count=len(actions))
+
+
+def _trades_to_frame(trades):
+    """将交易记录列表转换为列式DataFrame
+    
+    Args:
+        trades: 交易记录列表，每条记录为字典
+        
+    Returns:
+        包含 datetime/action/price/volume/slippage_cost 列的DataFrame
+    """
+    return pd.DataFrame({
+        'datetime': [t['datetime'] for t in trades],
+        'action': [t['action'] for t in trades],
+        'price': [t['price'] for t in trades],
+        'volume': [t['volume'] for t in trades],
+        'slippage_cost': [t.get('slippage_cost', 0) for t in trades],
+    })
+
+
+def _replay_trades(action_codes, prices, volumes, commissions, slippages, trade_bars, n_bars,
+                   initial_capital, contract_multiplier, margin_rate):
+    """按K线逐根回放交易，计算每根K线处理完交易后的资金与持仓状态
+    
+    每根K线处理所有时间不晚于该K线的交易：先重试之前无持仓可平的平仓交易，再处理新到达的交易。
+    无持仓可平的平仓交易保留到后续K线继续尝试，反手等其他动作直接忽略，与逐K线扫描的结果一致。
+    只有新到达交易或挂起的平仓可能成交的K线才需要处理，其余K线沿用上一状态。
+    
+    Args:
+        action_codes: 交易动作编码数组（已按时间排序）
+        prices: 成交价格数组
+        volumes: 成交数量数组
+        commissions: 手续费数组
+        slippages: 滑点成本数组
+        trade_bars: 每笔交易首次被处理的K线位置（晚于最后一根K线的交易为 n_bars）
+        n_bars: K线数量
+        initial_capital: 初始资金
+        contract_multiplier: 合约乘数
+        margin_rate: 保证金率
+        
+    Returns:
+        状态字典，每个值为长度 n_bars 的数组，第i个元素为处理完第i根K线的交易后的状态
+    """
+    n = len(action_codes)
+    actions = np.asarray(action_codes).tolist()
+    price_list = np.asarray(prices).tolist()
+    volume_list = np.asarray(volumes).tolist()
+    commission_list = np.asarray(commissions).tolist()
+    slippage_list = np.asarray(slippages).tolist()
+    bar_list = np.asarray(trade_bars).tolist()
+    
+    cash = float(initial_capital)  # 可用资金（未被占用的资金）
+    margin_total = 0.0  # 总保证金占用
+    long_pos = long_avg_price = short_pos = short_avg_price = 0.0  # 多空持仓量与平均持仓价格
+    commission_sum = slippage_sum = 0.0  # 累计手续费、滑点成本
+    
+    # 状态发生变化的K线位置及对应状态，-1 表示初始状态
+    snapshot_bars = [-1]
+    snapshots = [(cash, margin_total, long_pos, long_avg_price, short_pos, short_avg_price, commission_sum, slippage_sum)]
+    
+    pending = []  # 无持仓可平、等待后续K线重试的平仓交易
+    j = 0
+    bar = bar_list[0] if n > 0 else n_bars
+    while bar < n_bars:
+        # 挂起的交易时间更早，先于本K线新到达的交易处理
+        batch = pending
+        pending = []
+        while j < n and bar_list[j] <= bar:
+            batch.append(j)
+            j += 1
+        
+        for t in batch:
+            action = actions[t]
+            price = price_list[t]
+            volume = volume_list[t]
+            commission = commission_list[t]
+            
+            if action == ACTION_OPEN_LONG or action == ACTION_OPEN_SHORT:
+                # 计算开仓成本和保证金
+                margin_required = price * volume * contract_multiplier * margin_rate
+                
+                # 更新资金（净利润：扣除手续费）
+                cash -= (margin_required + commission)
+                margin_total += margin_required
+                commission_sum += commission
+                slippage_sum += slippage_list[t]
+                
+                # 更新持仓和加权平均持仓价格
+                if action == ACTION_OPEN_LONG:
+                    long_avg_price = (long_pos * long_avg_price + volume * price) / (long_pos + volume) if long_pos > 0 else price
+                    long_pos += volume
+                else:
+                    short_avg_price = (short_pos * short_avg_price + volume * price) / (short_pos + volume) if short_pos > 0 else price
+                    short_pos += volume
+            
+            elif action == ACTION_CLOSE_LONG or action == ACTION_CLOSE_SHORT:
+                # 确保不超过实际持仓，无持仓可平时留待后续K线重试
+                is_long = action == ACTION_CLOSE_LONG
+                volume = min(volume, long_pos if is_long else short_pos)
+                if volume <= 0:
+                    pending.append(t)
+                    continue
+                avg_price = long_avg_price if is_long else short_avg_price
+                
+                # 计算平仓后释放的保证金和平仓盈亏
+                margin_released = avg_price * volume * contract_multiplier * margin_rate
+                if is_long:
+                    close_profit = (price - avg_price) * volume * contract_multiplier
+                else:
+                    close_profit = (avg_price - price) * volume * contract_multiplier
+                
+                # 更新资金（净利润：扣除手续费）
+                cash += (margin_released + close_profit - commission)
+                margin_total -= margin_released
+                commission_sum += commission
+                slippage_sum += slippage_list[t]
+                
+                # 更新持仓，完全平仓时重置平均价格
+                if is_long:
+                    long_pos -= volume
+                    if long_pos <= 0:
+                        long_pos = long_avg_price = 0.0
+                else:
+                    short_pos -= volume
+                    if short_pos <= 0:
+                        short_pos = short_avg_price = 0.0
+        
+        snapshot_bars.append(bar)
+        snapshots.append((cash, margin_total, long_pos, long_avg_price, short_pos, short_avg_price, commission_sum, slippage_sum))
+        
+        # 下一根需要处理的K线：下一笔新交易所在K线；若挂起的平仓已有持仓可平，则为下一根K线
+        next_bar = bar_list[j] if j < n else n_bars
+        if any(long_pos > 0 if actions[t] == ACTION_CLOSE_LONG else short_pos > 0 for t in pending):
+            next_bar = min(next_bar, bar + 1)
+        bar = next_bar
+    
+    # 将状态快照展开到每根K线：沿用不晚于该K线的最近一次状态
+    idx = np.searchsorted(np.asarray(snapshot_bars), np.arange(n_bars), side='right') - 1
+    columns = np.asarray(snapshots, dtype=np.float64)[idx]
+    keys = ['available_cash', 'total_margin', 'long_pos', 'long_avg_price', 'short_pos', 'short_avg_price',
+            'cumulative_commission', 'cumulative_slippage']
+    return {key: columns[:, c] for c, key in enumerate(keys)}
+
+
 class BacktestResultCalculator:
     """回测结果计算器，负责计算交易统计、盈亏和绩效指标等"""
     
@@ -28,59 +225,31 @@ class BacktestResultCalculator:
         # 提取关键绩效指标
         performance = {}
         
-        # 如果存在多个数据源，则计算平均指标
-        total_return = 0
-        annual_return = 0
-        max_drawdown = 0
-        max_drawdown_pct = 0
-        sharpe_ratio = 0
-        win_rate = 0
-        total_trades = 0
-        winning_trades = 0
-        losing_trades = 0
-        profit_factor = 0
+        # 各数据源的指标均由 calculate_results 完整写入，这里按列一次性聚合（多个数据源取平均）
+        source_results = [result for result in results.values() if isinstance(result, dict) and 'net_value' in result]
         
-        # 计数器
-        count = 0
-        
-        # 遍历所有结果
-        for key, result in results.items():
-            if isinstance(result, dict) and 'net_value' in result:
-                count += 1
-                
-                # 确保净值不小于0.0001（防止出现负净值）
-                net_value = max(0.0001, result.get('net_value', 1.0))
+        if source_results:
+            # 缺失的指标按0计，与逐个 result.get(field, 0) 累加一致
+            metrics = pd.DataFrame(source_results, columns=_PERFORMANCE_FIELDS).fillna(0)
+            
+            # 确保净值不小于0.0001（防止出现负净值）
+            net_values = metrics['net_value'].clip(lower=0.0001)
+            for result, net_value in zip(source_results, net_values.tolist()):
                 result['net_value'] = net_value  # 修正结果中的净值
-                
-                # 累加绩效指标
-                total_return += (net_value - 1.0) * 100  # 转换为百分比
-                annual_return += result.get('annual_return', 0)
-                max_drawdown += result.get('max_drawdown', 0)
-                max_drawdown_pct += result.get('max_drawdown_pct', 0)
-                sharpe_ratio += result.get('sharpe_ratio', 0)
-                win_rate += result.get('win_rate', 0) * 100  # 转换为百分比
-                
-                # 累加交易统计
-                total_trades += result.get('total_trades', 0)
-                winning_trades += result.get('win_trades', 0)
-                losing_trades += result.get('loss_trades', 0)
-                profit_factor += result.get('profit_factor', 0)
-        
-        # 计算平均值
-        if count > 0:
-            performance['total_return'] = total_return / count
-            performance['annual_return'] = annual_return / count
-            performance['max_drawdown'] = max_drawdown / count
-            performance['max_drawdown_pct'] = max_drawdown_pct / count
-            performance['sharpe_ratio'] = sharpe_ratio / count
-            performance['win_rate'] = win_rate / count
+            
+            performance['total_return'] = float(((net_values - 1.0) * 100).mean())  # 转换为百分比
+            performance['annual_return'] = float(metrics['annual_return'].mean())
+            performance['max_drawdown'] = float(metrics['max_drawdown'].mean())
+            performance['max_drawdown_pct'] = float(metrics['max_drawdown_pct'].mean())
+            performance['sharpe_ratio'] = float(metrics['sharpe_ratio'].mean())
+            performance['win_rate'] = float((metrics['win_rate'] * 100).mean())  # 转换为百分比
             
             # 交易统计
             trade_stats = {
-                'total_trades': total_trades,
-                'winning_trades': winning_trades,
-                'losing_trades': losing_trades,
-                'profit_factor': profit_factor / count if count > 0 else 0
+                'total_trades': int(metrics['total_trades'].sum()),
+                'winning_trades': int(metrics['win_trades'].sum()),
+                'losing_trades': int(metrics['loss_trades'].sum()),
+                'profit_factor': float(metrics['profit_factor'].mean())
             }
             performance['trade_stats'] = trade_stats
         
@@ -146,66 +315,88 @@ class BacktestResultCalculator:
             # 计算交易统计
             total_trades = len(trades) // 2  # 修改为开平仓一组算一次交易
             
-            # 计算每笔交易的盈亏
-            for j, trade in enumerate(trades):
-                if j % 2 == 0 and j+1 < len(trades):  # 开仓交易
-                    open_price = trade['price']
-                    close_price = trades[j+1]['price']
-                    volume = trade['volume']
-                    
-                    # 计算点数盈亏
-                    if trade['action'] == '开多':
-                        points_profit = (close_price - open_price)
-                    elif trade['action'] == '开空':
-                        points_profit = (open_price - close_price)
-                    else:
-                        points_profit = 0
-                    
-                    # 计算金额盈亏（考虑合约乘数）
-                    amount_profit = points_profit * volume * contract_multiplier
-                    
-                    # 计算手续费（支持固定金额和费率两种方式）
-                    if use_fixed_commission:
-                        # 固定金额：元/手 × 手数
-                        open_commission = commission_per_lot * volume
-                        close_commission = commission_close_per_lot * volume
-                    else:
-                        # 费率：成交金额 × 费率
-                        open_commission = open_price * volume * contract_multiplier * commission_rate
-                        close_commission = close_price * volume * contract_multiplier * commission_rate
-                    total_commission = open_commission + close_commission
-                    
-                    # 计算滑点成本（单位滑点 × 手数 × 合约乘数）
-                    open_slippage = trade.get('slippage_cost', 0) * volume * contract_multiplier
-                    close_slippage = trades[j+1].get('slippage_cost', 0) * volume * contract_multiplier
-                    total_slippage = open_slippage + close_slippage
-                    
-                    # 计算净盈亏（扣除手续费，滑点已在成交价格中体现）
-                    net_profit = amount_profit - total_commission
-                    
-                    # 计算保证金占用
-                    margin = max(open_price, close_price) * volume * contract_multiplier * margin_rate
-                    
-                    # 计算收益率
-                    roi = net_profit / margin * 100 if margin > 0 else 0
-                    
-                    # 添加盈亏字段
-                    trades[j]['points_profit'] = 0  # 开仓时点数盈亏为0
-                    trades[j]['amount_profit'] = 0  # 开仓时金额盈亏为0
-                    trades[j]['commission'] = open_commission  # 开仓手续费
-                    trades[j]['slippage'] = open_slippage  # 开仓滑点成本
-                    trades[j]['margin'] = margin  # 保证金占用
-                    
-                    trades[j+1]['points_profit'] = points_profit  # 平仓时记录点数盈亏
-                    trades[j+1]['amount_profit'] = amount_profit  # 平仓时记录金额盈亏
-                    trades[j+1]['commission'] = close_commission  # 平仓手续费
-                    trades[j+1]['slippage'] = close_slippage  # 平仓滑点成本
-                    trades[j+1]['net_profit'] = net_profit  # 净盈亏
-                    trades[j+1]['roi'] = roi  # 收益率
-                    trades[j+1]['profit'] = net_profit  # 兼容旧代码
+            # 将交易记录（字典列表）一次性转换为列式数组，后续配对、统计和权益曲线均按列计算
+            tdf = _trades_to_frame(trades)
+            n_trades = len(tdf)
+            prices = tdf['price'].to_numpy(dtype=np.float64)
+            volumes = tdf['volume'].to_numpy(dtype=np.float64)
+            action_codes = _encode_actions(tdf['action'].to_numpy())
+            slippage_costs = tdf['slippage_cost'].to_numpy(dtype=np.float64)
+            
+            # 逐笔盈亏字段（未赋值的交易保持为0）
+            points_col = np.zeros(n_trades)
+            amount_col = np.zeros(n_trades)
+            commission_col = np.zeros(n_trades)
+            slippage_col = np.zeros(n_trades)
+            net_col = np.zeros(n_trades)
+            
+            # 计算每笔交易的盈亏：偶数位为开仓，紧随其后的一笔为平仓
+            open_idx = np.arange(0, total_trades * 2, 2)
+            close_idx = open_idx + 1
+            open_price = prices[open_idx]
+            close_price = prices[close_idx]
+            volume = volumes[open_idx]
+            open_action = action_codes[open_idx]
+            
+            # 计算点数盈亏
+            points_profit = np.where(open_action == ACTION_OPEN_LONG, close_price - open_price,
+                                     np.where(open_action == ACTION_OPEN_SHORT, open_price - close_price, 0.0))
+            
+            # 计算金额盈亏（考虑合约乘数）
+            amount_profit = points_profit * volume * contract_multiplier
+            
+            # 计算手续费（支持固定金额和费率两种方式）
+            if use_fixed_commission:
+                # 固定金额：元/手 × 手数
+                open_commission = commission_per_lot * volume
+                close_commission = commission_close_per_lot * volume
+            else:
+                # 费率：成交金额 × 费率
+                open_commission = open_price * volume * contract_multiplier * commission_rate
+                close_commission = close_price * volume * contract_multiplier * commission_rate
+            
+            # 计算滑点成本（单位滑点 × 手数 × 合约乘数）
+            open_slippage = slippage_costs[open_idx] * volume * contract_multiplier
+            close_slippage = slippage_costs[close_idx] * volume * contract_multiplier
+            
+            # 计算净盈亏（扣除手续费，滑点已在成交价格中体现）
+            net_profit = amount_profit - (open_commission + close_commission)
+            
+            # 计算保证金占用
+            margin = np.maximum(open_price, close_price) * volume * contract_multiplier * margin_rate
+            
+            # 计算收益率
+            roi = np.divide(net_profit, margin, out=np.zeros(total_trades), where=margin > 0) * 100
+            
+            points_col[close_idx] = points_profit
+            amount_col[close_idx] = amount_profit
+            commission_col[open_idx] = open_commission
+            commission_col[close_idx] = close_commission
+            slippage_col[open_idx] = open_slippage
+            slippage_col[close_idx] = close_slippage
+            net_col[close_idx] = net_profit
+            
+            # 将盈亏字段写回交易记录（报告、图表等仍按字典读取）
+            for j, oc, os_, mg, pp, ap, cc, cs, npf, r in zip(
+                    open_idx.tolist(), open_commission.tolist(), open_slippage.tolist(), margin.tolist(),
+                    points_profit.tolist(), amount_profit.tolist(), close_commission.tolist(),
+                    close_slippage.tolist(), net_profit.tolist(), roi.tolist()):
+                trades[j]['points_profit'] = 0  # 开仓时点数盈亏为0
+                trades[j]['amount_profit'] = 0  # 开仓时金额盈亏为0
+                trades[j]['commission'] = oc  # 开仓手续费
+                trades[j]['slippage'] = os_  # 开仓滑点成本
+                trades[j]['margin'] = mg  # 保证金占用
+                
+                trades[j+1]['points_profit'] = pp  # 平仓时记录点数盈亏
+                trades[j+1]['amount_profit'] = ap  # 平仓时记录金额盈亏
+                trades[j+1]['commission'] = cc  # 平仓手续费
+                trades[j+1]['slippage'] = cs  # 平仓滑点成本
+                trades[j+1]['net_profit'] = npf  # 净盈亏
+                trades[j+1]['roi'] = r  # 收益率
+                trades[j+1]['profit'] = npf  # 兼容旧代码
             
             # 处理未配对的最后一笔开仓交易（如果有）
-            if len(trades) % 2 != 0:
+            if n_trades % 2 != 0:
                 last_trade = trades[-1]
                 if last_trade['action'] in ['开多', '开空']:
                     # 计算开仓手续费
@@ -215,6 +406,7 @@ class BacktestResultCalculator:
                         last_commission = commission_per_lot * last_volume
                     else:
                         last_commission = last_price * last_volume * contract_multiplier * commission_rate
+                    commission_col[-1] = last_commission
                     # 设置手续费
                     last_trade['commission'] = last_commission
                     # 设置其他字段为默认值
@@ -224,20 +416,21 @@ class BacktestResultCalculator:
             
             # 重新计算统计数据
             # 只统计平仓交易的盈亏情况
-            win_trades = sum(1 for t in trades if t.get('net_profit', 0) > 0 and t['action'] in ['平多', '平空'])
-            loss_trades = sum(1 for t in trades if t.get('net_profit', 0) < 0 and t['action'] in ['平多', '平空'])
+            is_close = (action_codes == ACTION_CLOSE_LONG) | (action_codes == ACTION_CLOSE_SHORT)
+            win_trades = int(np.count_nonzero((net_col > 0) & is_close))
+            loss_trades = int(np.count_nonzero((net_col < 0) & is_close))
             win_rate = win_trades / (win_trades + loss_trades) if (win_trades + loss_trades) > 0 else 0
             
             # 计算总盈亏
-            total_points_profit = sum(t.get('points_profit', 0) for t in trades)
-            total_amount_profit = sum(t.get('amount_profit', 0) for t in trades)
-            total_commission = sum(t.get('commission', 0) for t in trades)
-            total_slippage = sum(t.get('slippage', 0) for t in trades)  # 总滑点成本
-            total_net_profit = sum(t.get('net_profit', 0) for t in trades)
+            total_points_profit = float(points_col.sum())
+            total_amount_profit = float(amount_col.sum())
+            total_commission = float(commission_col.sum())
+            total_slippage = float(slippage_col.sum())  # 总滑点成本
+            total_net_profit = float(net_col.sum())
             
             # 计算平均盈亏
-            avg_win = sum(t.get('net_profit', 0) for t in trades if t.get('net_profit', 0) > 0) / win_trades if win_trades > 0 else 0
-            avg_loss = sum(t.get('net_profit', 0) for t in trades if t.get('net_profit', 0) < 0) / loss_trades if loss_trades > 0 else 0
+            avg_win = float(net_col[net_col > 0].sum()) / win_trades if win_trades > 0 else 0
+            avg_loss = float(net_col[net_col < 0].sum()) / loss_trades if loss_trades > 0 else 0
             
             # 修正盈亏比计算方式
             if avg_loss != 0:
@@ -250,194 +443,47 @@ class BacktestResultCalculator:
                 profit_factor = float('inf') if avg_win > 0 else 0
             
             # 修改权益曲线计算方法，考虑持仓盈亏
-            equity_curve = pd.Series(float(initial_capital), index=ds.data.index, dtype=float)  # 净利润曲线（扣除所有成本）
-            gross_equity_curve = pd.Series(float(initial_capital), index=ds.data.index, dtype=float)  # 毛利润曲线（完全不扣除成本）
-            available_cash = initial_capital  # 可用资金（未被占用的资金）
-            total_margin = 0  # 总保证金占用
-            total_equity = initial_capital  # 总权益（可用资金 + 保证金 + 浮动盈亏）
-            # 累计成本追踪（用于计算毛利润曲线）
-            cumulative_commission = 0  # 累计手续费
-            cumulative_slippage = 0  # 累计滑点成本
-            
-            # 持仓管理
-            long_pos = 0  # 多头持仓量
-            long_avg_price = 0  # 多头平均持仓价格
-            short_pos = 0  # 空头持仓量
-            short_avg_price = 0  # 空头平均持仓价格
-            
-            # 按时间排序交易记录并创建副本，避免修改原始数据
-            sorted_trades = sorted(trades.copy(), key=lambda x: x['datetime'])
-            
-            # 遍历每个时间点
-            for i, date in enumerate(ds.data.index):
-                row = ds.data.iloc[i]
-                # K线数据使用close，TICK数据使用LastPrice
-                if 'close' in row:
-                    current_price = row['close']
-                elif 'LastPrice' in row:
-                    current_price = row['LastPrice']
-                elif 'BidPrice1' in row and 'AskPrice1' in row:
-                    current_price = (row['BidPrice1'] + row['AskPrice1']) / 2
-                else:
-                    raise KeyError("数据中未找到价格字段（close/LastPrice/BidPrice1+AskPrice1）")
-                
-                # 处理当前日期的所有交易
-                trades_to_process = [t for t in sorted_trades if t['datetime'] <= date]
-                trades_to_remove = []  # 存储需要移除的交易索引
-                
-                for trade in trades_to_process:
-                    if trade['action'] == '开多':
-                        # 计算开仓成本和保证金
-                        volume = trade['volume']
-                        price = trade['price']
-                        position_cost = price * volume * contract_multiplier
-                        margin_required = position_cost * margin_rate
-                        commission = trade.get('commission', 0)
-                        
-                        # 更新资金（净利润：扣除手续费）
-                        available_cash -= (margin_required + commission)
-                        total_margin += margin_required
-                        
-                        # 累计成本
-                        cumulative_commission += commission
-                        slippage_cost = trade.get('slippage', 0)
-                        cumulative_slippage += slippage_cost
-                        
-                        # 更新多头持仓和平均价格
-                        if long_pos > 0:
-                            # 计算新的加权平均持仓价格
-                            long_avg_price = (long_pos * long_avg_price + volume * price) / (long_pos + volume)
-                        else:
-                            long_avg_price = price
-                        long_pos += volume
-                        
-                    elif trade['action'] == '平多':
-                        # 获取平仓数量和价格
-                        volume = min(trade['volume'], long_pos)  # 确保不超过实际持仓
-                        if volume <= 0:
-                            continue  # 无多头持仓可平，跳过
-                            
-                        price = trade['price']
-                        commission = trade.get('commission', 0)
-                        
-                        # 计算平仓后释放的保证金
-                        position_value = long_avg_price * volume * contract_multiplier
-                        margin_released = position_value * margin_rate
-                        
-                        # 计算平仓盈亏
-                        close_profit = (price - long_avg_price) * volume * contract_multiplier
-                        
-                        # 更新资金（净利润：扣除手续费）
-                        available_cash += (margin_released + close_profit - commission)
-                        total_margin -= margin_released
-                        
-                        # 累计成本
-                        cumulative_commission += commission
-                        slippage_cost = trade.get('slippage', 0)
-                        cumulative_slippage += slippage_cost
-                        
-                        # 更新多头持仓
-                        long_pos -= volume
-                        # 如果完全平仓，重置平均价格
-                        if long_pos <= 0:
-                            long_pos = 0
-                            long_avg_price = 0
-                        
-                    elif trade['action'] == '开空':
-                        # 计算开仓成本和保证金
-                        volume = trade['volume']
-                        price = trade['price']
-                        position_cost = price * volume * contract_multiplier
-                        margin_required = position_cost * margin_rate
-                        commission = trade.get('commission', 0)
-                        
-                        # 更新资金（净利润：扣除手续费）
-                        available_cash -= (margin_required + commission)
-                        total_margin += margin_required
-                        
-                        # 累计成本
-                        cumulative_commission += commission
-                        slippage_cost = trade.get('slippage', 0)
-                        cumulative_slippage += slippage_cost
-                        
-                        # 更新空头持仓和平均价格
-                        if short_pos > 0:
-                            # 计算新的加权平均持仓价格
-                            short_avg_price = (short_pos * short_avg_price + volume * price) / (short_pos + volume)
-                        else:
-                            short_avg_price = price
-                        short_pos += volume
-                        
-                    elif trade['action'] == '平空':
-                        # 获取平仓数量和价格
-                        volume = min(trade['volume'], short_pos)  # 确保不超过实际持仓
-                        if volume <= 0:
-                            continue  # 无空头持仓可平，跳过
-                            
-                        price = trade['price']
-                        commission = trade.get('commission', 0)
-                        
-                        # 计算平仓后释放的保证金
-                        position_value = short_avg_price * volume * contract_multiplier
-                        margin_released = position_value * margin_rate
-                        
-                        # 计算平仓盈亏
-                        close_profit = (short_avg_price - price) * volume * contract_multiplier
-                        
-                        # 更新资金（净利润：扣除手续费）
-                        available_cash += (margin_released + close_profit - commission)
-                        total_margin -= margin_released
-                        
-                        # 累计成本
-                        cumulative_commission += commission
-                        slippage_cost = trade.get('slippage', 0)
-                        cumulative_slippage += slippage_cost
-                        
-                        # 更新空头持仓
-                        short_pos -= volume
-                        # 如果完全平仓，重置平均价格
-                        if short_pos <= 0:
-                            short_pos = 0
-                            short_avg_price = 0
-                    
-                    # 标记交易为待移除，而不是直接移除
-                    trades_to_remove.append(trade)
-                
-                # 在循环之外移除已处理的交易
-                for trade in trades_to_remove:
-                    if trade in sorted_trades:
-                        sorted_trades.remove(trade)
-                
-                # 计算多头浮动盈亏
-                long_floating_pnl = 0
-                if long_pos > 0:
-                    long_floating_pnl = (current_price - long_avg_price) * long_pos * contract_multiplier
-                
-                # 计算空头浮动盈亏
-                short_floating_pnl = 0
-                if short_pos > 0:
-                    short_floating_pnl = (short_avg_price - current_price) * short_pos * contract_multiplier
-                
-                # 计算总浮动盈亏
-                total_floating_pnl = long_floating_pnl + short_floating_pnl
-                
-                # 计算当前总权益（净利润：已扣除成本）
-                total_equity = available_cash + total_margin + total_floating_pnl
-                
-                # 计算毛利润总权益（完全不扣除成本：净权益 + 累计手续费 + 累计滑点）
-                gross_total_equity = total_equity + cumulative_commission + cumulative_slippage
-                
-                # 更新权益曲线
-                equity_curve[date] = total_equity
-                gross_equity_curve[date] = gross_total_equity
+            # K线数据使用close，TICK数据使用LastPrice
+            columns = ds.data.columns
+            if 'close' in columns:
+                bar_prices = ds.data['close'].to_numpy(dtype=np.float64)
+            elif 'LastPrice' in columns:
+                bar_prices = ds.data['LastPrice'].to_numpy(dtype=np.float64)
+            elif 'BidPrice1' in columns and 'AskPrice1' in columns:
+                bar_prices = ((ds.data['BidPrice1'] + ds.data['AskPrice1']) / 2).to_numpy(dtype=np.float64)
+            elif len(ds.data) > 0:
+                raise KeyError("数据中未找到价格字段（close/LastPrice/BidPrice1+AskPrice1）")
+            else:
+                bar_prices = np.zeros(0)
             
-            # 计算期末权益和净值
-            final_equity = equity_curve.iloc[-1] if not equity_curve.empty else initial_capital
-            gross_final_equity = gross_equity_curve.iloc[-1] if not gross_equity_curve.empty else initial_capital
+            # 按时间排序交易记录（稳定排序，同一时间保持原始顺序）
+            trade_dts = pd.DatetimeIndex(pd.to_datetime(tdf['datetime']))
+            order = np.argsort(trade_dts.to_numpy(), kind='stable')
+            
+            # 每笔交易首次被处理的K线：第一根时间不早于该交易的K线
+            trade_bars = ds.data.index.searchsorted(trade_dts[order], side='left')
+            
+            # 按K线回放交易，得到每根K线处理完交易后的资金与持仓状态
+            state = _replay_trades(action_codes[order], prices[order], volumes[order],
+                                   commission_col[order], slippage_col[order], trade_bars, len(ds.data),
+                                   initial_capital, contract_multiplier, margin_rate)
+            
+            # 计算多头、空头浮动盈亏（无持仓时数量为0，浮盈自然为0）
+            long_floating_pnl = state['long_pos'] * (bar_prices - state['long_avg_price']) * contract_multiplier
+            short_floating_pnl = state['short_pos'] * (state['short_avg_price'] - bar_prices) * contract_multiplier
             
-            # 确保期末权益不小于0.01（为了避免负净值）
-            final_equity = max(0.01, final_equity)
-            gross_final_equity = max(0.01, gross_final_equity)
+            # 当前总权益（净利润：已扣除成本）= 可用资金 + 保证金 + 浮动盈亏
+            equity_arr = state['available_cash'] + state['total_margin'] + long_floating_pnl + short_floating_pnl
+            
+            # 毛利润总权益（完全不扣除成本：净权益 + 累计手续费 + 累计滑点）
+            gross_equity_arr = equity_arr + state['cumulative_commission'] + state['cumulative_slippage']
+            
+            # 权益不允许出现负值（为了避免负净值），统一在数组上一次性修正
+            np.maximum(equity_arr, 0.01, out=equity_arr)
+            
+            # 计算期末权益和净值
+            final_equity = float(equity_arr[-1]) if len(equity_arr) > 0 else initial_capital
+            gross_final_equity = max(0.01, float(gross_equity_arr[-1])) if len(gross_equity_arr) > 0 else initial_capital
             
             net_value = final_equity / initial_capital
             
@@ -447,15 +493,12 @@ class BacktestResultCalculator:
             # 毛利润 = 净利润 + 手续费 + 滑点（完全不含任何成本的原始盈亏）
             total_amount_profit = total_net_profit + total_commission + total_slippage
             
-            # 计算最大回撤（使用修改后的权益曲线）
-            if not equity_curve.empty and equity_curve.max() > 0:
-                # 对权益曲线进行修正，不允许出现负值
-                equity_curve = equity_curve.clip(lower=0.01)
-                
-                cummax = equity_curve.cummax()
-                drawdown = (cummax - equity_curve)
-                max_drawdown = drawdown.max()
-                max_drawdown_pct = (drawdown / cummax).max() * 100
+            # 计算最大回撤（使用修正后的权益曲线）
+            if len(equity_arr) > 0:
+                cummax = np.maximum.accumulate(equity_arr)
+                drawdown = cummax - equity_arr
+                max_drawdown = float(drawdown.max())
+                max_drawdown_pct = float((drawdown / cummax).max() * 100)
             else:
                 max_drawdown = 0
                 max_drawdown_pct = 0
@@ -465,9 +508,9 @@ class BacktestResultCalculator:
             annual_return = 0
             sharpe_ratio = 0
             
-            if not equity_curve.empty and len(equity_curve) > 1:
+            if len(equity_arr) > 1:
                 # 将权益曲线按日聚合（取每日最后一个值）
-                equity_with_date = pd.Series(equity_curve.values, index=ds.data.index[:len(equity_curve)])
+                equity_with_date = pd.Series(equity_arr, index=ds.data.index)
                 daily_equity = equity_with_date.resample('D').last().dropna()
                 
                 if len(daily_equity) > 1:
@@ -524,8 +567,13 @@ class BacktestResultCalculator:
                 'sharpe_ratio': sharpe_ratio,
                 'trades': trades,
                 'data': ds.data,
-                'equity_curve': equity_curve,
-                'gross_equity_curve': gross_equity_curve  # 毛利润曲线（不扣除成本）
+                # 内部计算直接使用权益曲线数组和时间索引
+                'equity_curve_arr': equity_arr,  # 净利润曲线（扣除所有成本）
+                'gross_equity_curve_arr': gross_equity_arr,  # 毛利润曲线（不扣除成本）
+                'equity_curve_index': ds.data.index,
+                # 兼容原有的Series键，与上面的数组共享内存，不额外复制数据
+                'equity_curve': pd.Series(equity_arr, index=ds.data.index, dtype=float, copy=False),
+                'gross_equity_curve': pd.Series(gross_equity_arr, index=ds.data.index, dtype=float, copy=False)
             }
             
             # 添加到结果字典
@@ -1,26 +1,562 @@
 import os
+import functools
+import platform
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import matplotlib
 from datetime import datetime
-from PIL import Image
-import matplotlib.image as mpimg
-from scipy.interpolate import make_interp_spline, interp1d
 
-# 设置matplotlib支持中文显示
-matplotlib.use('Agg')  # 使用Agg后端
-# 设置中文字体
-import platform
-system = platform.system()
-if system == 'Windows':
-    plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'Arial Unicode MS']  # 中文字体设置
-elif system == 'Linux':
-    plt.rcParams['font.sans-serif'] = ['WenQuanYi Zen Hei', 'WenQuanYi Micro Hei', 'DejaVu Sans', 'Arial Unicode MS']
-elif system == 'Darwin':  # macOS
-    plt.rcParams['font.sans-serif'] = ['PingFang SC', 'Heiti SC', 'STHeiti', 'Arial Unicode MS']
-plt.rcParams['axes.unicode_minus'] = False  # 解决保存图像负号'-'显示为方块的问题
-plt.rcParams['font.family'] = 'sans-serif'  # 使用上面设置的sans-serif字体
+from .backtest_results import get_equity_series
+from .render_worker import RenderWorker, render_jobs, shutdown_workers
+
+# matplotlib、scipy、PIL 导入开销较大，首次绘图时由 _ensure_plot_imports 加载，
+# 禁用可视化（NO_VISUALIZATION）时不会导入
+plt = None
+Image = None
+LineCollection = None
+PolyCollection = None
+make_interp_spline = None
+interp1d = None
+
+
+def _ensure_plot_imports():
+    """导入绘图相关模块并设置matplotlib，只在首次调用时执行"""
+    global plt, Image, LineCollection, PolyCollection, make_interp_spline, interp1d
+    if plt is not None:
+        return
+    
+    import matplotlib
+    # 设置matplotlib支持中文显示
+    matplotlib.use('Agg')  # 使用Agg后端
+    import matplotlib.pyplot as plt
+    from PIL import Image
+    from matplotlib.collections import LineCollection, PolyCollection
+    from scipy.interpolate import make_interp_spline, interp1d
+    
+    # 设置中文字体
+    system = platform.system()
+    if system == 'Windows':
+        plt.rcParams['font.sans-serif'] = ['SimHei', 'Microsoft YaHei', 'SimSun', 'Arial Unicode MS']  # 中文字体设置
+    elif system == 'Linux':
+        plt.rcParams['font.sans-serif'] = ['WenQuanYi Zen Hei', 'WenQuanYi Micro Hei', 'DejaVu Sans', 'Arial Unicode MS']
+    elif system == 'Darwin':  # macOS
+        plt.rcParams['font.sans-serif'] = ['PingFang SC', 'Heiti SC', 'STHeiti', 'Arial Unicode MS']
+    plt.rcParams['axes.unicode_minus'] = False  # 解决保存图像负号'-'显示为方块的问题
+    plt.rcParams['font.family'] = 'sans-serif'  # 使用上面设置的sans-serif字体
+    plt.rcParams['agg.path.chunksize'] = 10000  # 长序列路径分块渲染，避免Agg在超长路径上过慢或溢出
+    plt.rcParams['path.simplify'] = True  # 合并肉眼不可分辨的线段，加快长价格序列的栅格化
+    plt.rcParams['path.simplify_threshold'] = 1.0
+
+
+# 超过该点数的曲线不再做样条平滑：像素分辨率远小于数据点数，平滑效果不可见，
+# 直接绘制原始数据并交给matplotlib的路径简化处理
+_SMOOTH_MAX_POINTS = 2000
+
+# 样条曲线的求值点数上限：图表宽22英寸、100dpi约2200像素，更多的点肉眼不可见
+_SMOOTH_EVAL_POINTS = 2500
+
+# 单品种回测图表用到的行情列（K线的OHLC或TICK的价格字段）
+_CHART_COLUMNS = ['open', 'high', 'low', 'close', 'LastPrice', 'BidPrice1', 'AskPrice1']
+
+# K线和交易图中收盘价折线的最大绘制点数，超过时按步长抽样
+_PRICE_LINE_MAX_POINTS = 5000
+
+# PNG保存参数：zlib压缩级别1，编码速度比Pillow默认级别6快数倍，文件略大
+_PNG_PIL_KWARGS = {'compress_level': 1}
+
+# K线和交易图中各交易动作（含别名）的标记样式：交易动作 -> (标记, 颜色, 标签)，
+# 按此顺序绘制，不在表中的动作不绘制
+_ACTION_STYLE = {
+    '开多': ('^', 'r', '买入'),
+    '买多': ('^', 'r', '买入'),
+    '开空': ('v', 'g', '卖出'),
+    '卖空': ('v', 'g', '卖出'),
+    '平多': ('o', 'g', '平多'),
+    '卖多': ('o', 'g', '平多'),
+    '平空': ('o', 'r', '平空'),
+    '买空': ('o', 'r', '平空'),
+}
+
+# K线和交易图中逐笔标注平仓盈亏的最大交易数，超过时改为列出盈亏最大的几笔
+_PROFIT_LABEL_MAX_TRADES = 500
+_PROFIT_SUMMARY_TOP_N = 10
+
+# K线和交易图必需的K线列
+_PRICE_CHART_REQUIRED_COLUMNS = frozenset(('datetime', 'open', 'high', 'low', 'close'))
+
+# K线和交易图中需要标注盈亏的平仓动作
+_PRICE_CHART_CLOSE_ACTIONS = ('平多', '卖多', '平空', '买空')
+
+# 字典列表形式K线转换时的字段类型，日期保持原始对象，由后续pd.to_datetime统一解析
+_KLINE_RECORD_DTYPES = {
+    'datetime': object,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+}
+
+# 回测图表中各交易动作的标记样式：(颜色, 标记)
+_TRADE_MARKER_STYLES = {
+    '开多': ('red', '^'),
+    '平多': ('blue', 'v'),
+    '开空': ('green', 'v'),
+    '平空': ('purple', '^'),
+}
+
+
+def _compute_drawdown(equity):
+    """计算回撤百分比
+    
+    Args:
+        equity: 权益（或净值）数组，float64
+        
+    Returns:
+        回撤百分比数组，历史最高值不大于0时回撤记为0
+    """
+    cummax = np.maximum.accumulate(equity)
+    dd_pct = np.zeros_like(equity)
+    np.divide(cummax - equity, cummax, out=dd_pct, where=cummax > 0)
+    return dd_pct * 100.0
+
+
+
+def _locate_dates(index, dates):
+    """查找日期在索引中的位置
+    
+    Args:
+        index: 时间索引（可以包含重复时间）
+        dates: 待查找的日期序列
+        
+    Returns:
+        位置数组，重复时间取第一次出现的位置，不存在时为-1
+    """
+    dates = pd.DatetimeIndex(dates)
+    if index.is_unique:
+        return index.get_indexer(dates)
+    first = ~index.duplicated(keep='first')
+    positions = np.flatnonzero(first)
+    idxs = index[first].get_indexer(dates)
+    return np.where(idxs >= 0, positions[idxs], -1)
+
+
+def _reuse_figure(cached, build, data_axes, remove_others=False):
+    """复用已创建的Figure：尚未创建时调用build创建，否则清空数据子图后直接返回
+    
+    同一布局的图表反复绘制时复用同一个Figure，可以避免每张图都重新分配
+    大尺寸画布的像素缓冲区。
+    
+    Args:
+        cached: 之前创建的 (fig, ...) 元组，尚未创建时为None
+        build: 创建Figure的函数，返回 (fig, ...) 元组
+        data_axes: 从元组中取出数据子图的函数
+        remove_others: 是否移除数据子图以外的子图（每次绘图时重新添加的Logo子图）
+        
+    Returns:
+        tuple: 复用或新创建的 (fig, ...) 元组
+    """
+    if cached is None:
+        return build()
+    axes = data_axes(cached)
+    if remove_others:
+        for ax in list(cached[0].axes):
+            if ax not in axes:
+                ax.remove()
+    for ax in axes:
+        ax.cla()
+    return cached
+
+
+# 单品种回测图表复用的Figure、网格及子图（每个进程一份），首次绘图时创建
+_backtest_figure = None
+
+
+def _create_backtest_figure():
+    """创建单品种回测图表的Figure
+    
+    Returns:
+        tuple: (fig, gs, (价格图, 收益曲线图, 回撤图))
+    """
+    # 增加整体高度为24，宽度为22，为顶部LOGO留出足够空间
+    fig = plt.figure(figsize=(22, 24))
+    
+    # 创建网格布局，为顶部LOGO留出空间
+    gs = fig.add_gridspec(4, 1, height_ratios=[0.8, 3.5, 2.5, 1.2])
+    
+    # 创建三个子图，保持原有比例，共享X轴刻度
+    ax1 = fig.add_subplot(gs[1])  # 价格图
+    axes = (
+        ax1,
+        fig.add_subplot(gs[2], sharex=ax1),  # 收益曲线图
+        fig.add_subplot(gs[3], sharex=ax1),  # 回撤图
+    )
+    return fig, gs, axes
+
+
+def _get_backtest_figure():
+    """获取单品种回测图表的Figure，首次调用时创建，之后移除上一张图的Logo子图、清空数据子图复用
+    
+    Returns:
+        tuple: (fig, gs, (价格图, 收益曲线图, 回撤图))
+    """
+    global _backtest_figure
+    _backtest_figure = _reuse_figure(_backtest_figure, _create_backtest_figure,
+                                     lambda cached: cached[2], remove_others=True)
+    return _backtest_figure
+
+
+def _add_logo(fig, gs, logo_array):
+    """在网格顶部添加Logo水印
+    
+    Args:
+        fig: 图表Figure
+        gs: 网格布局，Logo绘制在gs[0]
+        logo_array: Logo图片数组，为None时不添加
+    """
+    if logo_array is not None:
+        logo_ax = fig.add_subplot(gs[0])  
+        logo_ax.imshow(logo_array)
+        logo_ax.axis('off')  
+
+
+def _render_one(ds_payload, result_payload, result_dir, timestamp, logo_array):
+    """绘制单个数据源的回测图表（价格图、收益曲线图和回撤图）
+    
+    只依赖可序列化的输入，既可以在主进程中调用，也可以提交到子进程并行绘制。
+    
+    Args:
+        ds_payload: 数据源信息，包含symbol、kline_period、adjust_label、绘图所需的
+            行情数据data，以及交易记录数组trade_dts、trade_prices、trade_actions、
+            trade_net_profits（已有权益曲线时为None）
+        result_payload: 回测结果信息，包含equity_curve（可为None）和initial_capital
+        result_dir: 图表保存目录
+        timestamp: 文件名使用的时间戳
+        logo_array: Logo图片数组，为None时不添加水印
+        
+    Returns:
+        tuple: (图表文件路径, 绘制过程中的日志消息列表)
+    """
+    _ensure_plot_imports()
+    
+    logs = []
+    symbol = ds_payload['symbol']
+    kline_period = ds_payload['kline_period']
+    adjust_label = ds_payload['adjust_label']
+    trade_dts = ds_payload['trade_dts']
+    trade_prices = ds_payload['trade_prices']
+    trade_actions = ds_payload['trade_actions']
+    
+    # 获取（复用）图表 - 3个子图：价格图、收益曲线图和回撤图
+    fig, gs, (ax1, ax2, ax3) = _get_backtest_figure()
+    
+    # 获取实际有数据的交易日期和价格（只读，无需复制）
+    df = ds_payload['data']
+    
+    # 获取所有实际交易日期
+    trading_dates = df.index.tolist()
+    
+    # 一次哈希查找得到所有交易日期在trading_dates中的位置（不存在时为-1）
+    trade_idxs = _locate_dates(df.index, trade_dts)
+    
+    # 创建X轴位置（使用整数索引而不是日期）
+    x_positions = list(range(len(trading_dates)))
+    
+    # 判断是K线数据还是TICK数据
+    is_kline_data = all(col in df.columns for col in ['open', 'high', 'low', 'close'])
+    
+    if is_kline_data:
+        # ========== K线数据：绘制蜡烛图 ==========
+        ohlc = df[['open', 'high', 'low', 'close']].to_numpy(dtype=np.float64, copy=False)
+        opens, highs, lows, closes = ohlc.T
+        prices = closes  # 用于后续Y轴范围计算
+        
+        # 绘制K线（蜡烛图）
+        width = 0.6  # K线宽度
+        width2 = 0.1  # 影线宽度
+        
+        # 根据涨跌确定颜色（中国习惯：涨红跌绿）
+        x = np.asarray(x_positions, dtype=float)
+        colors = np.where(closes >= opens, 'red', 'green')
+        
+        # 所有影线（上下影线）合并为一个LineCollection
+        wick_segments = np.stack([np.column_stack([x, lows]), np.column_stack([x, highs])], axis=1)
+        ax1.add_collection(LineCollection(wick_segments, colors=colors, linewidths=width2 * 10, zorder=1, rasterized=True))
+        
+        # 所有实体合并为一个PolyCollection（十字星的实体高度为0，只绘制出边框线）
+        body_bottom = np.minimum(opens, closes)
+        body_top = np.maximum(opens, closes)
+        left = x - width / 2
+        right = x + width / 2
+        body_verts = np.stack([
+            np.column_stack([left, body_bottom]),
+            np.column_stack([right, body_bottom]),
+            np.column_stack([right, body_top]),
+            np.column_stack([left, body_top]),
+        ], axis=1)
+        ax1.add_collection(PolyCollection(body_verts, facecolors=colors, edgecolors=colors, linewidths=1, zorder=2, rasterized=True))
+        ax1.autoscale_view()
+    else:
+        # ========== TICK数据：绘制价格曲线 ==========
+        if 'close' in df.columns:
+            prices = df['close'].to_numpy()
+        elif 'LastPrice' in df.columns:
+            prices = df['LastPrice'].to_numpy()
+        elif 'BidPrice1' in df.columns and 'AskPrice1' in df.columns:
+            prices = ((df['BidPrice1'] + df['AskPrice1']) / 2).to_numpy()
+        else:
+            raise KeyError("数据中未找到价格字段（close/LastPrice/BidPrice1+AskPrice1）")
+        
+        # 绘制价格曲线
+        if 3 < len(x_positions) <= _SMOOTH_MAX_POINTS:
+            try:
+                x_smooth = np.linspace(min(x_positions), max(x_positions), min(len(x_positions) * 3, _SMOOTH_EVAL_POINTS))
+                if len(x_positions) > 10:
+                    spline = make_interp_spline(x_positions, prices, k=3)
+                    prices_smooth = spline(x_smooth)
+                else:
+                    interp_func = interp1d(x_positions, prices, kind='linear')
+                    prices_smooth = interp_func(x_smooth)
+                ax1.plot(x_smooth, prices_smooth, label='价格', color='black', linewidth=1, alpha=0.8, zorder=1)
+            except Exception as e:
+                logs.append(f"价格曲线平滑处理失败，使用原始绘图: {e}")
+                ax1.plot(x_positions, prices, label='价格', color='black', linewidth=1, alpha=0.8, zorder=1)
+        else:
+            # 数据点太少或太多，使用原始绘图
+            ax1.plot(x_positions, prices, label='价格', color='black', linewidth=1, alpha=0.8, zorder=1)
+    
+    # 绘制交易点，设置较高的zorder值，确保它们显示在价格曲线之上
+    # 交易日期不在trading_dates中的交易跳过
+    valid = trade_idxs >= 0
+    
+    # 每种交易动作只调用一次scatter
+    for action, (color, marker) in _TRADE_MARKER_STYLES.items():
+        mask = valid & (trade_actions == action)
+        if mask.any():
+            ax1.scatter(trade_idxs[mask], trade_prices[mask], color=color, marker=marker, s=100, zorder=5)
+    
+    # 添加图例
+    from matplotlib.lines import Line2D
+    custom_lines = [
+        Line2D([0], [0], marker='^', color='red', markersize=10, linestyle=''),
+        Line2D([0], [0], marker='v', color='blue', markersize=10, linestyle=''),
+        Line2D([0], [0], marker='v', color='green', markersize=10, linestyle=''),
+        Line2D([0], [0], marker='^', color='purple', markersize=10, linestyle='')
+    ]
+    ax1.legend(custom_lines, ['开多', '平多', '开空', '平空'], loc='upper right')
+    
+    # 设置标题
+    ax1.set_title(f"{symbol} {kline_period} {adjust_label} 回测结果", fontsize=16, fontproperties=plt.rcParams['font.sans-serif'][0])
+    ax1.grid(True)
+    
+    # 动态调整价格图的Y轴范围
+    if is_kline_data:
+        # K线图使用最高价和最低价
+        min_price = lows.min()
+        max_price = highs.max()
+    else:
+        min_price = prices.min()
+        max_price = prices.max()
+    
+    if max_price > min_price:
+        price_range = max_price - min_price
+        # 添加边距使图表更美观
+        padding = price_range * 0.05  # 5%的边距
+        ax1.set_ylim(min_price - padding, max_price + padding)
+    
+    # 获取计算好的权益曲线
+    equity_curve = result_payload['equity_curve']
+    if equity_curve is None:
+        # 如果没有计算好的权益曲线，则重新计算：按交易所在K线位置一次性累加净利润
+        net_profits = ds_payload['trade_net_profits']
+        pnl = np.zeros(len(df.index))
+        np.add.at(pnl, trade_idxs[valid], net_profits[valid])
+        
+        # 累积求和并添加初始资金
+        initial_capital = result_payload['initial_capital']
+        equity_curve = pd.Series(initial_capital + pnl.cumsum(), index=df.index)
+    
+    # 绘制收益曲线（使用整数索引）
+    equity_values = equity_curve.reindex(df.index).to_numpy()
+    
+    # 应用曲线平滑处理，使曲线更加平滑
+    if 3 < len(x_positions) <= _SMOOTH_MAX_POINTS:  # 确保有足够的点进行插值，长序列直接绘制原始数据
+        try:
+            # 创建更多插值点以获得更平滑的曲线
+            x_smooth = np.linspace(min(x_positions), max(x_positions), min(len(x_positions) * 3, _SMOOTH_EVAL_POINTS))
+            
+            # 使用三次样条插值（适合数据量较多的曲线）
+            if len(x_positions) > 10:
+                spline = make_interp_spline(x_positions, equity_values, k=3)
+                equity_smooth = spline(x_smooth)
+            else:
+                # 对于数据点较少的情况，使用线性插值
+                interp_func = interp1d(x_positions, equity_values, kind='linear')
+                equity_smooth = interp_func(x_smooth)
+            
+            # 绘制平滑后的曲线
+            ax2.plot(x_smooth, equity_smooth, label='收益曲线', color='blue', linewidth=2)
+        except Exception as e:
+            # 如果插值失败，回退到原始绘图方式
+            logs.append(f"曲线平滑处理失败，使用原始绘图: {e}")
+            ax2.plot(x_positions, equity_values, label='收益曲线', color='blue', linewidth=2)
+    else:
+        # 数据点太少或太多，使用原始绘图
+        ax2.plot(x_positions, equity_values, label='收益曲线', color='blue', linewidth=2)
+    
+    ax2.set_title('收益曲线', fontsize=16, fontproperties=plt.rcParams['font.sans-serif'][0])
+    ax2.legend(fontsize=12, prop={'family': plt.rcParams['font.sans-serif'][0]})
+    ax2.grid(True)
+    
+    # 动态调整收益曲线图的Y轴范围
+    if len(equity_values) > 0:
+        min_equity = equity_values.min()
+        max_equity = equity_values.max()
+        equity_range = max_equity - min_equity
+        
+        # 使用相对范围，避免小范围时图形过度放大
+        min_range_pct = 0.02  # 最小范围为2%
+        relative_range = equity_range / max_equity if max_equity > 0 else 0
+        
+        if relative_range < min_range_pct:
+            # 如果实际范围小于最小范围，则使用中心点扩展
+            center = (min_equity + max_equity) / 2
+            min_equity = center * (1 - min_range_pct / 2)
+            max_equity = center * (1 + min_range_pct / 2)
+        else:
+            # 添加边距使图表更美观
+            padding = equity_range * 0.1  # 10%的边距
+            min_equity = min_equity - padding
+            max_equity = max_equity + padding
+        
+        ax2.set_ylim(min_equity, max_equity)
+    
+    # 计算并绘制回撤曲线
+    if len(equity_values) > 0:
+        # 计算回撤百分比
+        drawdown_pct = _compute_drawdown(np.asarray(equity_values, dtype=np.float64))
+        
+        # 绘制回撤曲线（阶梯填充并栅格化，减少长序列的矢量路径顶点）
+        ax3.fill_between(x_positions, 0, drawdown_pct, color='red', alpha=0.3, step='post', rasterized=True)
+        ax3.set_rasterization_zorder(0)
+        ax3.set_title('回撤百分比', fontsize=16, fontproperties=plt.rcParams['font.sans-serif'][0])
+        ax3.set_ylabel('回撤 (%)', fontsize=14, fontproperties=plt.rcParams['font.sans-serif'][0])
+        ax3.grid(True)
+        
+        # 设置回撤图的Y轴范围，确保0点在图表顶部
+        max_drawdown = drawdown_pct.max() if len(drawdown_pct) > 0 else 0
+        # 添加一些边距
+        padding = max(max_drawdown * 0.1, 1)  # 至少1%的边距
+        ax3.set_ylim(max_drawdown + padding, 0)
+    
+    # 设置X轴，只显示部分日期标签，避免拥挤
+    # 计算适当的刻度间隔，使标签不会过度拥挤
+    num_dates = len(trading_dates)
+    if num_dates <= 10:
+        tick_step = 1
+    elif num_dates <= 20:
+        tick_step = 2
+    elif num_dates <= 50:
+        tick_step = 5
+    elif num_dates <= 100:
+        tick_step = 10
+    else:
+        tick_step = num_dates // 10  # 大约10个刻度
+    
+    # 创建刻度位置列表
+    tick_indices = list(range(0, num_dates, tick_step))
+    if num_dates - 1 not in tick_indices:
+        tick_indices.append(num_dates - 1)  # 确保最后一个日期也显示
+    
+    # 三个子图共享X轴，刻度和标签只需设置一次
+    tick_labels = [trading_dates[i].strftime('%Y-%m-%d') for i in tick_indices]
+    ax1.set_xticks(tick_indices)
+    ax1.set_xticklabels(tick_labels)
+    for ax in (ax1, ax2, ax3):
+        ax.tick_params(axis='x', labelrotation=45, labelsize=12)
+        ax.tick_params(axis='y', labelsize=12)
+    
+    # 在每个子图左下角添加网站标记
+    ax1.text(0.01, 0.02, 'by quant789.com', transform=ax1.transAxes, fontsize=20, color='gray')
+    ax2.text(0.01, 0.02, 'by quant789.com', transform=ax2.transAxes, fontsize=20, color='gray')
+    ax3.text(0.01, 0.02, 'by quant789.com', transform=ax3.transAxes, fontsize=20, color='gray')
+    
+    # 调整布局
+    fig.tight_layout()
+    
+    # 添加Logo水印
+    try:
+        _add_logo(fig, gs, logo_array)
+    except Exception as e:
+        logs.append(f"lg: {e}")
+    
+    # 保存图表
+    image_path = os.path.join(result_dir, f"{symbol}_{kline_period}_{adjust_label}_backtest_chart_{timestamp}.png")
+    fig.savefig(image_path, dpi=100, pil_kwargs=_PNG_PIL_KWARGS)
+    
+    logs.append(f"回测图表已保存到: {image_path}")
+    return image_path, logs
+
+
+def _to_datetime_array(values):
+    """把一列日期一次性转换为datetime64数组
+    
+    Args:
+        values: 日期Series，可以是datetime64、日期字符串/对象或整数时间戳（纳秒）
+        
+    Returns:
+        datetime64 数组，已是datetime64类型时不做转换
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy()
+    if pd.api.types.is_numeric_dtype(values):
+        # 整数时间戳先转为int64，避免浮点/无符号类型走慢速路径
+        return pd.to_datetime(values.astype(np.int64)).to_numpy()
+    try:
+        # 先按ISO8601解析，省去逐个字符串推断格式
+        return pd.to_datetime(values, format='ISO8601', cache=True).to_numpy()
+    except (ValueError, TypeError):
+        pass
+    try:
+        return pd.to_datetime(values, cache=True).to_numpy()
+    except (ValueError, TypeError):
+        # 日期格式不统一时退回逐个解析
+        return pd.DatetimeIndex([pd.to_datetime(value) for value in values]).to_numpy()
+
+
+def _klines_from_records(records):
+    """把字典列表形式的K线转换为DataFrame
+    
+    按预先声明的字段类型用np.fromiter一次性构建结构化数组，避免pd.DataFrame逐行推断类型；
+    只保留绘图用到的字段，记录缺字段或数值无法转换时退回pd.DataFrame。
+    
+    Args:
+        records: K线字典列表
+        
+    Returns:
+        K线DataFrame
+    """
+    fields = [field for field in _KLINE_RECORD_DTYPES if field in records[0]]
+    dtype = np.dtype([(field, _KLINE_RECORD_DTYPES[field]) for field in fields])
+    try:
+        arr = np.fromiter((tuple(record[field] for field in fields) for record in records),
+                          dtype=dtype, count=len(records))
+    except (KeyError, TypeError, ValueError):
+        return pd.DataFrame(records)
+    return pd.DataFrame({field: arr[field] for field in fields})
+
+
+def _write_png(rgba, path):
+    """把已渲染的RGBA像素写入PNG文件，在写盘线程池中执行
+    
+    Args:
+        rgba: Figure渲染后的RGBA像素数组副本
+        path: 图片保存路径
+    """
+    Image.fromarray(rgba).save(path, dpi=(100, 100), **_PNG_PIL_KWARGS)
+
+
 
 class BacktestVisualizer:
     """回测可视化工具，负责绘制各种回测图表"""
@@ -32,7 +568,19 @@ class BacktestVisualizer:
             logger: 日志管理器实例
         """
         self.logger = logger
-        self.logo_array = self._load_logo()
+        # 常驻渲染进程，首次并行绘制单品种图表时启动，之后的绘图复用；
+        # 调用 close()、可视化工具被回收或解释器退出时关闭
+        self._render_workers = []
+        self._render_workers_finalizer = weakref.finalize(self, shutdown_workers, self._render_workers)
+        # K线和交易图、综合收益图复用的Figure和子图，首次绘图时创建
+        self._price_figure = None
+        self._combined_figure = None
+        # Logo在首次绘图时才加载，见logo_array属性
+        self._logo_array = None
+        self._logo_loaded = False
+        # PNG编码写盘线程池（zlib压缩时释放GIL），以及尚未完成的写盘任务
+        self._png_executor = None
+        self._png_writes = []
     
     def log(self, message):
         """记录日志
@@ -45,8 +593,82 @@ class BacktestVisualizer:
         else:
             print(message)
     
-    def _load_logo(self):
-        """加载Logo图片"""
+    def _get_render_workers(self, count):
+        """获取指定数量的常驻渲染进程，已退出的进程会被替换
+        
+        Args:
+            count: 需要的进程数
+            
+        Returns:
+            list: RenderWorker列表
+        """
+        # 原地更新列表，finalize回调持有的是同一个列表
+        self._render_workers[:] = [worker for worker in self._render_workers if worker.is_alive()]
+        while len(self._render_workers) < count:
+            self._render_workers.append(RenderWorker())
+        return self._render_workers[:count]
+    
+    def _close_render_workers(self):
+        """关闭常驻渲染进程"""
+        shutdown_workers(self._render_workers)
+    
+    def close(self):
+        """关闭常驻渲染进程和PNG写盘线程池"""
+        self._close_render_workers()
+        self._wait_png_writes()
+        if self._png_executor is not None:
+            self._png_executor.shutdown()
+            self._png_executor = None
+    
+    def _save_png_async(self, fig, path):
+        """在当前线程渲染Figure，PNG编码和写盘交给线程池
+        
+        像素缓冲区会被复制，提交后即可继续复用Figure绘制下一张图。
+        
+        Args:
+            fig: 要保存的Figure
+            path: 图片保存路径
+        """
+        fig.canvas.draw()
+        rgba = np.array(fig.canvas.buffer_rgba())
+        if self._png_executor is None:
+            self._png_executor = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+        self._png_writes.append((path, self._png_executor.submit(_write_png, rgba, path)))
+    
+    def _wait_png_writes(self):
+        """等待所有PNG写盘任务完成
+        
+        Returns:
+            set: 写盘失败的图片路径
+        """
+        failed = set()
+        for path, future in self._png_writes:
+            try:
+                future.result()
+            except Exception as e:
+                self.log(f"保存图表 {path} 时出错: {str(e)}")
+                failed.add(path)
+        self._png_writes = []
+        return failed
+    
+    @property
+    def logo_array(self):
+        """Logo图片数组（只读），首次使用时加载，不存在或加载失败时为None"""
+        if not self._logo_loaded:
+            self._logo_array, logo_message = BacktestVisualizer._get_logo()
+            self.log(logo_message)
+            self._logo_loaded = True
+        return self._logo_array
+    
+    @classmethod
+    @functools.lru_cache(maxsize=1)
+    def _get_logo(cls):
+        """加载Logo图片，每个进程只解码、缩放并转换为RGBA一次
+        
+        Returns:
+            tuple: (只读的RGBA Logo数组或None, 加载结果日志消息)
+        """
+        _ensure_plot_imports()
         logo_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), "assets", "squirrel_quant_logo.png")
         if os.path.exists(logo_path):
             try:
@@ -64,24 +686,84 @@ class BacktestVisualizer:
                         logo_img = logo_img.resize((logo_width, logo_height), 3)  # 3 = LANCZOS/ANTIALIAS
                     except:
                         logo_img = logo_img.resize((logo_width, logo_height))
-                logo_array = np.array(logo_img)
-                self.log("成功加载Logo图片")
-                return logo_array
+                # 统一缓存为RGBA数组，imshow绘制时无需再做颜色转换
+                logo_array = np.asarray(logo_img.convert('RGBA')).copy()
+                # 各实例和图表共享同一数组，设为只读防止被意外修改
+                logo_array.setflags(write=False)
+                return logo_array, "成功加载Logo图片"
             except Exception as e:
-                self.log(f"加载Logo图片失败: {e}")
-                return None
+                return None, f"加载Logo图片失败: {e}"
         else:
-            self.log(f"Logo图片不存在: {logo_path}")
-            return None
+            return None, f"Logo图片不存在: {logo_path}"
+    
+    def _get_price_figure(self):
+        """获取K线和交易图的Figure，首次调用时创建，之后清空价格子图复用
+        
+        布局固定，不再调用tight_layout，Logo水印只在创建时添加一次。
+        
+        Returns:
+            tuple: (fig, 价格图)
+        """
+        self._price_figure = _reuse_figure(self._price_figure, self._create_price_figure,
+                                           lambda cached: cached[1:])
+        return self._price_figure
+    
+    def _create_price_figure(self):
+        """创建K线和交易图的Figure
+        
+        Returns:
+            tuple: (fig, 价格图)
+        """
+        # dpi固定为100，与直接从画布缓冲区写出的PNG尺寸一致
+        fig = plt.figure(figsize=(16, 10), dpi=100)
+        
+        # 创建网格布局，为顶部LOGO留出空间
+        gs = fig.add_gridspec(2, 1, height_ratios=[0.8, 4.5])
+        fig.subplots_adjust(left=0.06, right=0.98, top=0.98, bottom=0.08, hspace=0.1)
+        
+        # 添加Logo水印
+        self._add_logo_watermark(fig, gs)
+        
+        # 创建价格图
+        ax = fig.add_subplot(gs[1])
+        return fig, ax
+    
+    def _get_combined_figure(self):
+        """获取综合收益图表的Figure，首次调用时创建，之后清空两个数据子图复用
+        
+        Logo水印只在创建时添加一次。
+        
+        Returns:
+            tuple: (fig, 收益曲线图, 回撤图)
+        """
+        self._combined_figure = _reuse_figure(self._combined_figure, self._create_combined_figure,
+                                              lambda cached: cached[1:])
+        return self._combined_figure
+    
+    def _create_combined_figure(self):
+        """创建综合收益图表的Figure
+        
+        Returns:
+            tuple: (fig, 收益曲线图, 回撤图)
+        """
+        fig = plt.figure(figsize=(22, 22))
+        
+        # 创建网格布局，为顶部LOGO留出空间
+        gs = fig.add_gridspec(3, 1, height_ratios=[0.8, 3.5, 1.2])
+        
+        # 创建两个子图
+        ax1 = fig.add_subplot(gs[1])  # 收益曲线图
+        ax2 = fig.add_subplot(gs[2], sharex=ax1)  # 回撤图，与收益曲线图共享X轴
+        
+        # 添加Logo水印
+        self._add_logo_watermark(fig, gs)
+        return fig, ax1, ax2
     
     def _add_logo_watermark(self, fig, gs):
-        if self.logo_array is not None:
-            try:
-                logo_ax = fig.add_subplot(gs[0])  
-                logo_ax.imshow(self.logo_array)
-                logo_ax.axis('off')  
-            except Exception as e:
-                self.log(f"lg: {e}")
+        try:
+            _add_logo(fig, gs, self.logo_array)
+        except Exception as e:
+            self.log(f"lg: {e}")
     
     def generate_charts(self, results):
         """生成回测图表
@@ -102,6 +784,8 @@ class BacktestVisualizer:
             # 完全静默模式，不生成任何输出
             return []
             
+        _ensure_plot_imports()
+            
         # 检查是否有结果可以可视化
         if not results:
             self.log("没有可用的回测结果，无法生成图表")
@@ -131,6 +815,10 @@ class BacktestVisualizer:
                 # 生成K线和交易图
                 self._generate_price_chart(result, chart_path)
                 chart_paths.append(chart_path)
+            
+            # 等待所有图表写盘完成后再返回路径
+            failed = self._wait_png_writes()
+            chart_paths = [path for path in chart_paths if path not in failed]
                 
             # 注释掉组合权益曲线图生成逻辑，避免调用不存在的方法
             # if any('equity_curve' in result for result in results.values() if isinstance(result, dict)):
@@ -152,12 +840,16 @@ class BacktestVisualizer:
             
         return chart_paths
         
-    def plot_results(self, multi_data_source, results):
+    def plot_results(self, multi_data_source, results, max_workers=None, keep_workers=True):
         """绘制回测结果图表
         
         Args:
             multi_data_source: 多数据源实例
             results: 回测结果字典
+            max_workers: 绘制单品种图表的最大常驻渲染进程数，默认为CPU核数；为1或只有一个数据源需要绘制时
+                在当前进程中逐个绘制
+            keep_workers: 绘制完成后是否保留渲染进程供下次调用复用，默认保留；保留的进程在调用 close()、
+                可视化工具被回收或解释器退出时关闭
             
         Returns:
             image_paths: 图表文件路径列表
@@ -172,6 +864,8 @@ class BacktestVisualizer:
             # 完全静默模式，不生成任何输出
             return []
             
+        _ensure_plot_imports()
+            
         # 创建结果目录
         result_dir = "backtest_results"
         if not os.path.exists(result_dir):
@@ -182,7 +876,15 @@ class BacktestVisualizer:
         
         image_paths = []
         
-        # 遍历所有数据源，绘制单个品种的回测结果图表
+        # 遍历所有数据源，整理单个品种回测图表的绘图任务
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # 每个数据源的复权标签和结果键只计算一次，后续各循环共用
+        adjust_labels = ['不复权' if ds.adjust_type == '0' else '后复权' for ds in multi_data_source.data_sources]
+        result_keys = [f"{ds.symbol}_{ds.kline_period}_{adjust_label}"
+                       for ds, adjust_label in zip(multi_data_source.data_sources, adjust_labels)]
+        
+        jobs = []
         for i, ds in enumerate(multi_data_source.data_sources):
             # 获取交易记录
             trades = ds.trades
@@ -193,298 +895,63 @@ class BacktestVisualizer:
             
             self.log(f"绘制数据源 #{i} ({ds.symbol} {ds.kline_period}) 的回测图表")
             
-            # 创建图表 - 现在有3个子图：价格图、收益曲线图和回撤图
-            # 增加整体高度为24，宽度为22，为顶部LOGO留出足够空间
-            fig = plt.figure(figsize=(22, 24))
-            
-            # 创建网格布局，为顶部LOGO留出空间
-            gs = fig.add_gridspec(4, 1, height_ratios=[0.8, 3.5, 2.5, 1.2])
-            
-            # 创建三个子图，保持原有比例
-            ax1 = fig.add_subplot(gs[1])  # 价格图
-            ax2 = fig.add_subplot(gs[2])  # 收益曲线图
-            ax3 = fig.add_subplot(gs[3])  # 回撤图
-            
-            # 获取实际有数据的交易日期和价格
-            df = ds.data.copy()
-            
-            # 获取所有实际交易日期
-            trading_dates = df.index.tolist()
-            
-            # 创建X轴位置（使用整数索引而不是日期）
-            x_positions = list(range(len(trading_dates)))
-            
-            # 判断是K线数据还是TICK数据
-            is_kline_data = all(col in df.columns for col in ['open', 'high', 'low', 'close'])
-            
-            if is_kline_data:
-                # ========== K线数据：绘制蜡烛图 ==========
-                opens = df['open'].values
-                highs = df['high'].values
-                lows = df['low'].values
-                closes = df['close'].values
-                prices = closes  # 用于后续Y轴范围计算
-                
-                # 绘制K线（蜡烛图）
-                width = 0.6  # K线宽度
-                width2 = 0.1  # 影线宽度
-                
-                for i in range(len(x_positions)):
-                    x = x_positions[i]
-                    o, h, l, c = opens[i], highs[i], lows[i], closes[i]
-                    
-                    # 根据涨跌确定颜色（中国习惯：涨红跌绿）
-                    if c >= o:
-                        color = 'red'
-                        body_bottom = o
-                        body_height = c - o
-                    else:
-                        color = 'green'
-                        body_bottom = c
-                        body_height = o - c
-                    
-                    # 绘制影线（上下影线）
-                    ax1.plot([x, x], [l, h], color=color, linewidth=width2 * 10, zorder=1)
-                    
-                    # 绘制实体
-                    if body_height > 0:
-                        rect = plt.Rectangle((x - width/2, body_bottom), width, body_height,
-                                           facecolor=color, edgecolor=color, zorder=2)
-                        ax1.add_patch(rect)
-                    else:
-                        # 十字星：开盘=收盘
-                        ax1.plot([x - width/2, x + width/2], [o, o], color=color, linewidth=1, zorder=2)
-            else:
-                # ========== TICK数据：绘制价格曲线 ==========
-                if 'close' in df.columns:
-                    prices = df['close'].values
-                elif 'LastPrice' in df.columns:
-                    prices = df['LastPrice'].values
-                elif 'BidPrice1' in df.columns and 'AskPrice1' in df.columns:
-                    prices = ((df['BidPrice1'] + df['AskPrice1']) / 2).values
-                else:
-                    raise KeyError("数据中未找到价格字段（close/LastPrice/BidPrice1+AskPrice1）")
-                
-                # 绘制价格曲线
-                if len(x_positions) > 3:
-                    try:
-                        x_smooth = np.linspace(min(x_positions), max(x_positions), len(x_positions) * 3)
-                        if len(x_positions) > 10:
-                            spline = make_interp_spline(x_positions, prices, k=3)
-                            prices_smooth = spline(x_smooth)
-                        else:
-                            interp_func = interp1d(x_positions, prices, kind='linear')
-                            prices_smooth = interp_func(x_smooth)
-                        ax1.plot(x_smooth, prices_smooth, label='价格', color='black', linewidth=1, alpha=0.8, zorder=1)
-                    except Exception as e:
-                        self.log(f"价格曲线平滑处理失败，使用原始绘图: {e}")
-                        ax1.plot(x_positions, prices, label='价格', color='black', linewidth=1, alpha=0.8, zorder=1)
-                else:
-                    ax1.plot(x_positions, prices, label='价格', color='black', linewidth=1, alpha=0.8, zorder=1)
-            
-            # 绘制交易点，设置较高的zorder值，确保它们显示在价格曲线之上
-            for trade in trades:
-                # 找到交易日期在trading_dates中的位置
-                try:
-                    date_idx = trading_dates.index(trade['datetime'])
-                    
-                    if trade['action'] == '开多':
-                        ax1.scatter(date_idx, trade['price'], color='red', marker='^', s=100, zorder=5)
-                    elif trade['action'] == '平多':
-                        ax1.scatter(date_idx, trade['price'], color='blue', marker='v', s=100, zorder=5)
-                    elif trade['action'] == '开空':
-                        ax1.scatter(date_idx, trade['price'], color='green', marker='v', s=100, zorder=5)
-                    elif trade['action'] == '平空':
-                        ax1.scatter(date_idx, trade['price'], color='purple', marker='^', s=100, zorder=5)
-                except ValueError:
-                    # 如果交易日期不在trading_dates中，则跳过
-                    continue
-            
-            # 添加图例
-            from matplotlib.lines import Line2D
-            custom_lines = [
-                Line2D([0], [0], marker='^', color='red', markersize=10, linestyle=''),
-                Line2D([0], [0], marker='v', color='blue', markersize=10, linestyle=''),
-                Line2D([0], [0], marker='v', color='green', markersize=10, linestyle=''),
-                Line2D([0], [0], marker='^', color='purple', markersize=10, linestyle='')
-            ]
-            ax1.legend(custom_lines, ['开多', '平多', '开空', '平空'], loc='upper right')
-            
-            # 设置标题
-            ax1.set_title(f"{ds.symbol} {ds.kline_period} {'不复权' if ds.adjust_type == '0' else '后复权'} 回测结果", fontsize=16, fontproperties=plt.rcParams['font.sans-serif'][0])
-            ax1.grid(True)
-            
-            # 动态调整价格图的Y轴范围
-            if is_kline_data:
-                # K线图使用最高价和最低价
-                min_price = min(lows)
-                max_price = max(highs)
-            else:
-                min_price = min(prices)
-                max_price = max(prices)
-            
-            if max_price > min_price:
-                price_range = max_price - min_price
-                # 添加边距使图表更美观
-                padding = price_range * 0.05  # 5%的边距
-                ax1.set_ylim(min_price - padding, max_price + padding)
-            
-            # 获取计算好的权益曲线
-            if 'equity_curve' in results.get(f"{ds.symbol}_{ds.kline_period}_{'不复权' if ds.adjust_type == '0' else '后复权'}", {}):
-                equity_curve = results[f"{ds.symbol}_{ds.kline_period}_{'不复权' if ds.adjust_type == '0' else '后复权'}"]["equity_curve"]
-            else:
-                # 如果没有计算好的权益曲线，则重新计算
-                equity_curve = pd.Series(0.0, index=ds.data.index)
-                for trade in trades:
-                    if 'net_profit' in trade and trade['net_profit'] != 0:
-                        equity_curve[trade['datetime']] += trade['net_profit']
-                
-                # 累积求和并添加初始资金
-                initial_capital = results.get(f"{ds.symbol}_{ds.kline_period}_{'不复权' if ds.adjust_type == '0' else '后复权'}", {}).get('initial_capital', 100000.0)
-                equity_curve = initial_capital + equity_curve.cumsum()
+            adjust_label = adjust_labels[i]
+            result = results.get(result_keys[i], {})
+            equity_curve = get_equity_series(result)
             
-            # 绘制收益曲线（使用整数索引）
-            equity_values = [equity_curve[date] for date in trading_dates]
-            
-            # 应用曲线平滑处理，使曲线更加平滑
-            if len(x_positions) > 3:  # 确保有足够的点进行插值
+            # 交易记录按字段转为连续数组，绘图只使用这些数组
+            n_trades = len(trades)
+            ds_payload = {
+                'symbol': ds.symbol,
+                'kline_period': ds.kline_period,
+                'adjust_label': adjust_label,
+                # 只传递绘图用到的行情列，减少子进程间的数据传输
+                'data': ds.data[[col for col in _CHART_COLUMNS if col in ds.data.columns]],
+                'trade_dts': np.fromiter((trade['datetime'] for trade in trades), dtype='datetime64[ns]', count=n_trades),
+                'trade_prices': np.fromiter((trade['price'] for trade in trades), dtype=np.float64, count=n_trades),
+                'trade_actions': np.array([trade['action'] for trade in trades]),
+                # 没有计算好的权益曲线时，由交易净利润重新计算
+                'trade_net_profits': None if equity_curve is not None else np.fromiter(
+                    (trade.get('net_profit', 0.0) for trade in trades), dtype=np.float64, count=n_trades),
+            }
+            result_payload = {
+                'equity_curve': equity_curve,
+                'initial_capital': result.get('initial_capital', 100000.0),
+            }
+            jobs.append({
+                'ds_payload': ds_payload,
+                'result_payload': result_payload,
+                'result_dir': result_dir,
+                'timestamp': timestamp,
+                'logo_array': self.logo_array,
+            })
+        
+        # 各数据源的图表相互独立，有多个任务时交给常驻渲染进程并行绘制；
+        # 只有一个任务（或只允许一个进程）时在当前进程中绘制，不为单张图启动子进程
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        n_workers = min(max_workers, len(jobs))
+        rendered = None
+        try:
+            if n_workers > 1:
                 try:
-                    # 创建更多插值点以获得更平滑的曲线
-                    x_smooth = np.linspace(min(x_positions), max(x_positions), len(x_positions) * 3)
-                    
-                    # 使用三次样条插值（适合数据量较多的曲线）
-                    if len(x_positions) > 10:
-                        spline = make_interp_spline(x_positions, equity_values, k=3)
-                        equity_smooth = spline(x_smooth)
-                    else:
-                        # 对于数据点较少的情况，使用线性插值
-                        interp_func = interp1d(x_positions, equity_values, kind='linear')
-                        equity_smooth = interp_func(x_smooth)
-                    
-                    # 绘制平滑后的曲线
-                    ax2.plot(x_smooth, equity_smooth, label='收益曲线', color='blue', linewidth=2)
+                    workers = self._get_render_workers(n_workers)
+                    rendered = render_jobs(workers, jobs)
                 except Exception as e:
-                    # 如果插值失败，回退到原始绘图方式
-                    self.log(f"曲线平滑处理失败，使用原始绘图: {e}")
-                    ax2.plot(x_positions, equity_values, label='收益曲线', color='blue', linewidth=2)
-            else:
-                # 数据点太少，使用原始绘图
-                ax2.plot(x_positions, equity_values, label='收益曲线', color='blue', linewidth=2)
-            
-            ax2.set_title('收益曲线', fontsize=16, fontproperties=plt.rcParams['font.sans-serif'][0])
-            ax2.legend(fontsize=12, prop={'family': plt.rcParams['font.sans-serif'][0]})
-            ax2.grid(True)
-            
-            # 动态调整收益曲线图的Y轴范围
-            if equity_values:
-                min_equity = min(equity_values)
-                max_equity = max(equity_values)
-                equity_range = max_equity - min_equity
-                
-                # 使用相对范围，避免小范围时图形过度放大
-                min_range_pct = 0.02  # 最小范围为2%
-                relative_range = equity_range / max_equity if max_equity > 0 else 0
-                
-                if relative_range < min_range_pct:
-                    # 如果实际范围小于最小范围，则使用中心点扩展
-                    center = (min_equity + max_equity) / 2
-                    min_equity = center * (1 - min_range_pct / 2)
-                    max_equity = center * (1 + min_range_pct / 2)
-                else:
-                    # 添加边距使图表更美观
-                    padding = equity_range * 0.1  # 10%的边距
-                    min_equity = min_equity - padding
-                    max_equity = max_equity + padding
-                
-                ax2.set_ylim(min_equity, max_equity)
-            
-            # 计算并绘制回撤曲线
-            if equity_values:
-                # 计算累计最大值
-                cummax_values = []
-                max_value = float('-inf')
-                
-                # 正确计算累计最大值
-                for value in equity_values:
-                    if value > max_value:
-                        max_value = value
-                    cummax_values.append(max_value)
-                
-                # 计算回撤
-                drawdown = []
-                drawdown_pct = []
-                
-                for i in range(len(equity_values)):
-                    # 避免除以零或负数
-                    if cummax_values[i] > 0:
-                        dd = cummax_values[i] - equity_values[i]
-                        dd_pct = (dd / cummax_values[i]) * 100
-                        drawdown.append(dd)
-                        drawdown_pct.append(dd_pct)
-                    else:
-                        drawdown.append(0)
-                        drawdown_pct.append(0)
-                
-                # 绘制回撤曲线
-                ax3.fill_between(x_positions, 0, drawdown_pct, color='red', alpha=0.3)
-                ax3.set_title('回撤百分比', fontsize=16, fontproperties=plt.rcParams['font.sans-serif'][0])
-                ax3.set_ylabel('回撤 (%)', fontsize=14, fontproperties=plt.rcParams['font.sans-serif'][0])
-                ax3.grid(True)
-                
-                # 设置回撤图的Y轴范围，确保0点在图表顶部
-                max_drawdown = max(drawdown_pct) if drawdown_pct else 0
-                # 添加一些边距
-                padding = max(max_drawdown * 0.1, 1)  # 至少1%的边距
-                ax3.set_ylim(max_drawdown + padding, 0)
-            
-            # 设置X轴，只显示部分日期标签，避免拥挤
-            # 计算适当的刻度间隔，使标签不会过度拥挤
-            num_dates = len(trading_dates)
-            if num_dates <= 10:
-                tick_step = 1
-            elif num_dates <= 20:
-                tick_step = 2
-            elif num_dates <= 50:
-                tick_step = 5
-            elif num_dates <= 100:
-                tick_step = 10
-            else:
-                tick_step = num_dates // 10  # 大约10个刻度
-            
-            # 创建刻度位置列表
-            tick_indices = list(range(0, num_dates, tick_step))
-            if num_dates - 1 not in tick_indices:
-                tick_indices.append(num_dates - 1)  # 确保最后一个日期也显示
-            
-            ax1.set_xticks(tick_indices)
-            ax1.set_xticklabels([trading_dates[i].strftime('%Y-%m-%d') for i in tick_indices], rotation=45, fontsize=12)
-            ax1.tick_params(axis='y', labelsize=12)
-            ax2.set_xticks(tick_indices)
-            ax2.set_xticklabels([trading_dates[i].strftime('%Y-%m-%d') for i in tick_indices], rotation=45, fontsize=12)
-            ax2.tick_params(axis='y', labelsize=12)
-            ax3.set_xticks(tick_indices)
-            ax3.set_xticklabels([trading_dates[i].strftime('%Y-%m-%d') for i in tick_indices], rotation=45, fontsize=12)
-            ax3.tick_params(axis='y', labelsize=12)
-            
-            # 在每个子图左下角添加网站标记
-            ax1.text(0.01, 0.02, 'by quant789.com', transform=ax1.transAxes, fontsize=20, color='gray')
-            ax2.text(0.01, 0.02, 'by quant789.com', transform=ax2.transAxes, fontsize=20, color='gray')
-            ax3.text(0.01, 0.02, 'by quant789.com', transform=ax3.transAxes, fontsize=20, color='gray')
-            
-            # 调整布局
-            plt.tight_layout()
-            
-            # 添加Logo水印
-            self._add_logo_watermark(fig, gs)
-            
-            # 保存图表
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            image_path = os.path.join(result_dir, f"{ds.symbol}_{ds.kline_period}_{'不复权' if ds.adjust_type == '0' else '后复权'}_backtest_chart_{timestamp}.png")
-            plt.savefig(image_path)
-            plt.close()
-            
+                    self.log(f"渲染进程绘制图表失败，改为在当前进程中绘制: {e}")
+                    self._close_render_workers()
+                    rendered = None
+            if rendered is None:
+                rendered = [_render_one(**job) for job in jobs]
+        finally:
+            # 不保留时在本次调用结束后立即关闭渲染进程
+            if not keep_workers:
+                self._close_render_workers()
+        
+        for image_path, logs in rendered:
+            for message in logs:
+                self.log(message)
             image_paths.append(image_path)
-            self.log(f"回测图表已保存到: {image_path}")
         
         # 创建综合收益图表
         self.log("\n=== 开始创建综合收益图表 ===")
@@ -494,11 +961,12 @@ class BacktestVisualizer:
         all_symbols = []
         
         for i, ds in enumerate(multi_data_source.data_sources):
-            key = f"{ds.symbol}_{ds.kline_period}_{'不复权' if ds.adjust_type == '0' else '后复权'}"
-            if key in results and 'equity_curve' in results[key]:
-                all_equity_curves.append(results[key]['equity_curve'])
+            key = result_keys[i]
+            equity_curve = get_equity_series(results[key]) if key in results else None
+            if equity_curve is not None:
+                all_equity_curves.append(equity_curve)
                 all_symbols.append(f"{ds.symbol}_{ds.kline_period}")
-                self.log(f"添加数据源 #{i} 的权益曲线，长度: {len(results[key]['equity_curve'])}")
+                self.log(f"添加数据源 #{i} 的权益曲线，长度: {len(equity_curve)}")
         
         self.log(f"共找到 {len(all_equity_curves)} 个权益曲线")
         
@@ -508,66 +976,54 @@ class BacktestVisualizer:
                 # 找到共同的日期范围
                 # 如果只有一个数据源，直接使用它的所有日期
                 if len(all_equity_curves) == 1:
-                    common_dates = list(all_equity_curves[0].index)
+                    common_dates = all_equity_curves[0].index
                     self.log(f"只有一个数据源，使用其所有日期: {len(common_dates)} 个日期")
                 else:
                     # 找到多个数据源的共同日期
-                    common_dates = set(all_equity_curves[0].index)
-                    for curve in all_equity_curves[1:]:
-                        common_dates = common_dates.intersection(set(curve.index))
-                    common_dates = sorted(list(common_dates))
+                    # 在datetime64数组上求交集，结果已排序去重
+                    common_dates = pd.DatetimeIndex(functools.reduce(
+                        np.intersect1d, [curve.index.values for curve in all_equity_curves]))
                     self.log(f"多个数据源的共同日期: {len(common_dates)} 个日期")
                 
-                if not common_dates:
+                if len(common_dates) == 0:
                     self.log("没有找到共同日期，使用第一个权益曲线的全部日期")
-                    common_dates = sorted(list(all_equity_curves[0].index))
+                    common_dates = all_equity_curves[0].index.sort_values()
                 
                 self.log(f"共同日期范围: {common_dates[0]} 到 {common_dates[-1]}, 共 {len(common_dates)} 个日期")
                 
                 # 创建综合收益图表
                 self.log("创建综合收益图表...")
-                fig = plt.figure(figsize=(22, 22))
-                
-                # 创建网格布局，为顶部LOGO留出空间
-                gs = fig.add_gridspec(3, 1, height_ratios=[0.8, 3.5, 1.2])
-                
-                # 创建两个子图
-                ax1 = fig.add_subplot(gs[1])  # 收益曲线图
-                ax2 = fig.add_subplot(gs[2])  # 回撤图
-                
-                # 添加Logo水印
-                self._add_logo_watermark(fig, gs)
+                fig, ax1, ax2 = self._get_combined_figure()
                 
                 # 创建X轴位置
                 x_positions = list(range(len(common_dates)))
                 
                 # 获取各品种的初始资金
                 initial_capitals = {}
-                for i, ds in enumerate(multi_data_source.data_sources):
-                    key = f"{ds.symbol}_{ds.kline_period}_{'不复权' if ds.adjust_type == '0' else '后复权'}"
+                for ds, key in zip(multi_data_source.data_sources, result_keys):
                     if key in results:
                         initial_capitals[ds.symbol] = results[key].get('initial_capital', 100000.0)
                 
                 # 计算总初始资金
                 total_initial_capital = sum(initial_capitals.values())
                 
-                # 绘制各个品种的收益曲线
+                # 将各品种权益曲线对齐到共同日期并折算为净值，缺失日期按1.0处理
+                # 每条曲线直接写入预分配矩阵的对应行，不生成中间数组
+                equity_matrix = np.empty((len(all_equity_curves), len(common_dates)))
                 for i, equity_curve in enumerate(all_equity_curves):
-                    symbol = all_symbols[i].split('_')[0]
-                    initial_capital = initial_capitals.get(symbol, 100000.0)
-                    
-                    # 计算每个日期的净值
-                    equity_values = []
-                    for date in common_dates:
-                        if date in equity_curve.index:
-                            equity_values.append(equity_curve[date] / initial_capital)
-                        else:
-                            equity_values.append(1.0)
+                    initial_capital = initial_capitals.get(all_symbols[i].split('_')[0], 100000.0)
+                    np.divide(equity_curve.reindex(common_dates).to_numpy(dtype=np.float64), initial_capital,
+                              out=equity_matrix[i])
+                np.nan_to_num(equity_matrix, copy=False, nan=1.0)
+                
+                # 绘制各个品种的收益曲线
+                for i in range(len(all_equity_curves)):
+                    equity_values = equity_matrix[i]
                     
                     # 应用曲线平滑处理
-                    if len(x_positions) > 3:
+                    if 3 < len(x_positions) <= _SMOOTH_MAX_POINTS:
                         try:
-                            x_smooth = np.linspace(min(x_positions), max(x_positions), len(x_positions) * 3)
+                            x_smooth = np.linspace(min(x_positions), max(x_positions), min(len(x_positions) * 3, _SMOOTH_EVAL_POINTS))
                             if len(x_positions) > 10:
                                 spline = make_interp_spline(x_positions, equity_values, k=3)
                                 equity_smooth = spline(x_smooth)
@@ -581,33 +1037,16 @@ class BacktestVisualizer:
                     else:
                         ax1.plot(x_positions, equity_values, label=all_symbols[i])
                 
-                # 计算综合收益曲线
-                combined_equity = []
-                for date in common_dates:
-                    curve_net_values = []
-                    for j, curve in enumerate(all_equity_curves):
-                        symbol = all_symbols[j].split('_')[0]
-                        initial_capital = initial_capitals.get(symbol, 100000.0)
-                        if date in curve.index:
-                            curve_net_values.append(curve[date] / initial_capital)
-                        else:
-                            curve_net_values.append(1.0)
-                    
-                    # 计算所有曲线的平均净值
-                    if curve_net_values:
-                        avg_net_value = sum(curve_net_values) / len(curve_net_values)
-                    else:
-                        avg_net_value = 1.0
-                    
-                    combined_equity.append(avg_net_value)
+                # 计算综合收益曲线（所有曲线的平均净值）
+                combined_equity = equity_matrix.mean(axis=0)
                 
                 # 绘制综合收益曲线
                 label = '综合净值' if len(all_equity_curves) > 1 else '策略净值'
                 
                 # 应用曲线平滑处理
-                if len(x_positions) > 3:
+                if 3 < len(x_positions) <= _SMOOTH_MAX_POINTS:
                     try:
-                        x_smooth = np.linspace(min(x_positions), max(x_positions), len(x_positions) * 3)
+                        x_smooth = np.linspace(min(x_positions), max(x_positions), min(len(x_positions) * 3, _SMOOTH_EVAL_POINTS))
                         if len(x_positions) > 10:
                             spline = make_interp_spline(x_positions, combined_equity, k=3)
                             equity_smooth = spline(x_smooth)
@@ -630,33 +1069,19 @@ class BacktestVisualizer:
                 ax1.text(0.01, 0.02, 'by quant789.com', transform=ax1.transAxes, fontsize=20, color='gray')
                 
                 # 计算并绘制回撤曲线
-                if combined_equity:
-                    # 计算累计最大值
-                    cummax_values = []
-                    max_value = float('-inf')
+                if len(combined_equity) > 0:
+                    # 计算回撤百分比
+                    drawdown_pct = _compute_drawdown(combined_equity)
                     
-                    for value in combined_equity:
-                        if value > max_value:
-                            max_value = value
-                        cummax_values.append(max_value)
-                    
-                    # 计算回撤
-                    drawdown_pct = []
-                    for i in range(len(combined_equity)):
-                        if cummax_values[i] > 0:
-                            dd_pct = ((cummax_values[i] - combined_equity[i]) / cummax_values[i]) * 100
-                            drawdown_pct.append(dd_pct)
-                        else:
-                            drawdown_pct.append(0)
-                    
-                    # 绘制回撤曲线
-                    ax2.fill_between(x_positions, 0, drawdown_pct, color='red', alpha=0.3)
+                    # 绘制回撤曲线（阶梯填充并栅格化，减少长序列的矢量路径顶点）
+                    ax2.fill_between(x_positions, 0, drawdown_pct, color='red', alpha=0.3, step='post', rasterized=True)
+                    ax2.set_rasterization_zorder(0)
                     ax2.set_title('综合回撤百分比', fontsize=16, fontproperties=plt.rcParams['font.sans-serif'][0])
                     ax2.set_ylabel('回撤 (%)', fontsize=14, fontproperties=plt.rcParams['font.sans-serif'][0])
                     ax2.grid(True)
                     
                     # 设置回撤图的Y轴范围
-                    max_drawdown = max(drawdown_pct) if drawdown_pct else 0
+                    max_drawdown = drawdown_pct.max() if len(drawdown_pct) > 0 else 0
                     padding = max(max_drawdown * 0.1, 1)
                     ax2.set_ylim(max_drawdown + padding, 0)
                 
@@ -671,18 +1096,17 @@ class BacktestVisualizer:
                     tick_indices.append(num_dates - 1)
                 
                 ax1.set_xticks(tick_indices)
-                ax1.set_xticklabels([common_dates[i].strftime('%Y-%m-%d') for i in tick_indices], rotation=45, fontsize=12)
-                ax2.set_xticks(tick_indices)
-                ax2.set_xticklabels([common_dates[i].strftime('%Y-%m-%d') for i in tick_indices], rotation=45, fontsize=12)
+                ax1.set_xticklabels([common_dates[i].strftime('%Y-%m-%d') for i in tick_indices])
+                for ax in (ax1, ax2):
+                    ax.tick_params(axis='x', labelrotation=45, labelsize=12)
                 
                 # 调整布局
-                plt.tight_layout()
+                fig.tight_layout()
                 
-                # 保存综合收益图表
+                # 保存综合收益图表（复用Figure，不关闭）
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 combined_image_path = os.path.join(result_dir, f"combined_equity_chart_{timestamp}.png")
-                plt.savefig(combined_image_path)
-                plt.close()
+                fig.savefig(combined_image_path, dpi=100, pil_kwargs=_PNG_PIL_KWARGS)
                 
                 image_paths.append(combined_image_path)
                 self.log(f"综合收益图表已保存到: {combined_image_path}")
@@ -690,12 +1114,42 @@ class BacktestVisualizer:
                 self.log(f"创建综合收益图表时出错: {str(e)}")
                 import traceback
                 self.log(traceback.format_exc())
+                # 出错的Figure状态不确定，下次重新创建
+                if self._combined_figure is not None:
+                    plt.close(self._combined_figure[0])
+                    self._combined_figure = None
         else:
             self.log("没有找到任何权益曲线，无法创建综合收益图表")
         
         self.log("=== 绘制回测图表完成 ===\n")
         return image_paths 
 
+    def _add_profit_summary(self, ax, close_times, close_profits):
+        """在价格图右上角用一个文本框列出盈利和亏损最大的几笔平仓交易
+        
+        Args:
+            ax: 价格图
+            close_times: 平仓时间数组
+            close_profits: 平仓净盈亏数组
+        """
+        if len(close_profits) == 0:
+            return
+        order = np.argsort(close_profits, kind='stable')
+        wins = [i for i in order[::-1][:_PROFIT_SUMMARY_TOP_N] if close_profits[i] > 0]
+        losses = [i for i in order[:_PROFIT_SUMMARY_TOP_N] if close_profits[i] <= 0]
+        
+        lines = [f"平仓 {len(close_profits)} 笔，盈亏标注已省略"]
+        if wins:
+            lines.append("最大盈利:")
+            lines.extend(f"  {pd.Timestamp(close_times[i]):%Y-%m-%d %H:%M}  +{close_profits[i]:.2f}" for i in wins)
+        if losses:
+            lines.append("最大亏损:")
+            lines.extend(f"  {pd.Timestamp(close_times[i]):%Y-%m-%d %H:%M}  {close_profits[i]:.2f}" for i in losses)
+        
+        props = dict(boxstyle='round', facecolor='white', alpha=0.6)
+        ax.text(0.98, 0.98, "\n".join(lines), transform=ax.transAxes, fontsize=9,
+                verticalalignment='top', horizontalalignment='right', multialignment='left', bbox=props)
+    
     def _generate_price_chart(self, result, chart_path):
         """生成K线和交易图
         
@@ -714,60 +1168,46 @@ class BacktestVisualizer:
             trades = result.get('trades', [])
             klines = result.get('klines', pd.DataFrame())
             
-            # 检查数据可用性
-            if not trades or klines.empty:
-                self.log(f"无足够数据生成 {symbol}_{kline_period} 的图表")
-                return False
-                
-            # 如果klines不是DataFrame，尝试转换
+            # 如果klines不是DataFrame，尝试转换（需在检查是否为空之前，列表没有empty属性）
             if not isinstance(klines, pd.DataFrame):
                 self.log(f"K线数据格式错误，尝试进行转换")
                 # 尝试将字典列表转换为DataFrame
                 if isinstance(klines, list) and len(klines) > 0 and isinstance(klines[0], dict):
-                    klines = pd.DataFrame(klines)
+                    klines = _klines_from_records(klines)
                 else:
                     self.log(f"无法转换K线数据为DataFrame，无法生成图表")
                     return False
             
-            # 创建图表 - 现在只有1个子图：价格图
-            fig = plt.figure(figsize=(16, 10))
-            
-            # 创建网格布局，为顶部LOGO留出空间
-            gs = fig.add_gridspec(2, 1, height_ratios=[0.8, 4.5])
-            
-            # 添加Logo水印
-            self._add_logo_watermark(fig, gs)
-            
-            # 创建价格图
-            ax = fig.add_subplot(gs[1])
+            # 检查数据可用性
+            if not trades or klines.empty:
+                self.log(f"无足够数据生成 {symbol}_{kline_period} 的图表")
+                return False
             
             # 绘制K线图
-            if 'datetime' in klines.columns and 'open' in klines.columns and 'high' in klines.columns and 'low' in klines.columns and 'close' in klines.columns:
-                dates = pd.to_datetime(klines['datetime'])
-                opens = klines['open']
-                highs = klines['high']
-                lows = klines['low']
-                closes = klines['close']
-                
-                # 绘制收盘价折线图
-                ax.plot(dates, closes, color='blue', linewidth=1, label='收盘价')
-                
-                # 标出最高价和最低价
-                highest_idx = highs.idxmax()
-                lowest_idx = lows.idxmin()
-                
-                # 获取具体的日期和价格值（处理pandas Series）
-                import numpy as np
-                high_date = dates.loc[highest_idx]
-                high_price = highs.loc[highest_idx]
-                low_date = dates.loc[lowest_idx]
-                low_price = lows.loc[lowest_idx]
-                
-                # 如果是timestamp对象，转换为datetime
-                if hasattr(high_date, 'to_pydatetime'):
-                    high_date = high_date.to_pydatetime()
-                if hasattr(low_date, 'to_pydatetime'):
-                    low_date = low_date.to_pydatetime()
+            if _PRICE_CHART_REQUIRED_COLUMNS <= set(klines.columns):
+                # 日期列只转换一次，转换后的K线写回结果字典，再次绘图时直接使用
+                if not pd.api.types.is_datetime64_any_dtype(klines['datetime']):
+                    klines = klines.assign(datetime=_to_datetime_array(klines['datetime']))
+                    result['klines'] = klines
+                
+                # 日期和价格统一转为numpy数组，后续按位置取值，不经过pandas索引
+                dates = klines['datetime'].to_numpy()
+                highs, lows, closes = (klines[col].to_numpy(dtype=np.float64) for col in ('high', 'low', 'close'))
+                
+                # 获取（复用）图表 - 只有1个子图：价格图
+                fig, ax = self._get_price_figure()
+                
+                # 绘制收盘价折线图，超长序列按固定步长抽样，像素分辨率下与完整序列无差别
+                stride = max(1, len(closes) // _PRICE_LINE_MAX_POINTS)
+                ax.plot(dates[::stride], closes[::stride], color='blue', linewidth=1, label='收盘价')
+                
+                # 标出最高价和最低价（与idxmax/idxmin一致，忽略NaN）
+                highest_pos = int(np.nanargmax(highs))
+                lowest_pos = int(np.nanargmin(lows))
+                high_date = dates[highest_pos]
+                high_price = highs[highest_pos]
+                low_date = dates[lowest_pos]
+                low_price = lows[lowest_pos]
                 
                 ax.plot(high_date, float(high_price), 'r^', markersize=10)
                 ax.text(high_date, float(high_price), 
@@ -777,37 +1217,38 @@ class BacktestVisualizer:
                 ax.text(low_date, float(low_price), 
                         f" 最低: {float(low_price):.2f}", verticalalignment='top')
                 
-                # 绘制交易点
-                for trade in trades:
-                    if 'datetime' in trade and 'price' in trade and 'action' in trade:
-                        trade_time = pd.to_datetime(trade['datetime'])
-                        price = trade['price']
-                        action = trade['action']
-                        
-                        if action in ['开多', '买多']:
-                            marker = '^'  # 上三角
-                            color = 'r'
-                            label = '买入'
-                        elif action in ['开空', '卖空']:
-                            marker = 'v'  # 下三角
-                            color = 'g'
-                            label = '卖出'
-                        elif action in ['平多', '卖多']:
-                            marker = 'o'  # 圆圈
-                            color = 'g'
-                            label = '平多'
-                        elif action in ['平空', '买空']:
-                            marker = 'o'  # 圆圈
-                            color = 'r'
-                            label = '平空'
-                        else:
-                            continue
-                            
-                        ax.plot(trade_time, price, marker=marker, markersize=8, color=color)
-                        
-                        # 显示盈亏信息
-                        if action in ['平多', '卖多', '平空', '买空'] and 'net_profit' in trade:
-                            net_profit = trade.get('net_profit', 0)
+                # 绘制交易点：交易记录一次性转为DataFrame，每类交易动作只调用一次scatter
+                tdf = pd.DataFrame(trades)
+                if {'datetime', 'price', 'action'} <= set(tdf.columns):
+                    tdf = tdf[tdf['datetime'].notna() & tdf['price'].notna() & tdf['action'].notna()]
+                    # 所有交易时间一次性转换，不在循环中逐笔调用pd.to_datetime
+                    trade_times = _to_datetime_array(tdf['datetime'])
+                    trade_prices = tdf['price'].to_numpy()
+                    # 交易动作编码为整数，只对出现过的动作查一次样式表
+                    action_codes, unique_actions = pd.factorize(tdf['action'])
+                    style_codes = {}
+                    for code, action in enumerate(unique_actions):
+                        style = _ACTION_STYLE.get(action)
+                        if style is not None:
+                            style_codes.setdefault(style, []).append(code)
+                    
+                    for style in dict.fromkeys(_ACTION_STYLE.values()):
+                        if style in style_codes:
+                            marker, color, label = style
+                            mask = np.isin(action_codes, style_codes[style])
+                            ax.scatter(trade_times[mask], trade_prices[mask], marker=marker, c=color, s=64, zorder=3, label=label)
+                    
+                    # 显示平仓交易的盈亏信息
+                    if 'net_profit' in tdf.columns:
+                        net_profits = tdf['net_profit'].to_numpy(dtype=np.float64)
+                        close_codes = [code for code, action in enumerate(unique_actions) if action in _PRICE_CHART_CLOSE_ACTIONS]
+                        close_idxs = np.flatnonzero(np.isin(action_codes, close_codes) & ~np.isnan(net_profits))
+                        if len(trades) > _PROFIT_LABEL_MAX_TRADES:
+                            # 交易过多时逐笔文字既看不清又拖慢渲染，只在右上角汇总盈亏最大的几笔
+                            self._add_profit_summary(ax, trade_times[close_idxs], net_profits[close_idxs])
+                            close_idxs = close_idxs[:0]
+                        for i in close_idxs:
+                            net_profit = net_profits[i]
                             if net_profit > 0:
                                 profit_text = f"+{net_profit:.2f}"
                                 text_color = 'red'
@@ -815,7 +1256,7 @@ class BacktestVisualizer:
                                 profit_text = f"{net_profit:.2f}"
                                 text_color = 'green'
                                 
-                            ax.text(trade_time, price, profit_text, color=text_color, fontsize=9, verticalalignment='top')
+                            ax.text(trade_times[i], trade_prices[i], profit_text, color=text_color, fontsize=9, verticalalignment='top')
                 
                 # 设置图表格式
                 ax.set_title(f"{symbol} {kline_period} K线与交易记录", fontsize=16)
@@ -824,7 +1265,7 @@ class BacktestVisualizer:
                 ax.grid(True, alpha=0.3)
                 
                 # 格式化横轴日期
-                plt.gcf().autofmt_xdate()
+                fig.autofmt_xdate()
                 
                 # 添加收益信息
                 net_profit = result.get('total_net_profit', 0)
@@ -842,10 +1283,8 @@ class BacktestVisualizer:
                 ax.text(0.02, 0.98, info_text, transform=ax.transAxes, fontsize=11, 
                         verticalalignment='top', bbox=props)
                 
-                # 保存图表
-                plt.tight_layout()
-                plt.savefig(chart_path, dpi=100)
-                plt.close(fig)
+                # 保存图表（布局固定，复用Figure，不关闭），PNG编码在线程池中进行
+                self._save_png_async(fig, chart_path)
                 
                 self.log(f"K线和交易图已保存到: {chart_path}")
                 return True
@@ -856,4 +1295,5 @@ class BacktestVisualizer:
         except Exception as e:
             self.log(f"生成价格图表时出错: {str(e)}")
             plt.close('all')  # 确保关闭所有图表
+            self._price_figure = None
             return False 
\ No newline at end of file
@@ -1,14 +1,76 @@
+import atexit
+import weakref
 import pandas as pd
 import numpy as np
 from typing import Dict, Any, Optional
 
+# bottleneck 为可选依赖，未安装时滑动平均使用 pandas rolling 计算
+try:
+    import bottleneck as bn
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
+# 日志文件写缓冲大小
+_LOG_BUFFER_SIZE = 1 << 20
+
+# 打开了日志文件的实例（弱引用，不阻止实例被回收），解释器退出时统一写入缓冲的日志
+_OPEN_LOGS = weakref.WeakSet()
+
+
+def _flush_open_logs():
+    """解释器退出（包括异常退出）时把各实例缓冲的日志写入文件"""
+    for api in list(_OPEN_LOGS):
+        api.flush_log()
+
+
+atexit.register(_flush_open_logs)
+
+
 class FunctionAPI:
-    def __init__(self):
+    def __init__(self, log_file=None):
         self._klines = pd.DataFrame()
         self._target_pos = 0
         self._current_pos = 0
         self._signal_reason = ""  # 添加交易信号原因变量
-        self._log_file = None
+        self._log_path = None
+        self._log_handle = None
+        if log_file:
+            self.set_log_file(log_file)
+        
+    def set_log_file(self, log_file):
+        """设置日志文件，文件只打开一次并带缓冲写入
+        
+        Args:
+            log_file: 日志文件路径，为None时关闭文件日志
+        """
+        self.close_log()
+        self._log_path = log_file
+        if log_file:
+            self._log_handle = open(log_file, 'a', encoding='utf-8', buffering=_LOG_BUFFER_SIZE)
+            _OPEN_LOGS.add(self)
+    
+    @property
+    def _log_file(self):
+        """日志文件路径，直接赋值时等同于调用 set_log_file"""
+        return self._log_path
+    
+    @_log_file.setter
+    def _log_file(self, log_file):
+        self.set_log_file(log_file)
+            
+    def flush_log(self):
+        """把缓冲的日志写入文件，回测结束时调用"""
+        if self._log_handle is not None and not self._log_handle.closed:
+            self._log_handle.flush()
+            
+    def close_log(self):
+        """写入缓冲的日志并关闭日志文件"""
+        if self._log_handle is not None:
+            self.flush_log()
+            self._log_handle.close()
+            _OPEN_LOGS.discard(self)
+            self._log_handle = None
         
     def set_klines(self, klines):
         """设置K线数据"""
@@ -42,10 +104,9 @@ class FunctionAPI:
         """记录日志消息"""
         print(message)  # 打印到控制台
         
-        # 如果有日志文件，则写入
-        if self._log_file:
-            with open(self._log_file, 'a', encoding='utf-8') as f:
-                f.write(message + "\n")
+        # 如果有日志文件，则写入缓冲区
+        if self._log_handle is not None:
+            self._log_handle.write(message + "\n")
         
     def _update_pos(self):
         """更新实际持仓"""
@@ -110,6 +171,44 @@ class FunctionAPI:
             self.set_signal_reason(reason)
         self._update_pos()
 
+    def run_vectorized(self, target_pos_arr: np.ndarray) -> pd.DataFrame:
+        """按整段目标持仓序列批量更新持仓
+        
+        等价于逐根K线调用 set_target_pos，但持仓变化和开平仓数量由 NumPy 一次性计算，
+        只对发生变化的K线记录日志。
+        
+        Args:
+            target_pos_arr: 每根K线的目标持仓（正数为多头，负数为空头）
+            
+        Returns:
+            持仓变化记录，每行对应一次变化，列为 bar（K线位置）、old_pos、new_pos、
+            open_long、close_long、open_short、close_short
+        """
+        target = np.asarray(target_pos_arr)
+        # 第一根K线相对当前持仓计算变化
+        changes = np.diff(target, prepend=self._current_pos)
+        bars = np.flatnonzero(changes != 0)
+        new_pos = target[bars]
+        old_pos = new_pos - changes[bars]
+        
+        old_long, new_long = np.maximum(old_pos, 0), np.maximum(new_pos, 0)
+        old_short, new_short = np.maximum(-old_pos, 0), np.maximum(-new_pos, 0)
+        records = pd.DataFrame({
+            'bar': bars,
+            'old_pos': old_pos,
+            'new_pos': new_pos,
+            'open_long': np.maximum(new_long - old_long, 0),
+            'close_long': np.maximum(old_long - new_long, 0),
+            'open_short': np.maximum(new_short - old_short, 0),
+            'close_short': np.maximum(old_short - new_short, 0),
+        })
+        
+        for old, new in zip(old_pos.tolist(), new_pos.tolist()):
+            self.log_message(f"持仓变化: {old} -> {new}")
+        if len(target) > 0:
+            self._target_pos = self._current_pos = target[-1].item()
+        return records
+
 def init_api():
     """初始化API"""
     global api
@@ -119,8 +218,10 @@ def init_api():
 def ma(series, timeperiod):
     """计算移动平均线"""
     if len(series) < timeperiod:
-        return pd.Series(index=series.index)
-    return series.rolling(window=timeperiod).mean()
+        # 数据不足时返回全NaN的float64序列，保证下游运算保持数值类型
+        return pd.Series(np.full(len(series), np.nan), index=series.index, name=series.name)
+    # 直接对numpy数组计算，安装bottleneck时走其C实现，不构造pandas Rolling对象
+    return pd.Series(_rolling_mean(series.to_numpy(dtype=np.float64), timeperiod), index=series.index, name=series.name)
 
 def create_target_pos(symbol):
     """创建目标持仓对象"""
@@ -137,6 +238,22 @@ def is_changing(self, data: pd.Series, key: str) -> bool:
     """判断数据是否更新"""
     return True
 
+def _rolling_mean(values: np.ndarray, n: int) -> np.ndarray:
+    """计算滑动平均，窗口内有效数据不足n个时为NaN
+    
+    Args:
+        values: float64数组
+        n: 窗口长度
+        
+    Returns:
+        与values等长的滑动平均数组
+    """
+    if n > len(values):
+        return np.full(len(values), np.nan)
+    if BOTTLENECK_AVAILABLE:
+        return bn.move_mean(values, n)
+    return pd.Series(values).rolling(window=n).mean().to_numpy()
+
 def rsi(series: pd.Series, n: int) -> pd.Series:
     """计算RSI指标
     
@@ -147,11 +264,37 @@ def rsi(series: pd.Series, n: int) -> pd.Series:
     Returns:
         RSI指标序列
     """
-    delta = series.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=n).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=n).mean()
-    rs = gain / loss
-    return 100 - (100 / (1 + rs))
+    values = series.to_numpy(dtype=np.float64)
+    # 第一个差值为NaN，与其他非上涨/非下跌的位置一样计为0
+    delta = np.diff(values, prepend=np.nan)
+    gain = _rolling_mean(np.where(delta > 0, delta, 0.0), n)
+    loss = _rolling_mean(np.where(delta < 0, -delta, 0.0), n)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = 100 - (100 / (1 + gain / loss))
+    return pd.Series(result, index=series.index, name=series.name)
+
+# MACD的Numba单次遍历内核，首次调用 macd 时才导入（见 _get_macd_core）
+_macd_core = None
+_macd_core_loaded = False
+
+def _get_macd_core():
+    """获取Numba编译的MACD内核，只在首次调用时导入
+    
+    Numba导入和加载编译缓存的开销较大，放在首次计算MACD时支付，
+    不计算MACD的进程导入本模块时不受影响。
+    
+    Returns:
+        MACD内核函数，未安装Numba时返回None
+    """
+    global _macd_core, _macd_core_loaded
+    if not _macd_core_loaded:
+        _macd_core_loaded = True
+        try:
+            from .macd_kernel import macd_core
+            _macd_core = macd_core
+        except ImportError:
+            _macd_core = None
+    return _macd_core
 
 def macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) -> Dict[str, pd.Series]:
     """计算MACD指标
@@ -165,10 +308,21 @@ def macd(series: pd.Series, fast: int = 12, slow: int = 26, signal: int = 9) ->
     Returns:
         包含DIF、DEA和MACD的字典
     """
-    ema_fast = series.ewm(span=fast, adjust=False).mean()
-    ema_slow = series.ewm(span=slow, adjust=False).mean()
-    dif = ema_fast - ema_slow
-    dea = dif.ewm(span=signal, adjust=False).mean()
+    # Numba 为可选依赖，未安装时使用 pandas ewm 计算
+    macd_core = _get_macd_core()
+    if macd_core is not None:
+        if min(fast, slow, signal) < 1:
+            raise ValueError("span must satisfy: span >= 1")
+        # 与 pandas 相同的方式由span换算alpha：com = (span - 1) / 2, alpha = 1 / (1 + com)
+        alphas = [1.0 / (1.0 + (span - 1) / 2.0) for span in (fast, slow, signal)]
+        dif_arr, dea_arr = macd_core(series.to_numpy(dtype=np.float64), *alphas)
+        dif = pd.Series(dif_arr, index=series.index, name=series.name)
+        dea = pd.Series(dea_arr, index=series.index, name=series.name)
+    else:
+        ema_fast = series.ewm(span=fast, adjust=False).mean()
+        ema_slow = series.ewm(span=slow, adjust=False).mean()
+        dif = ema_fast - ema_slow
+        dea = dif.ewm(span=signal, adjust=False).mean()
     macd = (dif - dea) * 2
     
     return {
@@ -188,8 +342,17 @@ def boll(series: pd.Series, n: int = 20, k: float = 2.0) -> Dict[str, pd.Series]
     Returns:
         包含上轨、中轨和下轨的字典
     """
-    mid = ma(series, n)
-    std = series.rolling(window=n).std()
+    if BOTTLENECK_AVAILABLE and 0 < n <= len(series):
+        # 直接在数组上计算滑动均值和标准差（样本标准差，与 rolling().std() 一致）
+        values = series.to_numpy(dtype=np.float64)
+        mid = pd.Series(bn.move_mean(values, n), index=series.index, name=series.name)
+        std_arr = bn.move_std(values, n, ddof=1)
+        # 窗口内数值全部相同时标准差置为0，消除累加误差（与 pandas 一致）
+        std_arr[(bn.move_max(values, n) == bn.move_min(values, n)) & ~np.isnan(std_arr)] = 0.0
+        std = pd.Series(std_arr, index=series.index, name=series.name)
+    else:
+        mid = ma(series, n)
+        std = series.rolling(window=n).std()
     
     return {
         'upper': mid + k * std,
@@ -5,12 +5,37 @@ HTML 交互式回测报告生成器
 """
 
 import os
+import gzip
+import base64
 import json
+from contextlib import ExitStack
+from functools import lru_cache
+from string import Template
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
 import numpy as np
 
+from .backtest_results import get_equity_series
+
+# orjson 为可选依赖，未安装时使用标准库 json + NumpyEncoder 序列化图表数据
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Plotly 导入
+try:
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+    PLOTLY_AVAILABLE = True
+except ImportError:
+    PLOTLY_AVAILABLE = False
+    print("警告: plotly 未安装，将使用简化版 HTML 报告")
+    print("安装命令: pip install plotly")
+
+
 # 自定义JSON编码器，处理NumPy和pandas数据类型
 class NumpyEncoder(json.JSONEncoder):
     """处理 NumPy/pandas 数据类型的 JSON 序列化
@@ -20,469 +45,412 @@ class NumpyEncoder(json.JSONEncoder):
     
     兼容性：Python 3.9+, NumPy 1.x/2.x, pandas 1.x/2.x
     """
+    # 最常见的 NumPy 标量类型按精确类型直接查表转换，不必逐个 isinstance
+    _EXACT_CASTS = {
+        np.float64: float, np.float32: float,
+        np.int64: int, np.int32: int,
+        np.bool_: bool,
+    }
+    
     def default(self, obj):
+        cast = self._EXACT_CASTS.get(obj.__class__)
+        if cast is not None:
+            return cast(obj)
+        # pandas 缺失值
+        if obj is pd.NA or obj is pd.NaT:
+            return None
         # NumPy 整数类型（np.integer 是所有 numpy 整数的基类）
         if isinstance(obj, np.integer):
             return int(obj)
         # NumPy 浮点类型（np.floating 是所有 numpy 浮点的基类）
         if isinstance(obj, np.floating):
             return float(obj)
-        # NumPy 布尔类型
-        if isinstance(obj, np.bool_):
-            return bool(obj)
         # NumPy 数组
         if isinstance(obj, np.ndarray):
             return obj.tolist()
         # pandas Timestamp 或其他带 isoformat 的时间类型
         if hasattr(obj, 'isoformat'):
             return obj.isoformat()
-        # 处理 pandas NA/NaN 值（需要 try-except 因为某些类型会报错）
-        try:
-            if pd.isna(obj):
-                return None
-        except (TypeError, ValueError):
-            pass
-        # 兜底：通过类型名称判断（处理某些版本差异导致的遗漏）
-        type_name = type(obj).__name__.lower()
-        if 'int' in type_name:
-            try:
-                return int(obj)
-            except (TypeError, ValueError):
-                pass
-        if 'float' in type_name:
-            try:
-                return float(obj)
-            except (TypeError, ValueError):
-                pass
         return super().default(obj)
 
-# Plotly 导入
-try:
-    import plotly.graph_objects as go
-    from plotly.subplots import make_subplots
-    PLOTLY_AVAILABLE = True
-except ImportError:
-    PLOTLY_AVAILABLE = False
-    print("警告: plotly 未安装，将使用简化版 HTML 报告")
-    print("安装命令: pip install plotly")
+def _to_jsonable(values) -> list:
+    """把一列数据按类型一次性转换为可直接JSON序列化的Python列表
+    
+    避免序列化时对每个NumPy标量逐个调用 NumpyEncoder.default。
+    
+    Args:
+        values: Series、numpy数组或列表
+        
+    Returns:
+        Python列表：浮点NaN转为None，datetime64转为ISO字符串（毫秒），整数/布尔转为Python类型
+    """
+    arr = np.asarray(values)
+    if arr.dtype.kind == 'f':
+        nan_mask = np.isnan(arr)
+        if nan_mask.any():
+            return np.where(nan_mask, None, arr).tolist()
+        return arr.tolist()
+    if arr.dtype.kind == 'M':
+        return np.datetime_as_string(arr.astype('datetime64[ms]')).tolist()
+    return arr.tolist()
+
+
+def _sanitize(obj):
+    """递归遍历一次图表数据，把NumPy/pandas对象转换为Python原生类型
+    
+    用精确类型判断代替 isinstance 链，Python原生标量原样返回，
+    之后标准库 json（C实现）序列化时不再逐个回调 NumpyEncoder.default。
+    
+    Args:
+        obj: 图表数据
+        
+    Returns:
+        只包含Python原生类型的数据
+    """
+    obj_type = type(obj)
+    if obj_type is float or obj_type is int or obj_type is str or obj_type is bool or obj is None:
+        return obj
+    if obj_type is dict:
+        return {key: _sanitize(value) for key, value in obj.items()}
+    if obj_type is list or obj_type is tuple:
+        return [_sanitize(value) for value in obj]
+    if obj_type is np.ndarray or obj_type is pd.Series or obj_type is pd.Index:
+        return _sanitize(_to_jsonable(obj))
+    if obj_type is pd.Timestamp:
+        return obj.isoformat()
+    if isinstance(obj, np.generic):
+        return _sanitize(obj.item())
+    return obj
+
+
+def _orjson_default(obj):
+    """orjson 不能直接序列化的 pandas 对象：缺失值转为 None，Timestamp 转为 ISO 字符串
+    
+    NumPy 标量和数组由 OPT_SERIALIZE_NUMPY 在 orjson 内部处理，不会进入这里。
+    """
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dumps_json(obj) -> bytes:
+    """把图表数据序列化为UTF-8编码的JSON，安装orjson时使用orjson，否则先经 _sanitize 转换再用标准库json + NumpyEncoder
+    
+    Args:
+        obj: 图表数据（字典/列表）
+        
+    Returns:
+        JSON字节串（可直接写入报告文件）
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(
+            obj, default=_orjson_default,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    # 紧凑分隔符，与 orjson 输出一致，不写多余空格
+    return json.dumps(_sanitize(obj), cls=NumpyEncoder, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _split_template(template: Template) -> List[Tuple[Optional[str], bytes]]:
+    """把 string.Template 按占位符切分为片段，用于分段写出报告
+    
+    Args:
+        template: 模板
+        
+    Returns:
+        list: (占位符名, None) 或 (None, UTF-8编码的静态文本)
+    """
+    text = template.template
+    segments = []
+    pos = 0
+    for match in template.pattern.finditer(text):
+        segments.append((None, text[pos:match.start()]))
+        name = match.group('named') or match.group('braced')
+        if match.group('escaped') is not None:
+            segments.append((None, template.delimiter))
+        elif name:
+            segments.append((name, None))
+        else:
+            raise ValueError(f"模板中有无效的占位符，位置: {match.start()}")
+        pos = match.end()
+    segments.append((None, text[pos:]))
+    return [(name, chunk.encode('utf-8') if chunk is not None else None)
+            for name, chunk in segments if name is not None or chunk]
+
+
+def _drawdown_pct(equity: np.ndarray) -> np.ndarray:
+    """计算回撤百分比 (历史最高 - 当前) / 历史最高 * 100
+    
+    与 pandas 的 cummax 写法结果一致：NaN 不参与历史最高值，结果中的 NaN 记为0。
+    
+    Args:
+        equity: 权益数组，float64
+        
+    Returns:
+        回撤百分比数组
+    """
+    peak = np.fmax.accumulate(equity)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdown = (peak - equity) / peak * 100
+    drawdown[np.isnan(drawdown)] = 0.0
+    return drawdown
+
+
+# 嵌入报告的价格/K线序列最大点数，超过时在生成报告前降采样（浏览器宽度只有约2000像素）
+_REPORT_MAX_POINTS = 4000
+
+
+def _sum_on_common_index(curves: List[pd.Series]) -> Optional[pd.Series]:
+    """在所有曲线共同的时间点上求和
+    
+    所有曲线索引相同时直接按列堆叠求和，否则用一次 inner concat 对齐后整块按行求和，
+    不再逐条曲线 reindex 并生成中间 Series。NaN 与逐条相加一样向后传播。
+    
+    Args:
+        curves: 曲线列表（至少一条）
+        
+    Returns:
+        求和后的曲线，没有共同时间点时返回None
+    """
+    first_index = curves[0].index
+    if all(curve.index.equals(first_index) for curve in curves[1:]):
+        if len(first_index) == 0:
+            return None
+        block = np.column_stack([curve.to_numpy(dtype=np.float64) for curve in curves])
+        return pd.Series(block.sum(axis=1), index=first_index)
+    
+    aligned = pd.concat(curves, axis=1, join='inner', ignore_index=True)
+    if aligned.empty:
+        return None
+    return aligned.sum(axis=1, skipna=False).astype(np.float64)
+
+
+def _align_to_index(curves: List[pd.Series], index: pd.Index) -> pd.DataFrame:
+    """把多条曲线一次对齐到指定时间点，每条曲线为一列，没有数据的时间点为NaN
+    
+    Args:
+        curves: 曲线列表（至少一条）
+        index: 目标时间点
+        
+    Returns:
+        DataFrame，索引为 index
+    """
+    return pd.concat(curves, axis=1, ignore_index=True).reindex(index)
+
+
+def _encode_float64(values) -> str:
+    """把数值序列编码为 base64 的小端 float64 字节串，页面中解码为 Float64Array
+    
+    比逐个写出JSON数字更紧凑，浏览器端也不需要逐个解析数字。
+    
+    Args:
+        values: Series、numpy数组或列表（NaN原样保留）
+        
+    Returns:
+        base64字符串
+    """
+    buf = np.ascontiguousarray(values, dtype='<f8').tobytes()
+    return base64.b64encode(buf).decode('ascii')
+
+
+def _format_dates(index) -> List[str]:
+    """把日期索引一次性格式化为ISO字符串（图表X轴为日期轴）
+    
+    Args:
+        index: 日期索引，非DatetimeIndex时逐个转为字符串
+        
+    Returns:
+        日期字符串列表，格式为 2026-01-06T10:34:00
+    """
+    if isinstance(index, pd.DatetimeIndex):
+        return index.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+    return [d.strftime('%Y-%m-%dT%H:%M:%S') if hasattr(d, 'strftime') else str(d) for d in index]
+
+
+def _lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """用 LTTB（Largest-Triangle-Three-Buckets）算法选取降采样点
+    
+    首尾两点保留，中间的点均分为 n_out-2 个桶，每个桶选取与前后两桶均值构成三角形面积最大的点。
+    前一个桶用均值代替已选点，使所有桶可以一次性向量化计算。
+    
+    Args:
+        values: 序列值（横坐标为位置）
+        n_out: 输出点数
+        
+    Returns:
+        选中点的位置数组（升序）
+    """
+    n = len(values)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    # NaN只影响选点，用前后值填充后计算面积，输出仍取原始值
+    y = pd.Series(values, dtype=np.float64).ffill().bfill().to_numpy()
+    if np.isnan(y).any():
+        return np.linspace(0, n - 1, n_out).astype(np.int64)
+    
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    sizes = np.diff(edges)
+    starts = edges[:-1]
+    
+    # 各桶横纵坐标均值
+    x = np.arange(n, dtype=np.float64)
+    y_cum = np.concatenate(([0.0], np.cumsum(y)))
+    x_mean = (edges[:-1] + edges[1:] - 1) / 2.0
+    y_mean = (y_cum[edges[1:]] - y_cum[edges[:-1]]) / sizes
+    
+    # 每个桶的前锚点（第一个桶为首点）和后锚点（最后一个桶为尾点）
+    ax = np.concatenate(([0.0], x_mean[:-1]))
+    ay = np.concatenate(([y[0]], y_mean[:-1]))
+    cx = np.concatenate((x_mean[1:], [n - 1.0]))
+    cy = np.concatenate((y_mean[1:], [y[-1]]))
+    
+    ax, ay, cx, cy = (np.repeat(anchor, sizes) for anchor in (ax, ay, cx, cy))
+    xs = x[1:n - 1]
+    ys = y[1:n - 1]
+    area = np.abs((ax - cx) * (ys - ay) - (ax - xs) * (cy - ay))
+    
+    # 每个桶面积最大的第一个点
+    local_starts = starts - 1
+    bucket_max = np.maximum.reduceat(area, local_starts)
+    hits = np.flatnonzero(area == np.repeat(bucket_max, sizes))
+    chosen = hits[np.searchsorted(hits, local_starts)] + 1
+    return np.concatenate(([0], chosen, [n - 1]))
+
+
+def _minmax_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """用最小/最大值抽取（min-max decimation）选取降采样点
+    
+    序列均分为 n_out//2 个桶，每个桶保留最小值和最大值所在的点，首尾两点保留，
+    曲线的峰谷（如最大回撤）不会被降采样抹掉。
+    
+    Args:
+        values: 序列值
+        n_out: 输出点数上限
+        
+    Returns:
+        选中点的位置数组（升序）
+    """
+    n = len(values)
+    if n <= n_out or n_out < 4:
+        return np.arange(n)
+    size = -(-n // (n_out // 2 - 1))
+    n_bins = -(-n // size)
+    pad = n_bins * size - n
+    y = np.asarray(values, dtype=np.float64)
+    nan_mask = np.isnan(y)
+    # NaN不参与选点（整桶都是NaN时取桶内第一个点）
+    lows = np.concatenate((np.where(nan_mask, np.inf, y), np.full(pad, np.inf))).reshape(n_bins, size)
+    highs = np.concatenate((np.where(nan_mask, -np.inf, y), np.full(pad, -np.inf))).reshape(n_bins, size)
+    starts = np.arange(n_bins) * size
+    return np.unique(np.concatenate((starts + lows.argmin(axis=1), starts + highs.argmax(axis=1), [0, n - 1])))
+
+
+def _ohlc_bucket_starts(n: int, n_out: int) -> np.ndarray:
+    """把n根K线按固定步长合并为不超过n_out个桶，返回各桶起始位置"""
+    step = -(-n // n_out)
+    return np.arange(0, n, step)
+
+
+def _resample_ohlc(open_, high, low, close, starts: np.ndarray) -> Dict[str, np.ndarray]:
+    """按桶合并OHLC：开盘取桶内首根、收盘取末根、最高/最低取桶内极值（忽略NaN）"""
+    ends = np.append(starts[1:], len(close)) - 1
+    return {
+        'open': np.asarray(open_)[starts],
+        'high': np.fmax.reduceat(np.asarray(high, dtype=np.float64), starts),
+        'low': np.fmin.reduceat(np.asarray(low, dtype=np.float64), starts),
+        'close': np.asarray(close)[ends],
+    }
+
+
+# 报告页面的样式表和脚本（ssquant/assets/ 下的静态文件，进程内只读取一次）
+_ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'assets')
+
+
+@lru_cache(maxsize=None)
+def _load_asset(name: str) -> str:
+    """读取报告静态资源文件，结果缓存在进程内
+
+    Args:
+        name: ssquant/assets/ 下的文件名
+
+    Returns:
+        str: 文件内容
+    """
+    with open(os.path.join(_ASSETS_DIR, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _format_int(value) -> str:
+    """整数指标格式化（千分位）"""
+    return f"{int(value):,}"
+
+
+def _sign_class(value) -> str:
+    """按正负决定指标颜色类"""
+    return 'positive' if value > 0 else 'negative' if value < 0 else 'neutral'
+
+
+def _neutral_class(value) -> str:
+    """不按数值着色的指标"""
+    return 'neutral'
+
+
+# 内联 plotly.js 的加载脚本：库以 gzip+base64 形式嵌入页面，由浏览器用 DecompressionStream 解压后执行，
+# 页面脚本通过 window.plotlyReady 等待加载完成；不支持 DecompressionStream 或解压失败时改从 CDN 加载
+_PLOTLY_LOADER = Template('''<script>
+        window.plotlyReady = (function() {
+            function loadScript(code, src) {
+                return new Promise(function(resolve, reject) {
+                    var script = document.createElement('script');
+                    if (src) {
+                        script.onload = resolve;
+                        script.onerror = reject;
+                        script.src = src;
+                    } else {
+                        script.textContent = code;
+                    }
+                    document.head.appendChild(script);
+                    if (!src) resolve();
+                });
+            }
+            if (typeof DecompressionStream !== 'function') {
+                return loadScript(null, '$cdn_url');
+            }
+            var inflated;
+            try {
+                var binary = atob('$plotly_b64');
+                var bytes = new Uint8Array(binary.length);
+                for (var i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+                var stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+                inflated = new Response(stream).text();
+            } catch (e) {
+                inflated = Promise.reject(e);
+            }
+            return inflated.then(function(code) {
+                return loadScript(code);
+            }).catch(function() {
+                // 解压失败时改从 CDN 加载
+                return loadScript(null, '$cdn_url');
+            });
+        })();
+    </script>''')
 
 
 class HTMLReportGenerator:
     """HTML 交互式报告生成器 - 支持多数据源"""
     
     # HTML 模板
-    HTML_TEMPLATE = '''<!DOCTYPE html>
+    HTML_TEMPLATE = Template('''<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>回测报告 - {strategy_name}</title>
-    {plotly_script_tag}
+    <title>回测报告 - ${strategy_name}</title>
+    ${plotly_script_tag}
     <style>
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
-            background: linear-gradient(135deg, #1a1a2e 0%, #16213e 100%);
-            color: #e0e0e0;
-            min-height: 100vh;
-            padding: 20px;
-        }}
-        .container {{
-            max-width: 1600px;
-            margin: 0 auto;
-        }}
-        .header {{
-            background: linear-gradient(135deg, #0f3460 0%, #533483 100%);
-            border-radius: 16px;
-            padding: 30px;
-            margin-bottom: 20px;
-            box-shadow: 0 10px 40px rgba(0,0,0,0.3);
-        }}
-        .header h1 {{
-            font-size: 28px;
-            margin-bottom: 10px;
-            display: flex;
-            align-items: center;
-            gap: 15px;
-        }}
-        .header .logo {{
-            font-size: 36px;
-        }}
-        .header .subtitle {{
-            color: #a0a0a0;
-            font-size: 14px;
-        }}
-        .header .brand {{
-            float: right;
-            text-align: right;
-            color: #888;
-            font-size: 12px;
-        }}
-        .header .brand a {{
-            color: #64b5f6;
-            text-decoration: none;
-        }}
-        
-        /* 数据源切换标签 */
-        .tabs {{
-            display: flex;
-            gap: 10px;
-            margin-bottom: 20px;
-            flex-wrap: wrap;
-        }}
-        .tab {{
-            padding: 12px 24px;
-            background: rgba(255,255,255,0.05);
-            border: 1px solid rgba(255,255,255,0.1);
-            border-radius: 8px;
-            cursor: pointer;
-            transition: all 0.2s;
-            font-size: 14px;
-        }}
-        .tab:hover {{
-            background: rgba(255,255,255,0.1);
-        }}
-        .tab.active {{
-            background: linear-gradient(135deg, #0f3460 0%, #533483 100%);
-            border-color: #64b5f6;
-        }}
-        .kline-tabs {{
-            display: flex;
-            gap: 8px;
-            margin-bottom: 15px;
-            flex-wrap: wrap;
-        }}
-        .kline-tabs .tab {{
-            padding: 8px 16px;
-            font-size: 12px;
-        }}
-        .tab-content {{
-            display: none;
-        }}
-        .tab-content.active {{
-            display: block;
-        }}
-        
-        /* 综合绩效区域 */
-        .summary-section {{
-            background: rgba(255,255,255,0.03);
-            border-radius: 16px;
-            padding: 25px;
-            margin-bottom: 20px;
-            border: 1px solid rgba(255,255,255,0.1);
-        }}
-        .summary-title {{
-            font-size: 20px;
-            margin-bottom: 20px;
-            color: #fff;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-        
-        .metrics-grid {{
-            display: grid;
-            grid-template-columns: repeat(auto-fit, minmax(180px, 1fr));
-            gap: 15px;
-            margin-bottom: 20px;
-        }}
-        .metric-card {{
-            background: rgba(255,255,255,0.05);
-            border-radius: 12px;
-            padding: 18px;
-            text-align: center;
-            border: 1px solid rgba(255,255,255,0.1);
-            transition: transform 0.2s, box-shadow 0.2s;
-        }}
-        .metric-card:hover {{
-            transform: translateY(-3px);
-            box-shadow: 0 8px 25px rgba(0,0,0,0.3);
-        }}
-        .metric-card .label {{
-            font-size: 11px;
-            color: #888;
-            margin-bottom: 8px;
-            text-transform: uppercase;
-            letter-spacing: 1px;
-        }}
-        .metric-card .value {{
-            font-size: 22px;
-            font-weight: 700;
-        }}
-        .metric-card .value.positive {{
-            color: #4caf50;
-        }}
-        .metric-card .value.negative {{
-            color: #f44336;
-        }}
-        .metric-card .value.neutral {{
-            color: #64b5f6;
-        }}
-        .chart-container {{
-            background: rgba(255,255,255,0.03);
-            border-radius: 16px;
-            padding: 20px;
-            margin-bottom: 20px;
-            border: 1px solid rgba(255,255,255,0.1);
-        }}
-        .chart-title {{
-            font-size: 18px;
-            margin-bottom: 15px;
-            color: #fff;
-            display: flex;
-            align-items: center;
-            gap: 10px;
-        }}
-        .chart-title .icon {{
-            font-size: 24px;
-        }}
-        
-        /* 数据源绩效对比表 */
-        .comparison-table {{
-            width: 100%;
-            border-collapse: collapse;
-            font-size: 13px;
-            margin-bottom: 20px;
-        }}
-        .comparison-table th {{
-            background: rgba(255,255,255,0.1);
-            padding: 12px 10px;
-            text-align: right;
-            font-weight: 600;
-        }}
-        .comparison-table th:first-child {{
-            text-align: left;
-        }}
-        .comparison-table td {{
-            padding: 10px;
-            border-bottom: 1px solid rgba(255,255,255,0.05);
-            text-align: right;
-        }}
-        .comparison-table td:first-child {{
-            text-align: left;
-            font-weight: 600;
-            color: #64b5f6;
-        }}
-        .comparison-table tr:hover {{
-            background: rgba(255,255,255,0.05);
-        }}
-        
-        .trades-table {{
-            width: 100%;
-            border-collapse: collapse;
-            font-size: 13px;
-        }}
-        .trades-table th {{
-            background: rgba(255,255,255,0.1);
-            padding: 12px 8px;
-            text-align: left;
-            font-weight: 600;
-            position: sticky;
-            top: 0;
-        }}
-        .trades-table td {{
-            padding: 10px 8px;
-            border-bottom: 1px solid rgba(255,255,255,0.05);
-        }}
-        .trades-table tr:hover {{
-            background: rgba(255,255,255,0.05);
-        }}
-        .trades-table .profit {{
-            color: #4caf50;
-        }}
-        .trades-table .loss {{
-            color: #f44336;
-        }}
-        .table-wrapper {{
-            border-radius: 8px;
-        }}
-        .table-wrapper::-webkit-scrollbar {{
-            width: 8px;
-        }}
-        .table-wrapper::-webkit-scrollbar-track {{
-            background: rgba(255,255,255,0.05);
-        }}
-        .table-wrapper::-webkit-scrollbar-thumb {{
-            background: rgba(255,255,255,0.2);
-            border-radius: 4px;
-        }}
-        
-        /* 交易记录筛选器 */
-        .trades-filter {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-            margin-bottom: 15px;
-            padding: 15px;
-            background: rgba(255,255,255,0.03);
-            border-radius: 8px;
-        }}
-        .filter-group {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-        }}
-        .filter-group label {{
-            font-size: 12px;
-            color: #aaa;
-        }}
-        .filter-group input, .filter-group select {{
-            padding: 6px 10px;
-            background: rgba(255,255,255,0.08);
-            border: 1px solid rgba(255,255,255,0.15);
-            border-radius: 4px;
-            color: #fff;
-            font-size: 12px;
-        }}
-        .filter-group input::placeholder {{
-            color: #666;
-        }}
-        .filter-group select {{
-            cursor: pointer;
-        }}
-        .filter-group select option {{
-            background: #1a1a2e;
-            color: #fff;
-        }}
-        .filter-btn {{
-            padding: 6px 15px;
-            background: linear-gradient(135deg, #0f3460 0%, #533483 100%);
-            border: none;
-            border-radius: 4px;
-            color: #fff;
-            font-size: 12px;
-            cursor: pointer;
-            transition: opacity 0.2s;
-        }}
-        .filter-btn:hover {{
-            opacity: 0.8;
-        }}
-        .filter-btn.reset {{
-            background: rgba(255,255,255,0.1);
-        }}
-        
-        /* 分页器 */
-        .pagination {{
-            display: flex;
-            justify-content: center;
-            align-items: center;
-            gap: 8px;
-            margin-top: 15px;
-            flex-wrap: wrap;
-        }}
-        .pagination button {{
-            padding: 8px 12px;
-            background: rgba(255,255,255,0.08);
-            border: 1px solid rgba(255,255,255,0.15);
-            border-radius: 4px;
-            color: #fff;
-            font-size: 12px;
-            cursor: pointer;
-            transition: all 0.2s;
-        }}
-        .pagination button:hover:not(:disabled) {{
-            background: rgba(255,255,255,0.15);
-        }}
-        .pagination button:disabled {{
-            opacity: 0.4;
-            cursor: not-allowed;
-        }}
-        .pagination button.active {{
-            background: linear-gradient(135deg, #0f3460 0%, #533483 100%);
-            border-color: #64b5f6;
-        }}
-        .pagination .page-info {{
-            font-size: 12px;
-            color: #aaa;
-            margin: 0 10px;
-        }}
-        .pagination .page-jump {{
-            display: flex;
-            align-items: center;
-            gap: 5px;
-        }}
-        .pagination .page-jump input {{
-            width: 50px;
-            padding: 6px;
-            background: rgba(255,255,255,0.08);
-            border: 1px solid rgba(255,255,255,0.15);
-            border-radius: 4px;
-            color: #fff;
-            font-size: 12px;
-            text-align: center;
-        }}
-        .footer {{
-            text-align: center;
-            padding: 20px;
-            color: #666;
-            font-size: 12px;
-        }}
-        .footer a {{
-            color: #64b5f6;
-            text-decoration: none;
-        }}
-        .tag {{
-            display: inline-block;
-            padding: 4px 10px;
-            border-radius: 20px;
-            font-size: 11px;
-            font-weight: 600;
-        }}
-        .tag.buy {{
-            background: rgba(76, 175, 80, 0.2);
-            color: #4caf50;
-        }}
-        .tag.sell {{
-            background: rgba(244, 67, 54, 0.2);
-            color: #f44336;
-        }}
-        .source-tag {{
-            display: inline-block;
-            padding: 2px 8px;
-            border-radius: 4px;
-            font-size: 10px;
-            background: rgba(100, 181, 246, 0.2);
-            color: #64b5f6;
-            margin-right: 5px;
-        }}
-        
-        /* 图例样式 */
-        .legend {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 15px;
-            margin-bottom: 15px;
-            padding: 10px;
-            background: rgba(255,255,255,0.03);
-            border-radius: 8px;
-        }}
-        .legend-item {{
-            display: flex;
-            align-items: center;
-            gap: 8px;
-            font-size: 13px;
-        }}
-        .legend-color {{
-            width: 20px;
-            height: 3px;
-            border-radius: 2px;
-        }}
-        
-        @media (max-width: 768px) {{
-            .metrics-grid {{
-                grid-template-columns: repeat(2, 1fr);
-            }}
-            .header h1 {{
-                font-size: 22px;
-            }}
-            .tabs {{
-                flex-direction: column;
-            }}
-        }}
+$report_css
     </style>
 </head>
 <body>
@@ -497,7 +465,7 @@ class HTMLReportGenerator:
                 回测报告
             </h1>
             <div class="subtitle">
-                {strategy_info} | 回测区间: {start_date} ~ {end_date} | 生成时间: {report_time}
+                ${strategy_info} | 回测区间: ${start_date} ~ ${end_date} | 生成时间: ${report_time}
             </div>
         </div>
         
@@ -507,7 +475,7 @@ class HTMLReportGenerator:
                 <span>📈</span> 综合绩效摘要
             </div>
             <div class="metrics-grid">
-                {combined_metrics_cards}
+                ${combined_metrics_cards}
             </div>
             <div style="margin-top: 15px; padding: 10px 15px; background: rgba(76, 175, 80, 0.1); border-radius: 8px; font-size: 12px; color: #aaa; border-left: 3px solid #4caf50;">
                 💡 <strong>说明：</strong>以上所有绩效指标均已扣除<span style="color: #81c784;">手续费</span>和<span style="color: #81c784;">滑点成本</span>（按配置的滑点跳数×最小变动价位计算）
@@ -515,7 +483,7 @@ class HTMLReportGenerator:
         </div>
         
         <!-- 数据源对比表 -->
-        {source_comparison_section}
+        ${source_comparison_section}
         
         <!-- 利润曲线图（从0开始，便于对比各数据源盈亏） -->
         <div class="chart-container">
@@ -547,10 +515,10 @@ class HTMLReportGenerator:
         </div>
         
         <!-- 各数据源详情标签页 -->
-        {source_tabs}
+        ${source_tabs}
         
         <!-- 各数据源详情内容 -->
-        {source_details}
+        ${source_details}
         
         <div class="footer">
             <p>由 <a href="https://gitee.com/ssquant/ssquant" target="_blank">松鼠Quant-ssquant框架</a> 生成</p>
@@ -559,632 +527,76 @@ class HTMLReportGenerator:
     </div>
     
     <script>
-        // 图表颜色
-        var colors = ['#64b5f6', '#4caf50', '#ff9800', '#e91e63', '#9c27b0', '#00bcd4', '#8bc34a', '#ff5722'];
-        
-        // 利润曲线数据（从0开始，便于对比）
-        var profitDataSources = {profit_data_sources};
-        var combinedProfitData = {combined_profit_data};
-        var combinedGrossProfitData = {combined_gross_profit_data};
-        var priceDataSources = {price_data_sources};
-        
-        // 绘制利润曲线
-        var profitTraces = [];
-        
-        // 添加各数据源的利润曲线
-        profitDataSources.forEach(function(source, idx) {{
-            var color = colors[idx % colors.length];
-            profitTraces.push({{
-                x: source.dates,
-                y: source.values,
-                type: 'scatter',
-                mode: 'lines',
-                name: source.name,
-                line: {{
-                    color: color,
-                    width: 1.5
-                }},
-                opacity: 0.7
-            }});
-        }});
-        
-        // 添加综合毛利润曲线（不含成本，黄色虚线）
-        if (combinedGrossProfitData.dates && combinedGrossProfitData.dates.length > 0) {{
-            profitTraces.push({{
-                x: combinedGrossProfitData.dates,
-                y: combinedGrossProfitData.values,
-                type: 'scatter',
-                mode: 'lines',
-                name: '毛利润(不含成本)',
-                line: {{
-                    color: '#ffd54f',
-                    width: 2,
-                    dash: 'dash'
-                }},
-                opacity: 0.8
-            }});
-        }}
-        
-        // 添加综合净利润曲线（含成本，白色实线）
-        if (combinedProfitData.dates && combinedProfitData.dates.length > 0) {{
-            profitTraces.push({{
-                x: combinedProfitData.dates,
-                y: combinedProfitData.values,
-                type: 'scatter',
-                mode: 'lines',
-                name: '净利润(扣除成本)',
-                line: {{
-                    color: '#ffffff',
-                    width: 2.5
-                }}
-            }});
-        }}
-        
-        // 添加价格曲线（使用右侧Y轴，默认隐藏）
-        var priceColors = ['#90caf9', '#a5d6a7', '#ffcc80', '#f48fb1', '#ce93d8'];
-        priceDataSources.forEach(function(source, idx) {{
-            var color = priceColors[idx % priceColors.length];
-            profitTraces.push({{
-                x: source.dates,
-                y: source.values,
-                type: 'scatter',
-                mode: 'lines',
-                name: source.name,
-                yaxis: 'y2',
-                line: {{
-                    color: color,
-                    width: 1,
-                    dash: 'dot'
-                }},
-                opacity: 0.6,
-                visible: 'legendonly'  // 默认隐藏，点击图例可显示
-            }});
-        }});
-        
-        // 使用最长数据源的时间作为统一的 X 轴类别
-        var allDates = [];
-        profitDataSources.forEach(function(source) {{
-            source.dates.forEach(function(d) {{
-                if (allDates.indexOf(d) === -1) allDates.push(d);
-            }});
-        }});
-        allDates.sort();
-        
-        var profitLayout = {{
-            paper_bgcolor: 'rgba(0,0,0,0)',
-            plot_bgcolor: 'rgba(0,0,0,0)',
-            font: {{ color: '#e0e0e0' }},
-            xaxis: {{
-                type: 'category',
-                categoryorder: 'array',
-                categoryarray: allDates,
-                gridcolor: 'rgba(255,255,255,0.1)',
-                nticks: 10,
-                tickangle: -30
-            }},
-            yaxis: {{
-                gridcolor: 'rgba(255,255,255,0.1)',
-                tickformat: ',.0f',
-                title: '利润(元)',
-                zeroline: true,
-                zerolinecolor: 'rgba(255,255,255,0.3)',
-                zerolinewidth: 1,
-                side: 'left'
-            }},
-            yaxis2: {{
-                gridcolor: 'rgba(255,255,255,0.05)',
-                tickformat: ',.2f',
-                title: '价格/相对值',
-                overlaying: 'y',
-                side: 'right',
-                showgrid: false
-            }},
-            margin: {{ l: 70, r: 70, t: 30, b: 60 }},
-            hovermode: 'x unified',
-            hoverlabel: {{
-                bgcolor: '#fff',
-                font: {{ color: '#333', size: 13 }},
-                bordercolor: '#ccc'
-            }},
-            showlegend: true,
-            legend: {{
-                orientation: 'h',
-                yanchor: 'bottom',
-                y: 1.02,
-                xanchor: 'left',
-                x: 0,
-                font: {{ size: 11 }}
-            }},
-            dragmode: 'pan'
-        }};
-        
-        var profitConfig = {{
-            scrollZoom: true,
-            displayModeBar: true,
-            modeBarButtonsToRemove: ['select2d', 'lasso2d'],
-            displaylogo: false
-        }};
-        
-        Plotly.newPlot('profit-chart', profitTraces, profitLayout, profitConfig);
-        
-        // 回撤数据
-        var drawdownDataSources = {drawdown_data_sources};
-        var combinedDrawdownData = {combined_drawdown_data};
-        
-        // 绘制回撤图
-        var drawdownTraces = [];
-        
-        // 添加各数据源的回撤曲线
-        drawdownDataSources.forEach(function(source, idx) {{
-            var color = colors[idx % colors.length];
-            drawdownTraces.push({{
-                x: source.dates,
-                y: source.values,
-                type: 'scatter',
-                mode: 'lines',
-                name: source.name,
-                line: {{
-                    color: color,
-                    width: 1
-                }},
-                opacity: 0.5
-            }});
-        }});
-        
-        // 添加综合回撤曲线
-        if (combinedDrawdownData.dates && combinedDrawdownData.dates.length > 0) {{
-            drawdownTraces.push({{
-                x: combinedDrawdownData.dates,
-                y: combinedDrawdownData.values,
-                type: 'scatter',
-                mode: 'lines',
-                name: '综合回撤',
-                fill: 'tozeroy',
-                fillcolor: 'rgba(244, 67, 54, 0.3)',
-                line: {{
-                    color: '#f44336',
-                    width: 2
-                }}
-            }});
-        }}
-        
-        // 使用最长数据源的时间作为统一的 X 轴类别
-        var allDrawdownDates = [];
-        drawdownDataSources.forEach(function(source) {{
-            source.dates.forEach(function(d) {{
-                if (allDrawdownDates.indexOf(d) === -1) allDrawdownDates.push(d);
-            }});
-        }});
-        allDrawdownDates.sort();
-        
-        var drawdownLayout = {{
-            paper_bgcolor: 'rgba(0,0,0,0)',
-            plot_bgcolor: 'rgba(0,0,0,0)',
-            font: {{ color: '#e0e0e0' }},
-            xaxis: {{
-                type: 'category',
-                categoryorder: 'array',
-                categoryarray: allDrawdownDates,
-                gridcolor: 'rgba(255,255,255,0.1)',
-                nticks: 10,
-                tickangle: -30
-            }},
-            yaxis: {{
-                gridcolor: 'rgba(255,255,255,0.1)',
-                tickformat: '.2f',
-                title: '回撤 (%)',
-                autorange: 'reversed'
-            }},
-            margin: {{ l: 70, r: 30, t: 30, b: 60 }},
-            hovermode: 'x unified',
-            hoverlabel: {{
-                bgcolor: '#fff',
-                font: {{ color: '#333', size: 13 }},
-                bordercolor: '#ccc'
-            }},
-            showlegend: false,
-            dragmode: 'pan'
-        }};
-        
-        var drawdownConfig = {{
-            scrollZoom: true,
-            displayModeBar: true,
-            modeBarButtonsToRemove: ['select2d', 'lasso2d'],
-            displaylogo: false
-        }};
-        
-        Plotly.newPlot('drawdown-chart', drawdownTraces, drawdownLayout, drawdownConfig);
-        
-        // 标签页切换功能
-        function switchTab(tabId) {{
-            // 隐藏所有标签内容
-            document.querySelectorAll('.tab-content').forEach(function(content) {{
-                content.classList.remove('active');
-            }});
-            // 取消所有标签的激活状态
-            document.querySelectorAll('.tab').forEach(function(tab) {{
-                tab.classList.remove('active');
-            }});
-            // 显示选中的标签内容
-            var content = document.getElementById('content-' + tabId);
-            if (content) {{
-                content.classList.add('active');
-            }}
-            // 激活选中的标签
-            var tab = document.querySelector('[onclick="switchTab(\\'' + tabId + '\\')"]');
-            if (tab) {{
-                tab.classList.add('active');
-            }}
-        }}
-        
-        // K线图数据
-        var klineDataSources = {kline_data_sources};
-        var currentKlineIndex = 0;
-        
-        // 生成 K线切换标签
-        function generateKlineTabs() {{
-            var tabsHtml = '';
-            klineDataSources.forEach(function(source, idx) {{
-                var activeClass = idx === 0 ? 'active' : '';
-                tabsHtml += '<div class="tab ' + activeClass + '" onclick="switchKline(' + idx + ')">' + source.name + '</div>';
-            }});
-            document.getElementById('kline-tabs').innerHTML = tabsHtml;
-        }}
-        
-        // 切换 K线数据源
-        function switchKline(idx) {{
-            currentKlineIndex = idx;
-            // 更新标签状态
-            var tabs = document.querySelectorAll('#kline-tabs .tab');
-            tabs.forEach(function(tab, i) {{
-                if (i === idx) {{
-                    tab.classList.add('active');
-                }} else {{
-                    tab.classList.remove('active');
-                }}
-            }});
-            // 更新图表标题
-            updateChartTitle(idx);
-            // 重新绘制图表
-            drawKlineChart(idx);
-        }}
-        
-        // 更新图表标题（根据是TICK还是K线）
-        function updateChartTitle(idx) {{
-            if (klineDataSources.length === 0) return;
-            var source = klineDataSources[idx];
-            var isTick = source.ohlc.is_tick;
-            var iconEl = document.getElementById('price-chart-icon');
-            var titleEl = document.getElementById('price-chart-title');
-            if (iconEl && titleEl) {{
-                if (isTick) {{
-                    iconEl.textContent = '📈';
-                    titleEl.textContent = 'TICK价格图与交易标记';
-                }} else {{
-                    iconEl.textContent = '🕯️';
-                    titleEl.textContent = 'K线图与交易标记';
-                }}
-            }}
-        }}
-        
-        // 绘制 K线图 / TICK价格线图
-        function drawKlineChart(idx) {{
-            if (klineDataSources.length === 0) return;
-            
-            var source = klineDataSources[idx];
-            var ohlc = source.ohlc;
-            var traces = [];
-            var chartTitle = '价格';
-            
-            // 判断是 TICK 数据还是 K线数据
-            if (ohlc.is_tick) {{
-                // TICK 数据：绘制价格线
-                var priceLine = {{
-                    x: ohlc.dates,
-                    y: ohlc.prices,
-                    type: 'scatter',
-                    mode: 'lines',
-                    name: source.name + ' 价格',
-                    line: {{
-                        color: '#64b5f6',
-                        width: 1.5
-                    }},
-                    hoverinfo: 'y+x'
-                }};
-                traces.push(priceLine);
-                chartTitle = 'TICK价格';
-            }} else {{
-                // K线数据：绘制蜡烛图
-                var candlestick = {{
-                    x: ohlc.dates,
-                    open: ohlc.open,
-                    high: ohlc.high,
-                    low: ohlc.low,
-                    close: ohlc.close,
-                    type: 'candlestick',
-                    name: source.name,
-                    increasing: {{ line: {{ color: '#26a69a' }}, fillcolor: '#26a69a' }},
-                    decreasing: {{ line: {{ color: '#ef5350' }}, fillcolor: '#ef5350' }}
-                }};
-                traces.push(candlestick);
-            }}
-            
-            // 买入标记
-            if (source.buy_markers.x.length > 0) {{
-                traces.push({{
-                    x: source.buy_markers.x,
-                    y: source.buy_markers.y,
-                    type: 'scatter',
-                    mode: 'markers',
-                    name: '买入',
-                    marker: {{
-                        symbol: 'triangle-up',
-                        size: 12,
-                        color: '#4caf50',
-                        line: {{ color: '#fff', width: 1 }}
-                    }},
-                    text: source.buy_markers.text,
-                    hoverinfo: 'text+x'
-                }});
-            }}
-            
-            // 卖出标记
-            if (source.sell_markers.x.length > 0) {{
-                traces.push({{
-                    x: source.sell_markers.x,
-                    y: source.sell_markers.y,
-                    type: 'scatter',
-                    mode: 'markers',
-                    name: '卖出',
-                    marker: {{
-                        symbol: 'triangle-down',
-                        size: 12,
-                        color: '#f44336',
-                        line: {{ color: '#fff', width: 1 }}
-                    }},
-                    text: source.sell_markers.text,
-                    hoverinfo: 'text+x'
-                }});
-            }}
-            
-            var layout = {{
-                paper_bgcolor: 'rgba(0,0,0,0)',
-                plot_bgcolor: 'rgba(0,0,0,0)',
-                font: {{ color: '#e0e0e0' }},
-                xaxis: {{
-                    type: 'category',
-                    gridcolor: 'rgba(255,255,255,0.1)',
-                    rangeslider: {{ visible: false }},
-                    nticks: 10,
-                    tickangle: -30
-                }},
-                yaxis: {{
-                    gridcolor: 'rgba(255,255,255,0.1)',
-                    tickformat: ',.2f',
-                    title: chartTitle
-                }},
-                margin: {{ l: 70, r: 30, t: 30, b: 60 }},
-                hovermode: 'x unified',
-                hoverlabel: {{
-                    bgcolor: '#fff',
-                    font: {{ color: '#333', size: 13 }},
-                    bordercolor: '#ccc'
-                }},
-                showlegend: true,
-                legend: {{ x: 0, y: 1.1, orientation: 'h' }},
-                dragmode: 'pan'
-            }};
-            
-            var config = {{
-                scrollZoom: true,
-                displayModeBar: true,
-                modeBarButtonsToRemove: ['select2d', 'lasso2d'],
-                displaylogo: false
-            }};
-            
-            Plotly.newPlot('kline-chart', traces, layout, config);
-        }}
-        
-        // 初始化 K线图/TICK价格图
-        if (klineDataSources.length > 0) {{
-            generateKlineTabs();
-            updateChartTitle(0);
-            drawKlineChart(0);
-        }}
-        
-        // ========== 交易记录分页和筛选功能 ==========
-        var tradesData = {{}};  // 存储所有交易数据
-        var filteredData = {{}};  // 存储筛选后的数据
-        var pageSize = 50;  // 每页显示条数
-        var currentPages = {{}};  // 各数据源当前页码
-        
-        // 初始化交易记录
-        function initTradesTable(sourceIdx) {{
-            var tbody = document.getElementById('trades-tbody-' + sourceIdx);
-            if (!tbody) return;
-            
-            // 保存原始数据
-            var rows = tbody.querySelectorAll('tr');
-            tradesData[sourceIdx] = [];
-            rows.forEach(function(row) {{
-                tradesData[sourceIdx].push({{
-                    element: row.cloneNode(true),
-                    time: row.cells[1] ? row.cells[1].textContent : '',
-                    action: row.cells[2] ? row.cells[2].textContent : '',
-                    price: row.cells[3] ? row.cells[3].textContent : '',
-                    profit: row.cells[5] ? row.cells[5].textContent : ''
-                }});
-            }});
-            
-            filteredData[sourceIdx] = tradesData[sourceIdx].slice();
-            currentPages[sourceIdx] = 1;
-            
-            renderPage(sourceIdx);
-        }}
-        
-        // 渲染当前页
-        function renderPage(sourceIdx) {{
-            var tbody = document.getElementById('trades-tbody-' + sourceIdx);
-            if (!tbody) return;
-            
-            var data = filteredData[sourceIdx] || [];
-            var totalPages = Math.ceil(data.length / pageSize) || 1;
-            var currentPage = currentPages[sourceIdx] || 1;
-            
-            // 确保当前页在有效范围内
-            if (currentPage > totalPages) currentPage = totalPages;
-            if (currentPage < 1) currentPage = 1;
-            currentPages[sourceIdx] = currentPage;
-            
-            // 计算显示范围
-            var startIdx = (currentPage - 1) * pageSize;
-            var endIdx = Math.min(startIdx + pageSize, data.length);
-            
-            // 清空表格
-            tbody.innerHTML = '';
-            
-            // 显示当前页数据
-            for (var i = startIdx; i < endIdx; i++) {{
-                var row = data[i].element.cloneNode(true);
-                row.cells[0].textContent = i + 1;  // 更新序号
-                tbody.appendChild(row);
-            }}
-            
-            // 更新分页信息
-            var currentPageSpan = document.querySelector('.current-page-' + sourceIdx);
-            var totalPagesSpan = document.querySelector('.total-pages-' + sourceIdx);
-            var tradesCountSpan = document.querySelector('.trades-count-' + sourceIdx);
-            
-            if (currentPageSpan) currentPageSpan.textContent = currentPage;
-            if (totalPagesSpan) totalPagesSpan.textContent = totalPages;
-            if (tradesCountSpan) tradesCountSpan.textContent = data.length;
-            
-            // 更新分页按钮状态
-            updatePaginationButtons(sourceIdx, currentPage, totalPages);
-        }}
-        
-        // 更新分页按钮状态
-        function updatePaginationButtons(sourceIdx, currentPage, totalPages) {{
-            var pagination = document.getElementById('pagination-' + sourceIdx);
-            if (!pagination) return;
-            
-            var buttons = pagination.querySelectorAll('button');
-            buttons[0].disabled = currentPage === 1;  // 首页
-            buttons[1].disabled = currentPage === 1;  // 上一页
-            buttons[2].disabled = currentPage === totalPages;  // 下一页
-            buttons[3].disabled = currentPage === totalPages;  // 末页
-        }}
-        
-        // 获取总页数
-        function getTotalPages(sourceIdx) {{
-            var data = filteredData[sourceIdx] || [];
-            return Math.ceil(data.length / pageSize) || 1;
-        }}
-        
-        // 跳转到指定页
-        function goToPage(sourceIdx, page) {{
-            var totalPages = getTotalPages(sourceIdx);
-            if (page < 1) page = 1;
-            if (page > totalPages) page = totalPages;
-            currentPages[sourceIdx] = page;
-            renderPage(sourceIdx);
-        }}
-        
-        // 上一页
-        function prevPage(sourceIdx) {{
-            goToPage(sourceIdx, (currentPages[sourceIdx] || 1) - 1);
-        }}
-        
-        // 下一页
-        function nextPage(sourceIdx) {{
-            goToPage(sourceIdx, (currentPages[sourceIdx] || 1) + 1);
-        }}
-        
-        // 跳转到输入的页码
-        function jumpToPage(sourceIdx) {{
-            var input = document.querySelector('.page-input-' + sourceIdx);
-            if (input && input.value) {{
-                goToPage(sourceIdx, parseInt(input.value));
-                input.value = '';
-            }}
-        }}
-        
-        // 应用筛选
-        function applyTradesFilter(sourceIdx) {{
-            var timeFilter = document.querySelector('.filter-time-' + sourceIdx);
-            var priceFilter = document.querySelector('.filter-price-' + sourceIdx);
-            var actionFilter = document.querySelector('.filter-action-' + sourceIdx);
-            var profitFilter = document.querySelector('.filter-profit-' + sourceIdx);
-            
-            var timeValue = timeFilter ? timeFilter.value.trim().toLowerCase() : '';
-            var priceValue = priceFilter ? priceFilter.value.trim() : '';
-            var actionValue = actionFilter ? actionFilter.value : '';
-            var profitValue = profitFilter ? profitFilter.value : '';
-            
-            var originalData = tradesData[sourceIdx] || [];
-            
-            filteredData[sourceIdx] = originalData.filter(function(item) {{
-                // 时间筛选
-                if (timeValue && item.time.toLowerCase().indexOf(timeValue) === -1) {{
-                    return false;
-                }}
-                // 价格筛选
-                if (priceValue && item.price.indexOf(priceValue) === -1) {{
-                    return false;
-                }}
-                // 操作筛选
-                if (actionValue && item.action.indexOf(actionValue) === -1) {{
-                    return false;
-                }}
-                // 盈亏筛选
-                if (profitValue) {{
-                    var profitText = item.profit.replace(/[,\s]/g, '');
-                    var profitNum = parseFloat(profitText);
-                    if (profitValue === 'profit' && (isNaN(profitNum) || profitNum <= 0)) {{
-                        return false;
-                    }}
-                    if (profitValue === 'loss' && (isNaN(profitNum) || profitNum >= 0)) {{
-                        return false;
-                    }}
-                }}
-                return true;
-            }});
-            
-            currentPages[sourceIdx] = 1;
-            renderPage(sourceIdx);
-        }}
-        
-        // 重置筛选
-        function resetTradesFilter(sourceIdx) {{
-            var timeFilter = document.querySelector('.filter-time-' + sourceIdx);
-            var priceFilter = document.querySelector('.filter-price-' + sourceIdx);
-            var actionFilter = document.querySelector('.filter-action-' + sourceIdx);
-            var profitFilter = document.querySelector('.filter-profit-' + sourceIdx);
-            
-            if (timeFilter) timeFilter.value = '';
-            if (priceFilter) priceFilter.value = '';
-            if (actionFilter) actionFilter.value = '';
-            if (profitFilter) profitFilter.value = '';
-            
-            filteredData[sourceIdx] = tradesData[sourceIdx].slice();
-            currentPages[sourceIdx] = 1;
-            renderPage(sourceIdx);
-        }}
-        
-        // 页面加载后初始化所有交易表格
-        document.addEventListener('DOMContentLoaded', function() {{
-            // 查找所有交易表格并初始化
-            var tables = document.querySelectorAll('[id^="trades-table-"]');
-            tables.forEach(function(table) {{
-                var idx = parseInt(table.id.replace('trades-table-', ''));
-                if (!isNaN(idx)) {{
-                    initTradesTable(idx);
-                }}
-            }});
-        }});
+        // 图表数据
+        var profitDataSources = $profit_data_sources;
+        var combinedProfitData = $combined_profit_data;
+        var combinedGrossProfitData = $combined_gross_profit_data;
+        var priceDataSources = $price_data_sources;
+        var drawdownDataSources = $drawdown_data_sources;
+        var combinedDrawdownData = $combined_drawdown_data;
+        var klineDataSources = $kline_data_sources;
+        var tradesDataSources = $trades_data_sources;
+    </script>
+    <script>
+$report_js
     </script>
 </body>
-</html>'''
+</html>''')
+    
+    # 模板切分后的片段，生成报告时逐段写入文件
+    HTML_SEGMENTS = _split_template(HTML_TEMPLATE)
+    
+    # 内联 plotly.min.js 的 script 标签，首次加载成功后在进程内复用
+    _plotly_cache = None
+
+    # 指标卡片、对比表格行的 % 格式模板（逐行拼接时复用）
+    METRIC_CARD_TEMPLATE = '''
+            <div class="metric-card">
+                <div class="label">%s</div>
+                <div class="value %s">%s</div>
+            </div>'''
+    
+    # 指标卡片配置：(指标key, 标签, 格式化函数, 固定颜色类, 后缀)，格式化函数在类定义时生成一次
+    METRIC_CONFIGS = (
+        ('initial_capital', '初始资金', '{:,.0f}'.format, 'neutral', ''),
+        ('final_equity', '期末权益', '{:,.0f}'.format, None, ''),
+        ('total_return', '总收益率', '{:+.2f}'.format, None, '%'),
+        ('total_amount_profit', '毛利润(不含成本)', '{:,.2f}'.format, None, ''),
+        ('total_commission', '总手续费', '{:,.2f}'.format, 'neutral', ''),
+        ('total_slippage', '总滑点成本', '{:,.2f}'.format, 'neutral', ''),
+        ('total_net_profit', '净利润(扣除成本)', '{:,.2f}'.format, None, ''),
+        ('total_trades', '总交易次数', _format_int, 'neutral', ''),
+        ('win_rate', '胜率', '{:.2f}'.format, None, '%'),
+        ('max_drawdown_pct', '最大回撤', '{:.2f}'.format, 'negative', '%'),
+        ('annual_return', '年化收益率', '{:+.2f}'.format, None, '%'),
+        ('sharpe_ratio', '夏普比率', '{:.2f}'.format, None, ''),
+        ('profit_factor', '盈亏比', '{:.2f}'.format, None, ''),
+    )
+    
+    # 没有固定颜色类的指标按数值决定颜色类，未列出的指标为 neutral
+    METRIC_CLASS_RULES = {
+        'total_return': _sign_class,
+        'annual_return': _sign_class,
+        'total_net_profit': _sign_class,
+        'total_amount_profit': _sign_class,
+        'win_rate': lambda value: 'positive' if value >= 50 else 'negative',
+        'sharpe_ratio': lambda value: 'positive' if value > 1 else 'neutral' if value > 0 else 'negative',
+        'profit_factor': lambda value: 'positive' if value > 1 else 'negative',
+    }
+    
+    COMPARISON_ROW_TEMPLATE = '''
+            <tr%s>
+                <td>%s</td>
+                <td>%s</td>
+                <td>%s</td>
+                <td class="%s">%s%%</td>
+                <td>%s</td>
+                <td>%s</td>
+                <td>%s</td>
+                <td>%s%%</td>
+                <td class="loss">-%s%%</td>
+                <td>%s</td>
+            </tr>'''
 
     def __init__(self, logger=None):
         """初始化报告生成器
@@ -1204,40 +616,45 @@ class HTMLReportGenerator:
     def _load_plotly_js(self) -> str:
         """从本地加载 plotly.min.js，如果本地文件不存在则使用 CDN 备用
         
+        本地文件以 gzip+base64 形式嵌入（约3.6MB压缩到约1.4MB），由浏览器解压后执行，
+        压缩在进程内只进行一次，拼好的 script 标签缓存在类属性中；CDN 引用带 defer，
+        不阻塞页面解析。页面脚本通过 window.plotlyReady 等待 plotly.js 就绪后再绘图。
+        
         Returns:
-            完整的 script 标签（内联 JS 或 CDN 引用）
+            完整的 script 标签（内联加载脚本或 CDN 引用）
         """
-        # CDN 备用地址
+        # CDN 备用地址（报告使用 scattergl，需要完整版 plotly.js，finance/basic 分包不包含）
         CDN_URL = "https://cdn.bootcdn.net/ajax/libs/plotly.js/2.27.0/plotly.min.js"
         
-        # 获取当前文件所在目录
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        # 构建 plotly.min.js 的路径 (相对于 ssquant/backtest/ -> ssquant/assets/)
-        plotly_path = os.path.join(current_dir, '..', 'assets', 'plotly.min.js')
-        plotly_path = os.path.normpath(plotly_path)
+        if HTMLReportGenerator._plotly_cache is not None:
+            return HTMLReportGenerator._plotly_cache
         
         try:
-            with open(plotly_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            self.log(f"已从本地加载 plotly.min.js: {plotly_path}")
-            # 返回内联 script 标签
-            return f'<script>{content}</script>'
+            content = _load_asset('plotly.min.js')
+            self.log("已从本地加载 plotly.min.js")
+            # 返回内联加载脚本（mtime固定为0，同一份 plotly.js 每次压缩结果相同）
+            plotly_b64 = base64.b64encode(gzip.compress(content.encode('utf-8'), 9, mtime=0)).decode('ascii')
+            HTMLReportGenerator._plotly_cache = _PLOTLY_LOADER.substitute(cdn_url=CDN_URL, plotly_b64=plotly_b64)
+            return HTMLReportGenerator._plotly_cache
         except FileNotFoundError:
             self.log(f"本地 plotly.min.js 未找到，使用 CDN 备用: {CDN_URL}")
             # 返回 CDN 引用的 script 标签
-            return f'<script src="{CDN_URL}"></script>'
+            return f'<script defer src="{CDN_URL}"></script>'
         except Exception as e:
             self.log(f"加载本地 plotly.min.js 失败 ({e})，使用 CDN 备用")
             # 返回 CDN 引用的 script 标签
-            return f'<script src="{CDN_URL}"></script>'
+            return f'<script defer src="{CDN_URL}"></script>'
     
-    def generate_report(self, results: Dict, multi_data_source=None, output_dir: str = "backtest_results") -> str:
+    def generate_report(self, results: Dict, multi_data_source=None, output_dir: str = "backtest_results",
+                        compress: bool = False) -> str:
         """生成 HTML 回测报告
         
         Args:
             results: 回测结果字典
             multi_data_source: 多数据源实例
             output_dir: 输出目录
+            compress: 是否同时写出 gzip 预压缩的 .html.gz 文件
+                （通过本地服务器以 Content-Encoding: gzip 提供时可直接使用）
             
         Returns:
             报告文件路径
@@ -1265,38 +682,39 @@ class HTMLReportGenerator:
         self.log(f"找到 {len(filtered_results)} 个数据源的结果")
         
         # 提取所有数据源信息
-        source_infos = []
-        for key, result in filtered_results.items():
-            source_infos.append({
-                'key': key,
-                'symbol': result.get('symbol', 'unknown'),
-                'kline_period': result.get('kline_period', ''),
-                'result': result
-            })
+        source_infos = [{
+            'key': key,
+            'symbol': result.get('symbol', 'unknown'),
+            'kline_period': result.get('kline_period', ''),
+            'result': result
+        } for key, result in filtered_results.items()]
         
         # 策略信息
-        strategy_info = ' | '.join([f"{s['symbol']} {s['kline_period']}" for s in source_infos])
+        strategy_info = ' | '.join(f"{info['symbol']} {info['kline_period']}" for info in source_infos)
         
         # 计算综合指标
         combined_metrics = self._calculate_combined_metrics(filtered_results)
         
+        # 一次提取各数据源的权益、利润、回撤曲线和日期
+        prepared = self._prepare_source_arrays(filtered_results)
+        
         # 获取各数据源的利润曲线（从0开始，便于对比）
-        profit_data_sources = self._get_profit_data_sources(filtered_results)
+        profit_data_sources = self._get_profit_data_sources(prepared)
         
         # 计算综合利润曲线（净利润：扣除成本）
-        combined_profit_data = self._get_combined_profit_data(filtered_results)
+        combined_profit_data = self._get_combined_profit_data(prepared)
         
         # 计算综合毛利润曲线（不扣除成本）
-        combined_gross_profit_data = self._get_combined_gross_profit_data(filtered_results)
+        combined_gross_profit_data = self._get_combined_gross_profit_data(prepared)
         
         # 获取价格曲线数据（用于右侧Y轴显示）
         price_data_sources = self._get_price_data_sources(filtered_results)
         
         # 计算各数据源的回撤（基于权益曲线计算，更准确）
-        drawdown_data_sources = self._get_drawdown_from_results(filtered_results)
+        drawdown_data_sources = self._get_drawdown_from_results(prepared)
         
         # 计算综合回撤（基于综合权益）
-        combined_drawdown_data = self._get_combined_drawdown(filtered_results)
+        combined_drawdown_data = self._get_combined_drawdown(prepared)
         
         # 提取 K线数据和交易标记
         kline_data_sources = self._get_kline_data_sources(filtered_results)
@@ -1309,8 +727,8 @@ class HTMLReportGenerator:
         
         # 获取日期范围
         if combined_profit_data['dates']:
-            start_date = combined_profit_data['dates'][0]
-            end_date = combined_profit_data['dates'][-1]
+            start_date = combined_profit_data['dates'][0].replace('T', ' ')[:16]
+            end_date = combined_profit_data['dates'][-1].replace('T', ' ')[:16]
         else:
             start_date = '-'
             end_date = '-'
@@ -1318,38 +736,67 @@ class HTMLReportGenerator:
         # 加载 plotly.js（本地优先，CDN 备用）
         plotly_script_tag = self._load_plotly_js()
         
-        # 填充模板
-        html = self.HTML_TEMPLATE.format(
-            strategy_name=strategy_info,
-            strategy_info=strategy_info,
-            start_date=start_date,
-            end_date=end_date,
-            report_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            combined_metrics_cards=combined_metrics_cards,
-            source_comparison_section=source_comparison_section,
-            source_tabs=source_tabs,
-            source_details=source_details,
-            profit_data_sources=json.dumps(profit_data_sources, cls=NumpyEncoder),
-            combined_profit_data=json.dumps(combined_profit_data, cls=NumpyEncoder),
-            combined_gross_profit_data=json.dumps(combined_gross_profit_data, cls=NumpyEncoder),
-            price_data_sources=json.dumps(price_data_sources, cls=NumpyEncoder),
-            drawdown_data_sources=json.dumps(drawdown_data_sources, cls=NumpyEncoder),
-            combined_drawdown_data=json.dumps(combined_drawdown_data, cls=NumpyEncoder),
-            kline_data_sources=json.dumps(kline_data_sources, cls=NumpyEncoder),
-            plotly_script_tag=plotly_script_tag
-        )
+        # 模板中的文本字段
+        values = {
+            'strategy_name': strategy_info,
+            'strategy_info': strategy_info,
+            'start_date': start_date,
+            'end_date': end_date,
+            'report_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'combined_metrics_cards': combined_metrics_cards,
+            'source_comparison_section': source_comparison_section,
+            'source_tabs': source_tabs,
+            'source_details': source_details,
+            'plotly_script_tag': plotly_script_tag,
+            'report_css': _load_asset('report.css'),
+            'report_js': _load_asset('report.js'),
+        }
+        # 图表数据，写到对应位置时才序列化
+        json_values = {
+            'profit_data_sources': profit_data_sources,
+            'combined_profit_data': combined_profit_data,
+            'combined_gross_profit_data': combined_gross_profit_data,
+            'price_data_sources': price_data_sources,
+            'drawdown_data_sources': drawdown_data_sources,
+            'combined_drawdown_data': combined_drawdown_data,
+            'kline_data_sources': kline_data_sources,
+            'trades_data_sources': [self._get_trades_table_data(info['result'].get('trades', []))
+                                    for info in source_infos],
+        }
         
         # 保存文件
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         first_symbol = source_infos[0]['symbol']
         output_path = os.path.join(output_dir, f"{first_symbol}_report_{timestamp}.html")
+        gz_path = output_path + '.gz' if compress else None
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        self._write_report(output_path, gz_path, values, json_values)
         
         self.log(f"HTML 报告已保存到: {output_path}")
+        if gz_path:
+            self.log(f"HTML 压缩报告已保存到: {gz_path}")
         return output_path
     
+    def _write_report(self, output_path: str, gz_path: Optional[str], values: Dict[str, str],
+                      json_values: Dict[str, Any]):
+        """按模板片段把报告逐段写入文件，不在内存中拼出完整的HTML
+        
+        Args:
+            output_path: HTML 文件路径
+            gz_path: 同时写出的 gzip 压缩文件路径，为None时不写
+            values: 文本占位符的值
+            json_values: 图表数据占位符的值，写到对应位置时才序列化
+        """
+        with ExitStack() as stack:
+            outputs = [stack.enter_context(open(output_path, 'wb'))]
+            if gz_path:
+                outputs.append(stack.enter_context(gzip.open(gz_path, 'wb', compresslevel=6)))
+            for name, chunk in self.HTML_SEGMENTS:
+                if name is not None:
+                    chunk = _dumps_json(json_values[name]) if name in json_values else values[name].encode('utf-8')
+                for output in outputs:
+                    output.write(chunk)
+    
     def _calculate_combined_metrics(self, results: Dict) -> Dict:
         """计算综合绩效指标"""
         metrics = {
@@ -1415,35 +862,68 @@ class HTMLReportGenerator:
         
         return metrics
     
-    def _get_profit_data_sources(self, results: Dict) -> List[Dict]:
+    def _prepare_source_arrays(self, results: Dict) -> Dict[str, Dict]:
+        """一次遍历各数据源，提取利润/回撤曲线和图表需要的公共数据
+        
+        每个数据源的权益曲线只构造一次，利润曲线、回撤和日期字符串只计算一次，
+        各图表数据从这里取用。点数超过 _REPORT_MAX_POINTS 时按最小/最大值降采样，
+        利润曲线和回撤保留的时间点取并集，共用同一组日期。
+        
+        Args:
+            results: 回测结果字典
+            
+        Returns:
+            dict: {数据源key: {'name', 'initial_capital', 'equity', 'profit', 'gross_profit',
+                'index', 'dates', 'profit_values', 'drawdown_pct'}}，
+                profit/gross_profit 为完整曲线（用于合并），index/dates/profit_values/drawdown_pct
+                为降采样后的图表数据，没有权益曲线的数据源 equity 为None
+        """
+        prepared = {}
+        for key, result in results.items():
+            initial_capital = result.get('initial_capital', 100000)
+            equity_curve = get_equity_series(result)
+            gross_equity_curve = get_equity_series(result, gross=True)
+            entry = {
+                'name': f"{result.get('symbol', '')} {result.get('kline_period', '')}",
+                'initial_capital': initial_capital,
+                'equity': equity_curve,
+                'profit': None,
+                'gross_profit': gross_equity_curve - initial_capital if gross_equity_curve is not None else None,
+                'index': None,
+                'dates': [],
+                'profit_values': None,
+                'drawdown_pct': None,
+            }
+            if equity_curve is not None:
+                # 利润曲线（权益 - 初始资金）
+                entry['profit'] = equity_curve - initial_capital
+                if not equity_curve.empty:
+                    profit_values = entry['profit'].to_numpy(dtype=np.float64)
+                    drawdown = _drawdown_pct(equity_curve.to_numpy(dtype=np.float64))
+                    selected = np.union1d(_minmax_indices(profit_values, _REPORT_MAX_POINTS),
+                                          _minmax_indices(drawdown, _REPORT_MAX_POINTS))
+                    # 日期转为字符串列表，利润曲线和回撤共用
+                    entry['index'] = equity_curve.index[selected]
+                    entry['dates'] = _format_dates(entry['index'])
+                    entry['profit_values'] = profit_values[selected]
+                    entry['drawdown_pct'] = drawdown[selected]
+            prepared[key] = entry
+        return prepared
+    
+    def _get_profit_data_sources(self, prepared: Dict[str, Dict]) -> List[Dict]:
         """获取各数据源的利润曲线数据（从0开始，便于对比）"""
         profit_sources = []
         
-        for key, result in results.items():
-            if 'equity_curve' not in result:
+        for entry in prepared.values():
+            if entry['drawdown_pct'] is None:
                 continue
-                
-            equity_curve = result['equity_curve']
-            if not isinstance(equity_curve, pd.Series) or equity_curve.empty:
-                continue
-            
-            # 获取初始资金
-            initial_capital = result.get('initial_capital', 100000)
-            
-            # 计算利润曲线（权益 - 初始资金）
-            profit_curve = equity_curve - initial_capital
-            
-            # 转换为列表（保留原始数据）
-            dates = [d.strftime('%Y-%m-%d %H:%M') if hasattr(d, 'strftime') else str(d) for d in profit_curve.index]
-            values = profit_curve.values.tolist()
-            
-            name = f"{result.get('symbol', '')} {result.get('kline_period', '')}"
             
+            # 数值保持 float64 数组由序列化函数整块写出
             profit_sources.append({
-                'name': name,
-                'dates': dates,
-                'values': values,
-                'initial_capital': initial_capital
+                'name': entry['name'],
+                'dates': entry['dates'],
+                'values': entry['profit_values'],
+                'initial_capital': entry['initial_capital']
             })
         
         return profit_sources
@@ -1469,18 +949,22 @@ class HTMLReportGenerator:
             else:
                 continue
             
-            # 转换为列表
-            dates = [d.strftime('%Y-%m-%d %H:%M') if hasattr(d, 'strftime') else str(d) for d in close_prices.index]
+            # 点数过多时用LTTB选点，只嵌入保留下来的价格
+            if len(close_prices) > _REPORT_MAX_POINTS:
+                close_prices = close_prices.iloc[_lttb_indices(close_prices.to_numpy(), _REPORT_MAX_POINTS)]
+            
+            # 日期转为字符串列表，数值保持 float64 数组
+            dates = _format_dates(close_prices.index)
             
             # 多数据源时使用归一化（相对值，起点=100）
             if num_sources > 1:
                 first_price = close_prices.iloc[0] if close_prices.iloc[0] != 0 else 1
-                normalized_prices = (close_prices / first_price * 100).values.tolist()
+                normalized_prices = np.ascontiguousarray((close_prices / first_price * 100).values, dtype=np.float64)
                 values = normalized_prices
                 is_normalized = True
             else:
                 # 单数据源直接使用原始价格
-                values = close_prices.values.tolist()
+                values = np.ascontiguousarray(close_prices.values, dtype=np.float64)
                 is_normalized = False
             
             name = f"{result.get('symbol', '')} {result.get('kline_period', '')}"
@@ -1494,174 +978,119 @@ class HTMLReportGenerator:
         
         return price_sources
     
-    def _get_combined_profit_data(self, results: Dict) -> Dict:
+    def _get_combined_profit_data(self, prepared: Dict[str, Dict]) -> Dict:
         """获取综合利润曲线数据（所有数据源的利润相加）
         
         对于多周期数据，使用交集（intersection）只保留共同时间点，
         避免 ffill 导致的水平线延伸问题。
         """
-        all_profit_curves = []
-        
-        for key, result in results.items():
-            if 'equity_curve' in result and isinstance(result['equity_curve'], pd.Series):
-                initial_capital = result.get('initial_capital', 100000)
-                profit_curve = result['equity_curve'] - initial_capital
-                all_profit_curves.append(profit_curve)
-        
-        if not all_profit_curves:
+        all_profit_curves = [entry['profit'] for entry in prepared.values() if entry['profit'] is not None]
+        combined = self._combine_profit_curves(all_profit_curves)
+        if combined is None:
             return {'dates': [], 'values': []}
         
-        # 合并利润曲线
-        if len(all_profit_curves) == 1:
-            combined = all_profit_curves[0]
-        else:
-            # 使用交集：只保留所有数据源都有数据的时间点
-            common_indices = all_profit_curves[0].index
-            for curve in all_profit_curves[1:]:
-                common_indices = common_indices.intersection(curve.index)
-            
-            # 如果没有共同时间点，使用最短周期的数据
-            if len(common_indices) == 0:
-                # 找到数据点最多的曲线作为基准
-                base_curve = max(all_profit_curves, key=len)
-                combined = base_curve.copy()
-                for curve in all_profit_curves:
-                    if curve is not base_curve:
-                        # 只在有数据的时间点相加
-                        aligned = curve.reindex(base_curve.index)
-                        combined = combined + aligned.fillna(0)
-            else:
-                # 在共同时间点上相加
-                combined = pd.Series(0.0, index=common_indices)
-                for curve in all_profit_curves:
-                    combined = combined + curve.reindex(common_indices)
-        
-        # 不做降采样，保留原始数据
-        dates = [d.strftime('%Y-%m-%d %H:%M') if hasattr(d, 'strftime') else str(d) for d in combined.index]
-        values = combined.values.tolist()
-        
-        return {'dates': dates, 'values': values}
+        return self._decimated_curve(combined.index, combined.to_numpy(dtype=np.float64), prepared)
     
-    def _get_combined_gross_profit_data(self, results: Dict) -> Dict:
+    def _get_combined_gross_profit_data(self, prepared: Dict[str, Dict]) -> Dict:
         """获取综合毛利润曲线数据（不扣除成本）"""
-        all_gross_curves = []
-        
-        for key, result in results.items():
-            if 'gross_equity_curve' in result and isinstance(result['gross_equity_curve'], pd.Series):
-                initial_capital = result.get('initial_capital', 100000)
-                gross_profit_curve = result['gross_equity_curve'] - initial_capital
-                all_gross_curves.append(gross_profit_curve)
-        
-        if not all_gross_curves:
+        all_gross_curves = [entry['gross_profit'] for entry in prepared.values() if entry['gross_profit'] is not None]
+        combined = self._combine_profit_curves(all_gross_curves)
+        if combined is None:
             return {'dates': [], 'values': []}
         
-        # 合并毛利润曲线
-        if len(all_gross_curves) == 1:
-            combined = all_gross_curves[0]
-        else:
-            # 使用交集：只保留所有数据源都有数据的时间点
-            common_indices = all_gross_curves[0].index
-            for curve in all_gross_curves[1:]:
-                common_indices = common_indices.intersection(curve.index)
-            
-            if len(common_indices) == 0:
-                base_curve = max(all_gross_curves, key=len)
-                combined = base_curve.copy()
-                for curve in all_gross_curves:
-                    if curve is not base_curve:
-                        aligned = curve.reindex(base_curve.index)
-                        combined = combined + aligned.fillna(0)
-            else:
-                combined = pd.Series(0.0, index=common_indices)
-                for curve in all_gross_curves:
-                    combined = combined + curve.reindex(common_indices)
-        
-        dates = [d.strftime('%Y-%m-%d %H:%M') if hasattr(d, 'strftime') else str(d) for d in combined.index]
-        values = combined.values.tolist()
+        return self._decimated_curve(combined.index, combined.to_numpy(dtype=np.float64), prepared)
+    
+    def _combine_profit_curves(self, curves: List[pd.Series]) -> Optional[pd.Series]:
+        """合并多条利润曲线，没有曲线时返回None"""
+        if not curves:
+            return None
+        if len(curves) == 1:
+            return curves[0]
+        
+        # 使用交集：只保留所有数据源都有数据的时间点
+        combined = _sum_on_common_index(curves)
+        
+        # 如果没有共同时间点，使用数据点最多的曲线作为基准
+        if combined is None:
+            base_curve = max(curves, key=len)
+            # 只在有数据的时间点相加
+            aligned = _align_to_index([curve for curve in curves if curve is not base_curve], base_curve.index)
+            combined = base_curve + aligned.fillna(0).sum(axis=1)
+        return combined
+    
+    def _decimated_curve(self, index: pd.Index, values: np.ndarray, prepared: Dict[str, Dict]) -> Dict:
+        """综合曲线按最小/最大值降采样后的图表数据
         
-        return {'dates': dates, 'values': values}
+        保留下来的时间点与某个数据源相同时，直接复用其已格式化的日期。
+        """
+        selected = _minmax_indices(values, _REPORT_MAX_POINTS)
+        index = index[selected]
+        dates = None
+        for entry in prepared.values():
+            if entry['dates'] and entry['index'].equals(index):
+                dates = entry['dates']
+                break
+        if dates is None:
+            dates = _format_dates(index)
+        return {'dates': dates, 'values': values[selected]}
     
-    def _get_drawdown_from_results(self, results: Dict) -> List[Dict]:
+    def _get_drawdown_from_results(self, prepared: Dict[str, Dict]) -> List[Dict]:
         """从回测结果计算各数据源的回撤数据（基于权益曲线）"""
         drawdown_sources = []
         
-        for key, result in results.items():
-            if 'equity_curve' not in result:
-                continue
-                
-            equity_curve = result['equity_curve']
-            if not isinstance(equity_curve, pd.Series) or equity_curve.empty:
+        for entry in prepared.values():
+            if entry['drawdown_pct'] is None:
                 continue
             
-            # 计算回撤百分比
-            cummax = equity_curve.cummax()
-            drawdown_pct = (cummax - equity_curve) / cummax * 100
-            drawdown_pct = drawdown_pct.fillna(0)
-            
-            # 转换为列表（保留原始数据）
-            dates = [d.strftime('%Y-%m-%d %H:%M') if hasattr(d, 'strftime') else str(d) for d in drawdown_pct.index]
-            values = drawdown_pct.values.tolist()
-            
-            name = f"{result.get('symbol', '')} {result.get('kline_period', '')}"
-            
             drawdown_sources.append({
-                'name': name,
-                'dates': dates,
-                'values': values
+                'name': entry['name'],
+                'dates': entry['dates'],
+                'values': entry['drawdown_pct']
             })
         
         return drawdown_sources
     
-    def _get_combined_drawdown(self, results: Dict) -> Dict:
+    def _get_combined_drawdown(self, prepared: Dict[str, Dict]) -> Dict:
         """计算综合回撤（基于综合权益曲线）
         
         对于多周期数据，使用交集（intersection）只保留共同时间点。
         """
-        all_equity_curves = []
-        
-        for key, result in results.items():
-            if 'equity_curve' in result and isinstance(result['equity_curve'], pd.Series):
-                all_equity_curves.append(result['equity_curve'])
+        all_equity_curves = [entry['equity'] for entry in prepared.values() if entry['equity'] is not None]
         
         if not all_equity_curves:
             return {'dates': [], 'values': []}
         
         # 合并权益曲线
         if len(all_equity_curves) == 1:
+            # 单数据源的回撤已经算过
+            entry = next(entry for entry in prepared.values() if entry['equity'] is not None)
+            if entry['drawdown_pct'] is not None:
+                return {'dates': entry['dates'], 'values': entry['drawdown_pct']}
             combined = all_equity_curves[0]
         else:
             # 使用交集：只保留所有数据源都有数据的时间点
-            common_indices = all_equity_curves[0].index
-            for curve in all_equity_curves[1:]:
-                common_indices = common_indices.intersection(curve.index)
+            combined = _sum_on_common_index(all_equity_curves)
             
             # 如果没有共同时间点，使用最长周期的数据
-            if len(common_indices) == 0:
+            if combined is None:
                 base_curve = max(all_equity_curves, key=len)
-                combined = base_curve.copy()
-                for curve in all_equity_curves:
-                    if curve is not base_curve:
-                        aligned = curve.reindex(base_curve.index)
-                        combined = combined + aligned.fillna(method='ffill').fillna(method='bfill')
-            else:
-                # 在共同时间点上相加
-                combined = pd.Series(0.0, index=common_indices)
-                for curve in all_equity_curves:
-                    combined = combined + curve.reindex(common_indices)
+                # 其余曲线一次对齐到基准时间点，整块前后填充后按行求和
+                aligned = _align_to_index([curve for curve in all_equity_curves if curve is not base_curve],
+                                          base_curve.index)
+                combined = base_curve + aligned.ffill().bfill().sum(axis=1, skipna=False)
         
         # 计算回撤
-        cummax = combined.cummax()
-        drawdown_pct = (cummax - combined) / cummax * 100
-        drawdown_pct = drawdown_pct.fillna(0)
-        
-        # 不做降采样，保留原始数据
-        dates = [d.strftime('%Y-%m-%d %H:%M') if hasattr(d, 'strftime') else str(d) for d in drawdown_pct.index]
-        values = drawdown_pct.values.tolist()
-        
-        return {'dates': dates, 'values': values}
+        return self._decimated_curve(combined.index, _drawdown_pct(combined.to_numpy(dtype=np.float64)), prepared)
     
     def _get_kline_data_sources(self, results: Dict) -> List[Dict]:
-        """提取各数据源的 K线/TICK 数据和交易标记（向量化处理）"""
+        """提取各数据源的 K线/TICK 数据和交易标记（向量化处理）
+        
+        超过 _REPORT_MAX_POINTS 的序列先降采样：K线按桶合并OHLC，TICK价格线用LTTB选点。
+        X轴为日期轴，交易标记按实际成交时间绘制。
+        
+        Args:
+            results: 回测结果字典
+        """
         kline_sources = []
         
         for key, result in results.items():
@@ -1670,91 +1099,47 @@ class HTMLReportGenerator:
             if data is None or not isinstance(data, pd.DataFrame) or data.empty:
                 continue
             
-            df = data.copy()
+            df = data
             kline_period = result.get('kline_period', '')
             is_tick = kline_period.lower() == 'tick' or 'LastPrice' in df.columns
             
-            # 提取日期（索引或列）- TICK数据保留毫秒
+            # 日期（索引或列），都没有时为None
             if isinstance(df.index, pd.DatetimeIndex):
-                if is_tick:
-                    # TICK数据保留毫秒精度（格式：2026-01-06 10:34:00.500）
-                    dates = [d.strftime('%Y-%m-%d %H:%M:%S.') + f'{d.microsecond // 1000:03d}' 
-                             for d in df.index]
-                else:
-                    dates = df.index.strftime('%Y-%m-%d %H:%M').tolist()
+                dt_index = df.index
             elif 'datetime' in df.columns:
-                dt_series = pd.to_datetime(df['datetime'])
-                if is_tick:
-                    dates = [d.strftime('%Y-%m-%d %H:%M:%S.') + f'{d.microsecond // 1000:03d}' 
-                             for d in dt_series]
-                else:
-                    dates = dt_series.dt.strftime('%Y-%m-%d %H:%M').tolist()
+                # 已是日期类型的列直接使用，不再经过 to_datetime
+                dt_series = df['datetime']
+                if not pd.api.types.is_datetime64_any_dtype(dt_series):
+                    dt_series = pd.to_datetime(dt_series)
+                dt_index = pd.DatetimeIndex(dt_series)
             else:
-                dates = [str(i) for i in range(len(df))]
+                dt_index = None
             
             if is_tick:
                 # TICK 数据：使用 LastPrice 作为价格线
                 if 'LastPrice' in df.columns:
-                    prices = df['LastPrice'].tolist()
+                    columns = {'prices': df['LastPrice'].to_numpy(dtype=np.float64)}
                 elif 'close' in df.columns:
-                    prices = df['close'].tolist()
+                    columns = {'prices': df['close'].to_numpy(dtype=np.float64)}
                 else:
                     continue
-                
-                ohlc = {
-                    'dates': dates,
-                    'prices': prices,  # TICK 用单一价格线
-                    'is_tick': True
-                }
             else:
                 # K线数据：需要 OHLC
                 required_cols = ['open', 'high', 'low', 'close']
                 if not all(col in df.columns for col in required_cols):
                     continue
-                
-                ohlc = {
-                    'dates': dates,
-                    'open': df['open'].tolist(),
-                    'high': df['high'].tolist(),
-                    'low': df['low'].tolist(),
-                    'close': df['close'].tolist(),
-                    'is_tick': False
-                }
+                # 逐列取连续的float64数组（float64列直接是底层数据的视图，不复制），
+                # 之后的降采样和编码都不再需要类型转换
+                columns = {col: df[col].to_numpy(dtype=np.float64) for col in required_cols}
             
-            # 提取交易标记
-            trades = result.get('trades', [])
-            buy_markers = {'x': [], 'y': [], 'text': []}
-            sell_markers = {'x': [], 'y': [], 'text': []}
+            dates, price_arrays = self._downsample_prices(dt_index, columns, is_tick)
             
-            for trade in trades:
-                trade_time = trade.get('datetime', '')
-                price = trade.get('price', 0)
-                action = trade.get('action', '')
-                volume = trade.get('volume', 1)
-                
-                # 格式化时间 - TICK数据保留毫秒
-                if is_tick:
-                    # 尝试解析为datetime并格式化（保留毫秒）
-                    try:
-                        if hasattr(trade_time, 'strftime'):
-                            dt = trade_time
-                        else:
-                            dt = pd.to_datetime(trade_time)
-                        # 格式：2026-01-06 10:34:00.500
-                        trade_time = dt.strftime('%Y-%m-%d %H:%M:%S.') + f'{dt.microsecond // 1000:03d}'
-                    except:
-                        trade_time = str(trade_time)[:23]  # 保留到毫秒
-                else:
-                    trade_time = str(trade_time)[:16]  # K线只保留到分钟
-                
-                if action in ['开多', '平空']:
-                    buy_markers['x'].append(trade_time)
-                    buy_markers['y'].append(price)
-                    buy_markers['text'].append(f"{action} {volume}手 @ {price:.2f}")
-                elif action in ['开空', '平多']:
-                    sell_markers['x'].append(trade_time)
-                    sell_markers['y'].append(price)
-                    sell_markers['text'].append(f"{action} {volume}手 @ {price:.2f}")
+            ohlc = {'dates': dates, 'is_tick': is_tick}
+            for col, values in price_arrays.items():
+                ohlc[col] = _encode_float64(values)
+            
+            # 提取交易标记
+            buy_markers, sell_markers = self._get_trade_markers(result.get('trades', []), is_tick)
             
             name = f"{result.get('symbol', '')} {kline_period}"
             
@@ -1768,6 +1153,96 @@ class HTMLReportGenerator:
         
         return kline_sources
     
+    def _downsample_prices(self, dt_index: Optional[pd.DatetimeIndex], columns: Dict[str, np.ndarray],
+                           is_tick: bool):
+        """降采样价格序列并格式化保留下来的日期
+        
+        Args:
+            dt_index: 日期索引，没有日期时为None
+            columns: TICK为 {'prices': 价格}，K线为 open/high/low/close
+            is_tick: 是否为TICK数据
+            
+        Returns:
+            tuple: (日期字符串列表, {列名: float64数组})
+        """
+        count = len(next(iter(columns.values())))
+        if is_tick:
+            # TICK 用单一价格线，点数过多时用LTTB选点
+            selected = _lttb_indices(columns['prices'], _REPORT_MAX_POINTS)
+            price_arrays = {'prices': columns['prices'][selected]}
+        elif count > _REPORT_MAX_POINTS:
+            # K线过多时按桶合并
+            selected = _ohlc_bucket_starts(count, _REPORT_MAX_POINTS)
+            price_arrays = _resample_ohlc(columns['open'], columns['high'], columns['low'],
+                                          columns['close'], selected)
+        else:
+            selected = np.arange(count)
+            price_arrays = columns
+        price_arrays = {col: np.asarray(values, dtype=np.float64) for col, values in price_arrays.items()}
+        
+        # 只格式化保留下来的日期 - TICK数据保留毫秒
+        if dt_index is not None:
+            selected_index = dt_index[selected]
+            if is_tick:
+                # TICK数据保留毫秒精度（格式：2026-01-06T10:34:00.500），整列格式化后截掉微秒的后三位
+                dates = selected_index.strftime('%Y-%m-%dT%H:%M:%S.%f').str[:-3].tolist()
+            else:
+                dates = _format_dates(selected_index)
+        else:
+            dates = [str(i) for i in selected]
+        return dates, price_arrays
+    
+    def _get_trade_markers(self, trades: List[Dict], is_tick: bool):
+        """按整列向量化提取买入/卖出交易标记
+        
+        Args:
+            trades: 交易记录列表
+            is_tick: 是否为TICK数据（时间保留到毫秒）
+            
+        Returns:
+            tuple: (买入标记, 卖出标记)，各为 {'x': 时间, 'y': 价格, 'volume': 手数,
+                'action': 动作在 'actions' 中的下标, 'actions': 动作名称}，
+                悬停文字由页面脚本按这些并列数组拼出
+        """
+        sides = (('开多', '平空'), ('开空', '平多'))
+        if not trades:
+            return tuple({'x': [], 'y': [], 'volume': [], 'action': [], 'actions': list(side_actions)}
+                         for side_actions in sides)
+        
+        tdf = pd.DataFrame(trades)
+        count = len(tdf)
+        raw_times = tdf['datetime'] if 'datetime' in tdf.columns else pd.Series([''] * count)
+        actions = tdf['action'].fillna('').astype(str) if 'action' in tdf.columns else pd.Series([''] * count)
+        prices = tdf['price'].fillna(0) if 'price' in tdf.columns else pd.Series(np.zeros(count))
+        volumes = tdf['volume'].fillna(1) if 'volume' in tdf.columns else pd.Series(np.ones(count, dtype=np.int64))
+        if volumes.dtype.kind == 'f' and (volumes % 1 == 0).all():
+            volumes = volumes.astype(np.int64)
+        
+        # 时间整列解析后格式化 - TICK数据保留毫秒，无法解析的保留原始字符串
+        try:
+            parsed = pd.DatetimeIndex(pd.to_datetime(raw_times, errors='coerce'))
+        except (ValueError, TypeError):
+            parsed = pd.DatetimeIndex([pd.NaT] * count)
+        if is_tick:
+            times = pd.Series(parsed.strftime('%Y-%m-%dT%H:%M:%S.%f')).str[:-3]
+            fallback = raw_times.astype(str).str[:23]
+        else:
+            times = pd.Series(parsed.strftime('%Y-%m-%dT%H:%M:%S'))
+            fallback = raw_times.astype(str).str[:16]
+        times = times.where(~parsed.isna(), fallback.to_numpy())
+        
+        markers = []
+        for side_actions in sides:
+            mask = actions.isin(side_actions).to_numpy()
+            markers.append({
+                'x': times[mask].tolist(),
+                'y': _to_jsonable(prices.to_numpy()[mask]),
+                'volume': _to_jsonable(volumes.to_numpy()[mask]),
+                'action': (actions[mask] == side_actions[1]).to_numpy().astype(np.int8).tolist(),
+                'actions': list(side_actions),
+            })
+        return markers[0], markers[1]
+    
     def _generate_source_comparison(self, results: Dict) -> str:
         """生成数据源对比表格"""
         if len(results) <= 1:
@@ -1784,7 +1259,9 @@ class HTMLReportGenerator:
         total_commission_all = 0
         total_slippage_all = 0
         max_drawdown_all = 0
-        all_sharpe = []
+        # 夏普比率按初始资金加权（只统计非0的夏普比率）
+        sharpe_weighted_sum = 0
+        sharpe_weight = 0
         
         for key, result in results.items():
             symbol = result.get('symbol', '')
@@ -1811,46 +1288,30 @@ class HTMLReportGenerator:
             total_slippage_all += slippage
             max_drawdown_all = max(max_drawdown_all, max_dd)
             if sharpe:
-                all_sharpe.append((sharpe, initial))
+                sharpe_weighted_sum += sharpe * initial
+                sharpe_weight += initial
             
             return_class = 'profit' if total_return > 0 else 'loss' if total_return < 0 else ''
             
-            row = f'''
-            <tr>
-                <td>{name}</td>
-                <td>{initial:,.0f}</td>
-                <td>{final:,.0f}</td>
-                <td class="{return_class}">{total_return:+.2f}%</td>
-                <td>{commission:,.2f}</td>
-                <td>{slippage:,.2f}</td>
-                <td>{trades}</td>
-                <td>{win_rate:.1f}%</td>
-                <td class="loss">-{max_dd:.2f}%</td>
-                <td>{sharpe:.2f}</td>
-            </tr>'''
-            rows.append(row)
+            rows.append(self.COMPARISON_ROW_TEMPLATE % (
+                '', name, format(initial, ',.0f'), format(final, ',.0f'),
+                return_class, format(total_return, '+.2f'),
+                format(commission, ',.2f'), format(slippage, ',.2f'), trades,
+                format(win_rate, '.1f'), format(max_dd, '.2f'), format(sharpe, '.2f')))
         
         # 计算综合绩效
         combined_return = (total_final - total_initial) / total_initial * 100 if total_initial > 0 else 0
         combined_win_rate = total_win_trades / total_trades * 100 if total_trades > 0 else 0
-        combined_sharpe = sum(v * w for v, w in all_sharpe) / sum(w for _, w in all_sharpe) if all_sharpe else 0
+        combined_sharpe = sharpe_weighted_sum / sharpe_weight if sharpe_weight else 0
         combined_return_class = 'profit' if combined_return > 0 else 'loss' if combined_return < 0 else ''
         
         # 添加综合绩效行
-        combined_row = f'''
-            <tr style="background: rgba(100, 181, 246, 0.15); font-weight: 600;">
-                <td>📊 综合绩效</td>
-                <td>{total_initial:,.0f}</td>
-                <td>{total_final:,.0f}</td>
-                <td class="{combined_return_class}">{combined_return:+.2f}%</td>
-                <td>{total_commission_all:,.2f}</td>
-                <td>{total_slippage_all:,.2f}</td>
-                <td>{total_trades}</td>
-                <td>{combined_win_rate:.1f}%</td>
-                <td class="loss">-{max_drawdown_all:.2f}%</td>
-                <td>{combined_sharpe:.2f}</td>
-            </tr>'''
-        rows.append(combined_row)
+        rows.append(self.COMPARISON_ROW_TEMPLATE % (
+            ' style="background: rgba(100, 181, 246, 0.15); font-weight: 600;"', '📊 综合绩效',
+            format(total_initial, ',.0f'), format(total_final, ',.0f'),
+            combined_return_class, format(combined_return, '+.2f'),
+            format(total_commission_all, ',.2f'), format(total_slippage_all, ',.2f'), total_trades,
+            format(combined_win_rate, '.1f'), format(max_drawdown_all, '.2f'), format(combined_sharpe, '.2f')))
         
         header_html = ''.join([f'<th>{h}</th>' for h in headers])
         
@@ -1898,12 +1359,11 @@ class HTMLReportGenerator:
             source_metrics = self._extract_source_metrics(result)
             metrics_cards = self._generate_metrics_cards(source_metrics)
             
-            # 生成该数据源的交易记录
+            # 交易记录表格由页面脚本按 tradesDataSources 分页渲染
             trades = result.get('trades', [])
-            trades_rows = self._generate_trades_rows(trades, info['symbol'])
             
             detail_html = f'''
-            <div id="content-{info['key']}" class="tab-content {active}">
+            <div id="content-{info['key']}" class="tab-content {active}" data-trades-idx="{i}">
                 <div class="chart-container">
                     <div class="chart-title">
                         <span class="icon">📊</span>
@@ -1917,22 +1377,22 @@ class HTMLReportGenerator:
                 <div class="chart-container">
                     <div class="chart-title">
                         <span class="icon">📋</span>
-                        交易记录 (<span class="trades-count-{i}">{len(trades)}</span>笔)
+                        交易记录 (<span id="trades-count-{i}">{len(trades)}</span>笔)
                     </div>
                     
                     <!-- 筛选器 -->
                     <div class="trades-filter">
                         <div class="filter-group">
                             <label>时间:</label>
-                            <input type="text" class="filter-time-{i}" placeholder="如: 2025-01-02">
+                            <input type="text" id="filter-time-{i}" placeholder="如: 2025-01-02">
                         </div>
                         <div class="filter-group">
                             <label>价格:</label>
-                            <input type="text" class="filter-price-{i}" placeholder="如: 3300">
+                            <input type="text" id="filter-price-{i}" placeholder="如: 3300">
                         </div>
                         <div class="filter-group">
                             <label>操作:</label>
-                            <select class="filter-action-{i}">
+                            <select id="filter-action-{i}">
                                 <option value="">全部</option>
                                 <option value="开多">开多</option>
                                 <option value="平多">平多</option>
@@ -1942,7 +1402,7 @@ class HTMLReportGenerator:
                         </div>
                         <div class="filter-group">
                             <label>盈亏:</label>
-                            <select class="filter-profit-{i}">
+                            <select id="filter-profit-{i}">
                                 <option value="">全部</option>
                                 <option value="profit">盈利</option>
                                 <option value="loss">亏损</option>
@@ -1966,9 +1426,7 @@ class HTMLReportGenerator:
                                     <th>净盈亏</th>
                                 </tr>
                             </thead>
-                            <tbody id="trades-tbody-{i}">
-                                {trades_rows}
-                            </tbody>
+                            <tbody id="trades-tbody-{i}"></tbody>
                         </table>
                     </div>
                     
@@ -1976,11 +1434,11 @@ class HTMLReportGenerator:
                     <div class="pagination" id="pagination-{i}">
                         <button onclick="goToPage({i}, 1)">首页</button>
                         <button onclick="prevPage({i})">上一页</button>
-                        <span class="page-info">第 <span class="current-page-{i}">1</span> / <span class="total-pages-{i}">1</span> 页</span>
+                        <span class="page-info">第 <span id="current-page-{i}">1</span> / <span id="total-pages-{i}">1</span> 页</span>
                         <button onclick="nextPage({i})">下一页</button>
                         <button onclick="goToPage({i}, getTotalPages({i}))">末页</button>
                         <div class="page-jump">
-                            <input type="number" class="page-input-{i}" min="1" placeholder="页码">
+                            <input type="number" id="page-input-{i}" min="1" placeholder="页码">
                             <button onclick="jumpToPage({i})">跳转</button>
                         </div>
                     </div>
@@ -2016,36 +1474,11 @@ class HTMLReportGenerator:
         """生成指标卡片 HTML"""
         cards = []
         
-        metric_configs = [
-            ('initial_capital', '初始资金', ',.0f', 'neutral'),
-            ('final_equity', '期末权益', ',.0f', None),
-            ('total_return', '总收益率', '+.2f', None, '%'),
-            ('total_amount_profit', '毛利润(不含成本)', ',.2f', None),
-            ('total_commission', '总手续费', ',.2f', 'neutral'),
-            ('total_slippage', '总滑点成本', ',.2f', 'neutral'),
-            ('total_net_profit', '净利润(扣除成本)', ',.2f', None),
-            ('total_trades', '总交易次数', 'd', 'neutral'),
-            ('win_rate', '胜率', '.2f', None, '%'),
-            ('max_drawdown_pct', '最大回撤', '.2f', 'negative', '%'),
-            ('annual_return', '年化收益率', '+.2f', None, '%'),
-            ('sharpe_ratio', '夏普比率', '.2f', None),
-            ('profit_factor', '盈亏比', '.2f', None),
-        ]
-        
-        for config in metric_configs:
-            key = config[0]
-            label = config[1]
-            fmt = config[2]
-            force_class = config[3] if len(config) > 3 else None
-            suffix = config[4] if len(config) > 4 else ''
-            
+        for key, label, formatter, force_class, suffix in self.METRIC_CONFIGS:
             value = metrics.get(key, 0)
             
             try:
-                if 'd' in fmt:
-                    formatted_value = f"{int(value):,}"
-                else:
-                    formatted_value = f"{value:{fmt}}"
+                formatted_value = formatter(value)
             except:
                 formatted_value = str(value)
             
@@ -2053,72 +1486,53 @@ class HTMLReportGenerator:
             
             if force_class:
                 value_class = force_class
-            elif key in ['total_return', 'annual_return', 'total_net_profit', 'total_amount_profit']:
-                value_class = 'positive' if value > 0 else 'negative' if value < 0 else 'neutral'
-            elif key == 'win_rate':
-                value_class = 'positive' if value >= 50 else 'negative'
-            elif key == 'sharpe_ratio':
-                value_class = 'positive' if value > 1 else 'neutral' if value > 0 else 'negative'
-            elif key == 'profit_factor':
-                value_class = 'positive' if value > 1 else 'negative'
             else:
-                value_class = 'neutral'
+                value_class = self.METRIC_CLASS_RULES.get(key, _neutral_class)(value)
             
-            card_html = f'''
-            <div class="metric-card">
-                <div class="label">{label}</div>
-                <div class="value {value_class}">{formatted_value}</div>
-            </div>'''
-            cards.append(card_html)
+            cards.append(self.METRIC_CARD_TEMPLATE % (label, value_class, formatted_value))
         
         return '\n'.join(cards)
     
-    def _generate_trades_rows(self, trades: List[Dict], symbol: str = '') -> str:
-        """生成交易记录表格行"""
-        rows = []
+    def _get_trades_table_data(self, trades: List[Dict]) -> Dict[str, list]:
+        """按列提取交易记录表格数据，由页面脚本只渲染当前页的行
         
-        for i, trade in enumerate(trades, 1):
-            datetime_str = str(trade.get('datetime', ''))
-            action = trade.get('action', '')
-            price = trade.get('price', 0)
-            volume = trade.get('volume', 1)
-            
-            amount_profit = trade.get('amount_profit', 0)
-            commission = trade.get('commission', 0)
-            net_profit = trade.get('net_profit', 0)
-            
-            if action in ['开多', '平空']:
-                tag_class = 'buy'
-            else:
-                tag_class = 'sell'
+        Args:
+            trades: 交易记录列表
             
-            if action in ['平多', '平空']:
-                profit_class = 'profit' if net_profit > 0 else 'loss'
-                profit_str = f"{amount_profit:+,.2f}"
-                net_profit_str = f"{net_profit:+,.2f}"
+        Returns:
+            dict: 各列数据，time 为时间字符串，其余为操作名称和数值
+        """
+        columns = {'time': [], 'action': [], 'price': [], 'volume': [],
+                   'amount_profit': [], 'commission': [], 'net_profit': []}
+        if not trades:
+            return columns
+        
+        tdf = pd.DataFrame(trades)
+        count = len(tdf)
+        defaults = {'price': 0, 'volume': 1, 'amount_profit': 0, 'commission': 0, 'net_profit': 0}
+        
+        raw_times = tdf['datetime'] if 'datetime' in tdf.columns else None
+        if raw_times is not None and pd.api.types.is_datetime64_dtype(raw_times):
+            # 整列一次格式化，与 str(Timestamp) 的结果一致（有微秒时保留微秒）
+            times = raw_times.dt.strftime('%Y-%m-%d %H:%M:%S')
+            has_fraction = (raw_times.dt.microsecond != 0).to_numpy()
+            if has_fraction.any():
+                times[has_fraction] = raw_times[has_fraction].dt.strftime('%Y-%m-%d %H:%M:%S.%f')
+            columns['time'] = times.fillna('NaT').tolist()
+        else:
+            columns['time'] = [str(trade.get('datetime', '')) for trade in trades]
+        columns['action'] = (tdf['action'].fillna('').astype(str).tolist()
+                             if 'action' in tdf.columns else [''] * count)
+        for name, default in defaults.items():
+            if name in tdf.columns:
+                columns[name] = _to_jsonable(tdf[name].fillna(default))
             else:
-                profit_class = ''
-                profit_str = '-'
-                net_profit_str = '-'
-            
-            row_html = f'''
-            <tr>
-                <td>{i}</td>
-                <td>{datetime_str}</td>
-                <td><span class="tag {tag_class}">{action}</span></td>
-                <td>{price:,.2f}</td>
-                <td>{volume}</td>
-                <td class="{profit_class}">{profit_str}</td>
-                <td>{commission:,.2f}</td>
-                <td class="{profit_class}">{net_profit_str}</td>
-            </tr>'''
-            rows.append(row_html)
-        
-        return '\n'.join(rows)
-
+                columns[name] = [default] * count
+        return columns
 
 # 兼容旧接口
-def generate_html_report(results: Dict, multi_data_source=None, output_dir: str = "backtest_results") -> str:
+def generate_html_report(results: Dict, multi_data_source=None, output_dir: str = "backtest_results",
+                         compress: bool = False) -> str:
     """生成 HTML 报告的便捷函数"""
     generator = HTMLReportGenerator()
-    return generator.generate_report(results, multi_data_source, output_dir)
+    return generator.generate_report(results, multi_data_source, output_dir, compress=compress)
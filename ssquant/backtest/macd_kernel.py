@@ -0,0 +1,45 @@
+"""
+MACD的Numba单次遍历内核
+本模块在导入时即依赖Numba，由 function_api.macd 在首次计算时按需导入，
+未安装Numba时导入失败，macd 改用 pandas ewm 计算
+"""
+
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def _ewm_update(weighted, old_wt, cur, alpha):
+    """EMA单步更新，与 pandas ewm(adjust=False).mean() 的递推及NaN处理一致"""
+    if weighted == weighted:
+        old_wt *= 1.0 - alpha
+        if cur == cur:
+            # 常数序列不做更新，避免数值误差
+            if weighted != cur:
+                new_wt = alpha
+                if alpha == 0.5:
+                    # pandas 在 com == 1 时按间隔更新新值权重（仅在NaN之后与普通递推不同）
+                    new_wt = 1.0 - old_wt
+                weighted = (old_wt * weighted + new_wt * cur) / (old_wt + new_wt)
+            old_wt = 1.0
+    elif cur == cur:
+        weighted = cur
+    return weighted, old_wt
+
+
+@njit(cache=True)
+def macd_core(x, alpha_fast, alpha_slow, alpha_signal):
+    """单次遍历同时计算快慢EMA、DIF和DEA"""
+    n = x.shape[0]
+    dif = np.empty(n)
+    dea = np.empty(n)
+    fast_v, fast_wt = np.nan, 1.0
+    slow_v, slow_wt = np.nan, 1.0
+    dea_v, dea_wt = np.nan, 1.0
+    for i in range(n):
+        fast_v, fast_wt = _ewm_update(fast_v, fast_wt, x[i], alpha_fast)
+        slow_v, slow_wt = _ewm_update(slow_v, slow_wt, x[i], alpha_slow)
+        dif[i] = fast_v - slow_v
+        dea_v, dea_wt = _ewm_update(dea_v, dea_wt, dif[i], alpha_signal)
+        dea[i] = dea_v
+    return dif, dea
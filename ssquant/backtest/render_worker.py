@@ -0,0 +1,163 @@
+"""
+回测图表常驻渲染进程
+在常驻子进程中预先导入 matplotlib/scipy，之后通过管道接收绘图任务，
+多次绘图之间不再重复支付导入的开销
+"""
+
+import multiprocessing
+from multiprocessing.connection import wait
+
+
+def _warm_up():
+    """预先导入绘图模块"""
+    from .backtest_visualization import _ensure_plot_imports
+    _ensure_plot_imports()
+
+
+def _worker_loop(conn):
+    """常驻渲染进程主循环
+
+    启动时完成预热，之后逐个接收绘图任务并把结果发回主进程，
+    收到None或管道关闭时退出。
+
+    Args:
+        conn: 与主进程通信的管道连接
+    """
+    from .backtest_visualization import _render_one
+    _warm_up()
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+        try:
+            conn.send((True, _render_one(**job)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class RenderWorker:
+    """常驻渲染进程，负责在子进程中绘制单品种回测图表
+
+    进程在多次绘图之间保持存活，matplotlib/scipy只需导入一次。
+    """
+
+    def __init__(self):
+        """启动渲染进程"""
+        self.conn, child_conn = multiprocessing.Pipe()
+        self.process = multiprocessing.Process(target=_worker_loop, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self):
+        """渲染进程是否仍在运行"""
+        return self.process.is_alive()
+
+    def submit(self, job):
+        """提交一个绘图任务
+
+        Args:
+            job: _render_one 的关键字参数字典
+        """
+        self.conn.send(job)
+
+    def result(self):
+        """等待并返回最近提交任务的结果
+
+        Returns:
+            tuple: (是否成功, _render_one的返回值或错误信息)
+        """
+        return self.conn.recv()
+
+    def close(self):
+        """通知渲染进程退出并等待其结束"""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.conn.close()
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+
+
+def shutdown_workers(workers):
+    """关闭列表中的渲染进程并清空列表
+
+    列表被原地清空，可作为 weakref.finalize 的回调参数，在持有者被回收或解释器退出时关闭进程。
+
+    Args:
+        workers: RenderWorker列表
+    """
+    for worker in workers:
+        worker.close()
+    workers.clear()
+
+
+def render_jobs(workers, jobs):
+    """把绘图任务分发给常驻渲染进程，空闲的进程依次领取下一个任务
+
+    异常退出的渲染进程会被关闭，其正在执行的任务记为失败；被其他异常中断时，
+    仍在执行任务的进程也会被关闭，避免下次使用时读到本次任务的结果。
+
+    Args:
+        workers: RenderWorker列表
+        jobs: _render_one 的关键字参数字典列表
+
+    Returns:
+        list: 与jobs顺序一致的 _render_one 返回值
+
+    Raises:
+        RuntimeError: 有任务绘制失败（或渲染进程异常退出）时，在所有任务结束后抛出
+    """
+    results = [None] * len(jobs)
+    errors = []
+    pending = iter(enumerate(jobs))
+    busy = {}
+
+    def dispatch(worker):
+        item = next(pending, None)
+        if item is not None:
+            job_index, job = item
+            try:
+                worker.submit(job)
+            except (OSError, ValueError) as e:
+                errors.append(f"渲染进程异常退出: {type(e).__name__}: {e}")
+                worker.close()
+                return
+            busy[worker.conn] = (worker, job_index)
+
+    try:
+        for worker in workers:
+            dispatch(worker)
+
+        while busy:
+            for conn in wait(list(busy)):
+                worker, job_index = busy.pop(conn)
+                try:
+                    ok, value = worker.result()
+                except (EOFError, OSError) as e:
+                    # 渲染进程已退出，不再给它分配任务
+                    errors.append(f"渲染进程异常退出: {type(e).__name__}: {e}")
+                    worker.close()
+                    continue
+                if ok:
+                    results[job_index] = value
+                else:
+                    errors.append(value)
+                dispatch(worker)
+    finally:
+        # 被中断时这些进程的结果已无法对应到任务，关闭后由调用方重新创建
+        for worker, _ in busy.values():
+            worker.close()
+
+    # 所有渲染进程都已退出时，剩余任务无法绘制
+    for _ in pending:
+        errors.append("没有可用的渲染进程")
+
+    if errors:
+        raise RuntimeError("; ".join(errors))
+    return results
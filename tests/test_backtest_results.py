@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from ssquant.backtest.backtest_results import BacktestResultCalculator, get_equity_series
+
+
+class _DataSource:
+    def __init__(self, data, trades):
+        self.symbol = 'rb888'
+        self.kline_period = '1d'
+        self.adjust_type = '0'
+        self.data = data
+        self.trades = trades
+
+
+class _MultiDataSource:
+    def __init__(self, data_sources):
+        self.data_sources = data_sources
+
+
+def _run(trades_spec):
+    index = pd.date_range('2024-01-01', periods=10, freq='D')
+    close = 100.0 + np.arange(10)
+    data = pd.DataFrame({'open': close, 'high': close, 'low': close, 'close': close}, index=index)
+    trades = [
+        {'datetime': index[i], 'action': action, 'price': float(close[i]), 'volume': 1, 'reason': ''}
+        for i, action in trades_spec
+    ]
+    symbol_configs = {'rb888': {'commission': 0.0, 'margin_rate': 0.1, 'contract_multiplier': 10,
+                                'initial_capital': 10000.0}}
+    calculator = BacktestResultCalculator()
+    results = calculator.calculate_results(_MultiDataSource([_DataSource(data, trades)]), symbol_configs)
+    return results[next(iter(results))]
+
+
+def test_unmatched_close_is_retried_on_later_bars():
+    # 反手动作不参与回放；第4根K线的平空无持仓可平，挂起到第6根K线开空之后的下一根K线按原成交价平仓
+    result = _run([(0, '开多'), (2, '平多开空'), (4, '平空'), (6, '开空'), (8, '平空')])
+    equity = get_equity_series(result)
+
+    assert equity.tolist() == [10000.0, 10010.0, 10020.0, 10030.0, 10040.0,
+                               10050.0, 10060.0, 10090.0, 10100.0, 10110.0]
+    assert result['net_value'] == 1.011
+
+
+def test_matched_trades_replay_at_their_bars():
+    result = _run([(1, '开多'), (3, '平多'), (5, '开空'), (7, '平空')])
+    equity = get_equity_series(result)
+
+    assert equity.tolist() == [10000.0, 10000.0, 10010.0, 10020.0, 10020.0,
+                               10020.0, 10010.0, 10000.0, 10000.0, 10000.0]
+
+
+def test_equity_curve_series_keys_are_kept():
+    result = _run([(1, '开多'), (3, '平多')])
+
+    assert result['equity_curve'].tolist() == result['equity_curve_arr'].tolist()
+    assert result['gross_equity_curve'].tolist() == result['gross_equity_curve_arr'].tolist()
+    assert result['equity_curve'].index.equals(result['data'].index)
+
+
+def test_performance_treats_missing_metrics_as_zero():
+    results = {
+        'a': {'net_value': 1.1, 'annual_return': 10.0, 'sharpe_ratio': 1.0, 'total_trades': 4},
+        'b': {'net_value': 1.0},
+    }
+    performance = BacktestResultCalculator().calculate_performance(results)
+
+    assert performance['annual_return'] == 5.0
+    assert performance['sharpe_ratio'] == 0.5
+    assert performance['trade_stats']['total_trades'] == 4